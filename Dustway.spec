@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('assets', 'assets'), ('music', 'music'), ('story', 'story')],
-    hiddenimports=[],
+    hiddenimports=['numpy'],    # src/linear_eval.py imports it optionally
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -28,6 +28,19 @@ def unlock_achievement(aid: str):
     state.ach_popup_queue.append(aid)
     save_achievements()
 
+def rules_event_observer(event: str, **data):
+    """Observer for the rules in models.py. Pass it only for real moves so
+    bot simulations never unlock, save or queue effects."""
+    if event == "caravan_26":
+        unlock_achievement("PERFECT_26")
+        state.deferred_bursts.append(("cav26", data["cav"], data["actor"].name))
+    elif event == "jack_on_ten":
+        unlock_achievement("JACK_ATTACK")
+    elif event == "joker_sweep":
+        if data["removed"] >= 3: unlock_achievement("JOKER_BOMB")
+    elif event == "opening_deal":
+        if state.sounds: state.sounds.play("deal")
+
 def check_post_match_achievements(result, diff, mode, elapsed_ms,
                                    player_lost_first=False, all_three=False):
     if result == "win":
@@ -1,109 +1,251 @@
 import random
 import math
+import time
+import threading
 import pygame
 import src.state as state
-from src.config import T, HAND_TARGET_SIZE
+from src.config import (
+    T, HAND_TARGET_SIZE, SEARCH_BUDGET_MS, SEARCH_NODE_BUDGET, SEARCH_MAX_DEPTH, SEARCH_CHANCE_DRAWS, SEARCH_DEALS,
+    BOT_STRATEGY, BOT_STRATEGY_OVERRIDES, ENDGAME_DECK_CARDS, ENDGAME_NODE_CAP, ENDGAME_DEALS, ISMCTS_ITERATION_BUDGET,
+    ROLLOUT_PLIES, ROLLOUT_CANDIDATES, ROLLOUT_DEALS, ROLLOUT_TIME_MS,
+)
 from src.models import (
     BENNY, PERSONALITIES, DEFAULT_PERSONALITY, NumEntry, PlayerState, Caravan,
     can_play_number_on_caravan, can_play_picture_on_target,
-    apply_jack, apply_king, apply_queen, apply_joker,
     discard_hand_card, disband_caravan, play_number, play_picture,
-    slot_outcome, _clone, draw_to_hand
+    slot_outcome, make_move, unmake_move, joker_hits, draw_to_hand, board_hash, position_hash,
+    _clone_full, DEFAULT_WEIGHTS, load_bot_weights, hand_hash, card_code
 )
+from src.ismcts import ismcts_choose_move, last_ismcts_stats
+from src.linear_eval import get_eval, features
+
+class TranspositionTable:
+    """Bounded hash -> value cache. When full, the oldest entries go first.
+    hits/misses are kept for profiling (see tools/bench_bot_turn.py)."""
+    def __init__(self, capacity=1 << 16):
+        self.capacity = capacity
+        self._data = {}
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        v = self._data.get(key)
+        if v is None: self.misses += 1
+        else:         self.hits += 1
+        return v
+
+    def put(self, key, value):
+        d = self._data
+        if key not in d and len(d) >= self.capacity:
+            del d[next(iter(d))]
+        d[key] = value
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
 
-def heuristic(player, bot):
+    def stats(self):
+        looked = self.hits + self.misses
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / looked if looked else 0.0}
+
+# heuristic() only reads caravans, so the board key (salted with the
+# weights in use, the quantised Jack threat and the bot's draw odds) is enough.
+HEURISTIC_TT = TranspositionTable()
+
+
+# Tuned weights, if tools/tune_weights.py has written any.
+load_bot_weights()
+
+def heuristic(player, bot, w=DEFAULT_WEIGHTS, p_jack=0.0, tracker=None):
+    """`p_jack` is the chance the player holds a Jack (CardTracker.p_opp_holds);
+    a slot the bot has won is worth only what a Jack is unlikely to take back.
+    With a `tracker`, an open bot caravan under 21 is also worth the chance
+    that the bot's next draw extends it into 21-26 (CardTracker.p_extends)."""
     score = 0
+    won = w.slot_win - int(w.slot_win * w.jack_threat * p_jack) // 100
     for i in range(3):
         bv, bs = bot.caravans[i].score(), bot.caravans[i].for_sale()
         pv, ps = player.caravans[i].score(), player.caravans[i].for_sale()
-        st, w = slot_outcome(pv, ps, bv, bs)
+        st, win = slot_outcome(pv, ps, bv, bs)
         if st == "ready":
-            score += 600 if w == "bot" else -600
+            score += won if win == "bot" else -w.slot_win
         elif st == "tie":
-            score -= 120
+            score -= w.slot_tie
         else:
-            score += bv * 4 if bv <= 26 else -(bv - 26) * 60
-            score -= pv * 4 if pv <= 26 else -(pv - 26) * 30
-        if bs: score += 250 + (bv - 21) * 20
-        if ps: score -= 320 + (pv - 21) * 24
-        if 18 <= pv <= 20: score -= 120
-        if 27 <= pv <= 29: score -= 90
+            score += bv * w.own_value if bv <= 26 else -(bv - 26) * w.own_bust
+            score -= pv * w.opp_value if pv <= 26 else -(pv - 26) * w.opp_bust
+            if tracker is not None and bv < 21:
+                score += int(w.own_draw * tracker.p_extends(bot.caravans[i], (21, 26)))
+        if bs: score += w.own_sale + (bv - 21) * w.own_sale_step
+        if ps: score -= w.opp_sale + (pv - 21) * w.opp_sale_step
+        if 18 <= pv <= 20: score -= w.opp_near
+        if 27 <= pv <= 29: score -= w.opp_over
         bt = bot.caravans[i].trend()
-        if bv > 22 and bt > 0: score -= bt * 8
+        if bv > 22 and bt > 0: score -= bt * w.own_trend
         pt = player.caravans[i].trend()
-        if pv > 22 and pt > 0: score += pt * 6
+        if pv > 22 and pt > 0: score += pt * w.opp_trend
     return score
 
-def _bot_candidates(bot, player):
-    cands = []
-    for i, c in enumerate(bot.hand):
-        if c.is_number():
-            for ci in range(3):
-                if can_play_number_on_caravan(c, bot.caravans[ci]):
-                    cands.append(("play_number", {"card_idx": i, "cav": ci}))
-    for i, c in enumerate(bot.hand):
-        if not c.is_picture(): continue
-        for own_name, own in (("bot", bot), ("player", player)):
-            for ci in range(3):
+def cached_heuristic(player, bot, w=DEFAULT_WEIGHTS, p_jack=0.0, tracker=None):
+    q = int(p_jack * 64 + 0.5)
+    key = board_hash(player, bot) ^ w.salt ^ (q * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF)
+    if tracker is not None: key ^= tracker.draw_key
+    h = HEURISTIC_TT.get(key)
+    if h is None:
+        h = heuristic(player, bot, w, q / 64, tracker)
+        HEURISTIC_TT.put(key, h)
+    return h
+
+# Candidate generation collapses moves that lead to the same position up to
+# symmetry, so every evaluator sees each one once:
+#   - slots whose caravan pair (bot's and player's) is identical are
+#     interchangeable; only the first of each is targeted or disbanded;
+#   - Jacks, Kings and Jokers act the same whatever their suit, so one card
+#     of each rank is tried per target and discarded once.
+# Moves come out in a rough likely-value order: number plays, pictures on the
+# opponent, pictures on own caravans, disbands, discards, and last the moves
+# that are legal but rarely good: a number or King that takes the mover's
+# own caravan past 26, then a Joker that would remove nothing
+# (joker_hits() == 0).
+_SUITLESS_RANKS = frozenset(("J", "K", "JKR"))
+
+def _card_class(c):
+    return c.rank if c.rank in _SUITLESS_RANKS else c
+
+def _bot_candidates(bot, player, prune=True):
+    """Legal (mtype, payload) moves for `bot`; prune=False lists every hand
+    index and slot (the pre-pruning set, kept for benchmarks)."""
+    if prune:
+        first = {}
+        slots = [first.setdefault((bot.caravans[ci]._hash, player.caravans[ci]._hash), ci) for ci in range(3)]
+        slots = [ci for ci in range(3) if slots[ci] == ci]
+        cards, seen = [], set()
+        for i, c in enumerate(bot.hand):
+            k = _card_class(c)
+            if k not in seen: seen.add(k); cards.append((i, c))
+    else:
+        slots, cards = range(3), list(enumerate(bot.hand))
+    cands, busts, late = [], [], []
+    for i, c in cards:
+        if not c.is_number(): continue
+        for ci in slots:
+            cav = bot.caravans[ci]
+            if can_play_number_on_caravan(c, cav):
+                move = ("play_number", {"card_idx": i, "cav": ci})
+                (busts if cav.score() + c.value() > 26 else cands).append(move)
+    for own_name, own in (("player", player), ("bot", bot)):
+        for i, c in cards:
+            if not c.is_picture(): continue
+            for ci in slots:
                 cav = own.caravans[ci]
                 for ei in range(len(cav.nums)):
-                    if can_play_picture_on_target(c, cav.nums[ei], ei == len(cav.nums) - 1):
-                        cands.append(("play_pic", {"card_idx": i, "owner": own_name, "cav": ci, "entry": ei}))
-    for i in range(len(bot.hand)):
-        cands.append(("discard", {"card_idx": i}))
-    for ci in range(3):
+                    if not can_play_picture_on_target(c, cav.nums[ei], ei == len(cav.nums) - 1): continue
+                    move = ("play_pic", {"card_idx": i, "owner": own_name, "cav": ci, "entry": ei})
+                    if (own is bot and c.rank == "K"
+                            and cav.score() + cav.nums[ei].effective_value() > 26): busts.append(move)
+                    # A Joker that removes nothing only spends the card: legal, rarely good.
+                    elif c.rank == "JKR" and not joker_hits(bot, player, cav.nums[ei]): late.append(move)
+                    else: cands.append(move)
+    for ci in slots:
         if not bot.caravans[ci].empty():
             cands.append(("disband", {"cav": ci}))
-    return cands
+    for i, _ in cards:
+        cands.append(("discard", {"card_idx": i}))
+    return cands + busts + late
 
-def _sim_move(mtype, payload, sp, sb):
-    if mtype == "play_number":
-        i, ci = payload["card_idx"], payload["cav"]
-        if i >= len(sb.hand): return False
-        c = sb.hand[i]
-        if not c.is_number() or not can_play_number_on_caravan(c, sb.caravans[ci]): return False
-        sb.caravans[ci].nums.append(NumEntry(card=c))
-        sb.hand.pop(i)
-    elif mtype == "play_pic":
-        i, own, ci, ei = payload["card_idx"], payload["owner"], payload["cav"], payload["entry"]
-        if i >= len(sb.hand): return False
-        pic = sb.hand[i]
-        tgt = sb if own == "bot" else sp
-        if ci not in (0, 1, 2) or ei >= len(tgt.caravans[ci].nums): return False
-        ne = tgt.caravans[ci].nums[ei]
-        is_last = (ei == len(tgt.caravans[ci].nums) - 1)
-        if not can_play_picture_on_target(pic, ne, is_last): return False
-        if pic.rank == "J": apply_jack(sb, tgt.caravans[ci], ei)
-        elif pic.rank == "K": apply_king(ne, pic)
-        elif pic.rank == "Q": apply_queen(ne, pic)
-        elif pic.rank == "JKR": apply_joker(sb, sp, sb, ne, pic)
-        sb.hand.pop(i)
-    elif mtype == "discard":
-        i = payload["card_idx"]
-        if i >= len(sb.hand): return False
-        discard_hand_card(sb, i)
-    elif mtype == "disband":
-        if not disband_caravan(sb, payload["cav"]): return False
-    return True
+def _personality_bonus(bot, player, mtype, payload, pers):
+    h = 0
+    if mtype == "play_pic" and payload["owner"] == "player":
+        pi = payload["card_idx"]
+        if pi < len(bot.hand):
+            pic = bot.hand[pi]
+            pv = player.caravans[payload["cav"]].score()
+            if pic.rank == "J" and 18 <= pv <= 26:   h += 220 + pers.attack_bias
+            if pic.rank == "JKR" and 18 <= pv <= 26: h += 140 + pers.attack_bias
+    if mtype in ("play_number", "disband"): h += pers.defense_bias
+    return h
+
+# Strategy keys: "greedy" (one-ply heuristic), "search" (expectiminimax),
+# "rollout" (one-ply candidates played on greedily), "ismcts" (src/ismcts.py),
+# "linear" (one-ply with the learned evaluation of src/linear_eval.py; plays
+# as "greedy" when that is unavailable).
+def bot_strategy(difficulty, personality_key=DEFAULT_PERSONALITY):
+    s = BOT_STRATEGY_OVERRIDES.get((difficulty, personality_key))
+    if s: return s
+    return BOT_STRATEGY.get(difficulty, "greedy")
+
+# Filled in by bot_choose_move: strategy, budget_ms and that strategy's own
+# stats (depth/nodes for search, deals/plies for rollout, iterations for ismcts).
+last_turn_stats: dict = {}
+
+# HEURISTIC_TT and the last_*_stats dicts are shared by every decision, and a
+# cancelled BotThinker can still be finishing when the next one starts. One
+# decision runs at a time: bot_choose_move holds this lock throughout, and
+# other threads read the stats under it.
+DECISION_LOCK = threading.RLock()
+
+def bot_choose_move(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY, strategy=None,
+                    stop=None, budget_ms=None, tracker=None, node_budget=None):
+    """`stop` (a threading.Event) cuts the longer strategies short; they
+    return the best move found so far. `budget_ms` is the anytime mode:
+    ismcts and search without a cap use up to that much time, ignoring their
+    own time caps; capped ones and the rollout bot ignore it.
+    `node_budget` overrides the tier's SEARCH_NODE_BUDGET (search),
+    ROLLOUT_PLIES (rollout) or ISMCTS_ITERATION_BUDGET (ismcts).
+    `tracker` (src/tracker.py) lets the heuristic weigh both sides' unseen cards."""
+    with DECISION_LOCK:
+        return _choose_move(bot, player, difficulty, personality_key, strategy, stop, budget_ms, tracker,
+                            node_budget)
 
-def bot_choose_move(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY):
+def _choose_move(bot, player, difficulty, personality_key, strategy, stop, budget_ms, tracker, node_budget):
+    strategy = strategy or bot_strategy(difficulty, personality_key)
+    p_jack = tracker.p_opp_holds("J") if tracker is not None else 0.0
+    last_turn_stats.clear()
+    last_turn_stats.update(strategy=strategy, budget_ms=budget_ms)
+    limit = ENDGAME_DECK_CARDS.get(difficulty, 0)
+    if limit > 0 and len(bot.deck) + len(player.deck) <= limit:
+        move = endgame_choose_move(bot, player, stop=stop)
+        if move is not None:
+            last_turn_stats.update(last_endgame_stats, strategy="endgame")
+            return move
+    if strategy == "ismcts":
+        w = PERSONALITIES.get(personality_key, BENNY).weights
+        iterations = ISMCTS_ITERATION_BUDGET.get(difficulty, 0) if node_budget is None else node_budget
+        if iterations or budget_ms is None:
+            move = ismcts_choose_move(bot, player, iterations=iterations or None, stop=stop, weights=w)
+        else: move = ismcts_choose_move(bot, player, iterations=1 << 62, time_ms=budget_ms, stop=stop, weights=w)
+        last_turn_stats.update(last_ismcts_stats)
+        return move
+    if strategy == "rollout":
+        move = rollout_choose_move(bot, player, difficulty, personality_key, stop, p_jack, node_budget, tracker)
+        last_turn_stats.update(last_rollout_stats)
+        return move
+    if strategy == "search":
+        move = search_choose_move(bot, player, difficulty, personality_key, budget_ms, stop, p_jack,
+                                  node_budget, tracker)
+        last_turn_stats.update(last_search_stats)
+        return move
     pers = PERSONALITIES.get(personality_key, BENNY)
     cands = _bot_candidates(bot, player)
     if not cands: return "discard", {"card_idx": 0}
-    scored = []
+    model = get_eval() if strategy == "linear" else None
+    evaluated, rows = [], []
     for mtype, payload in cands:
-        sp, sb = _clone(player), _clone(bot)
-        if not _sim_move(mtype, payload, sp, sb): continue
-        h = heuristic(sp, sb)
-        # Personality biases
-        if mtype == "play_pic" and payload["owner"] == "player":
-            pi = payload["card_idx"]
-            if pi < len(bot.hand):
-                pic = bot.hand[pi]
-                pv = player.caravans[payload["cav"]].score()
-                if pic.rank == "J" and 18 <= pv <= 26:   h += 220 + pers.attack_bias
-                if pic.rank == "JKR" and 18 <= pv <= 26: h += 140 + pers.attack_bias
-        if mtype in ("play_number", "disband"): h += pers.defense_bias
+        if stop is not None and stop.is_set() and evaluated: break
+        bonus = _personality_bonus(bot, player, mtype, payload, pers)
+        undo = make_move(bot, player, mtype, payload)
+        if undo is None: continue
+        try:
+            if model is None: h = cached_heuristic(player, bot, pers.weights, p_jack, tracker)
+            else: rows.append(features(player, bot)); h = 0
+        finally:
+            unmake_move(bot, player, undo)
+        evaluated.append((h + bonus, mtype, payload))
+    if rows:
+        # All candidate positions in one matrix product.
+        evaluated = [(h + v, m, p) for (h, m, p), v in zip(evaluated, model.score_rows(rows))]
+    scored = []
+    for h, mtype, payload in evaluated:
         noise = pers.noise.get(difficulty, 80)
         h += random.randint(-noise, noise)
         if difficulty == "easy" and mtype == "discard": h += 30
@@ -118,11 +260,340 @@ def bot_choose_move(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY
         return scored[k][1], scored[k][2]
     return scored[0][1], scored[0][2]
 
-def bot_take_turn(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY):
+# ============================================================
+# EXPECTIMINIMAX SEARCH
+# ============================================================
+# Iterative deepening over plies: the bot maximises, the player minimises
+# (alpha-beta on both layers), and whenever the side that just moved has to
+# refill its hand a chance node averages over the cards left in its deck.
+# Draws are only expanded when that side moves again inside the horizon.
+# The player's hand is hidden, so the search never reads it: it runs on
+# SEARCH_DEALS re-deals of the player's unseen cards (hand and deck together,
+# see deal_unseen) and scores each root move by its average over them.
+# Leaves are scored with heuristic() through HEURISTIC_TT, with the Jack
+# threat and the bot's draw odds (the tracker) fixed at their root values.
+# No tier plays it by default: it does not beat the one-ply bot (see
+# ROLLOUTS below and docs/difficulty_calibration.md).
+WIN_SCORE = 100_000
+
+# Filled in after every search: depth completed, nodes, deals, elapsed ms, what
+# ended it, nodes/sec.
+last_search_stats: dict = {}
+
+class _SearchTimeout(Exception):
+    pass
+
+def deal_unseen(player, rng):
+    """A copy of `player` with hand and deck re-dealt at random from the two
+    together, as ismcts.determinize does: the bot knows which cards the
+    player still holds between hand and deck, not where they are. The cards
+    are put in a fixed order before shuffling, so the deal does not depend
+    on the real hand."""
+    p = _clone_full(player)
+    unseen = sorted(p.hand + p.deck, key=card_code)
+    rng.shuffle(unseen)
+    p.hand, p.deck = unseen[:len(p.hand)], unseen[len(p.hand):]
+    return p
+
+class _Search:
+    def __init__(self, bot, player, deadline, rng, stop=None, weights=DEFAULT_WEIGHTS, p_jack=0.0,
+                 tracker=None):
+        self.bot, self.player = bot, player
+        self.w = weights
+        self.p_jack = p_jack
+        self.tracker = tracker
+        self.deadline = deadline
+        self.stop = stop
+        self.rng = rng
+        self.nodes = 0
+        self.max_nodes = math.inf
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes >= self.max_nodes: raise _SearchTimeout
+        if self.deadline is not None and not self.nodes & 255:
+            if time.perf_counter() > self.deadline or (self.stop is not None and self.stop.is_set()):
+                raise _SearchTimeout
+
+    def _sides(self, bot_moves):
+        return (self.bot, self.player) if bot_moves else (self.player, self.bot)
+
+    def _terminal(self):
+        """WIN_SCORE/-WIN_SCORE once a side holds two slots, else None."""
+        wb = wp = 0
+        for i in range(3):
+            pc, bc = self.player.caravans[i], self.bot.caravans[i]
+            st, w = slot_outcome(pc.score(), pc.for_sale(), bc.score(), bc.for_sale())
+            if st == "ready":
+                if w == "bot": wb += 1
+                else: wp += 1
+        if wb >= 2: return WIN_SCORE
+        if wp >= 2: return -WIN_SCORE
+        return None
+
+    def children(self, bot_moves):
+        """Legal moves with their one-ply leaf values, best first for the mover."""
+        me, opp = self._sides(bot_moves)
+        out = []
+        for mtype, payload in _bot_candidates(me, opp):
+            undo = make_move(me, opp, mtype, payload)
+            if undo is None: continue
+            try:
+                self._tick()
+                v = self.after_move(bot_moves, 0, -math.inf, math.inf)
+            finally:
+                unmake_move(me, opp, undo)
+            out.append((v, mtype, payload))
+        out.sort(key=lambda x: x[0], reverse=bot_moves)
+        return out
+
+    def value(self, bot_moves, depth, alpha, beta):
+        """Value of the position with `bot_moves` to move and `depth` plies left."""
+        if depth == 0: return cached_heuristic(self.player, self.bot, self.w, self.p_jack, self.tracker)
+        kids = self.children(bot_moves)
+        if not kids: return cached_heuristic(self.player, self.bot, self.w, self.p_jack, self.tracker)
+        if depth == 1: return kids[0][0]
+        me, opp = self._sides(bot_moves)
+        best = -math.inf if bot_moves else math.inf
+        for _, mtype, payload in kids:
+            undo = make_move(me, opp, mtype, payload)
+            try:
+                v = self.after_move(bot_moves, depth - 1, alpha, beta)
+            finally:
+                unmake_move(me, opp, undo)
+            if bot_moves:
+                if v > best: best = v
+                if best > alpha: alpha = best
+            else:
+                if v < best: best = v
+                if best < beta: beta = best
+            if alpha >= beta: break
+        return best
+
+    def after_move(self, bot_moves, depth, alpha, beta):
+        """The mover has just played; settle its refill and game end, then pass the turn.
+        As in the game, a mover who cannot refill loses even if the board is now won."""
+        me, _ = self._sides(bot_moves)
+        if len(me.hand) + len(me.deck) < HAND_TARGET_SIZE:
+            return -WIN_SCORE if bot_moves else WIN_SCORE           # decked out
+        t = self._terminal()
+        if t is not None: return t + depth if t > 0 else t - depth   # prefer quicker wins
+        if len(me.hand) < HAND_TARGET_SIZE and depth >= 2: return self.chance(bot_moves, depth)
+        return self.value(not bot_moves, depth, alpha, beta)
+
+    def chance(self, bot_moves, depth):
+        me, _ = self._sides(bot_moves)
+        if len(me.hand) >= HAND_TARGET_SIZE:
+            return self.value(not bot_moves, depth, -math.inf, math.inf)
+        deck = me.deck
+        counts = {}
+        for c in deck: counts[c] = counts.get(c, 0) + 1
+        outcomes = list(counts.items())
+        if len(outcomes) > SEARCH_CHANCE_DRAWS:
+            outcomes = self.rng.sample(outcomes, SEARCH_CHANCE_DRAWS)
+        total = sum(n for _, n in outcomes)
+        ev = 0.0
+        for card, n in outcomes:
+            j = deck.index(card)
+            deck[j], deck[-1] = deck[-1], deck[j]
+            me.hand.append(deck.pop())
+            try:
+                self._tick()
+                ev += n * self.chance(bot_moves, depth)
+            finally:
+                deck.append(me.hand.pop())
+                deck[j], deck[-1] = deck[-1], deck[j]
+        return ev / total
+
+def search_choose_move(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY, budget_ms=None,
+                       stop=None, p_jack=0.0, node_budget=None, tracker=None):
+    """Iterative-deepening expectiminimax within node_budget nodes (default:
+    SEARCH_NODE_BUDGET[difficulty], 0 = no cap). With a node cap the time
+    limit is always the SEARCH_BUDGET_MS[difficulty] safety ceiling, so the
+    same nodes are searched whatever time the caller offers; budget_ms only
+    sets the time of an uncapped search. Returns the best move of the deepest
+    completed iteration; depth 1 always completes.
+    Every iteration searches each root move on all deals of the player's
+    unseen cards (one if their deck is empty and the hand is known)."""
+    pers = PERSONALITIES.get(personality_key, BENNY)
+    if node_budget is None: node_budget = SEARCH_NODE_BUDGET.get(difficulty, 0)
+    if node_budget or budget_ms is None: budget_ms = SEARCH_BUDGET_MS.get(difficulty, 0)
+    t0 = time.perf_counter()
+    rng = random.Random(random.random())
+    deals = [deal_unseen(player, rng) for _ in range(SEARCH_DEALS if player.deck else 1)]
+    search = _Search(bot, deals[0], None, rng, stop, pers.weights, p_jack, tracker)
+    root = search.children(True)
+    if not root:
+        last_search_stats.clear()
+        return "discard", {"card_idx": 0}
+    noise = pers.noise.get(difficulty, 80)
+    extra = [_personality_bonus(bot, player, m, p, pers) + random.randint(-noise, noise)
+             for _, m, p in root]
+    values = [v for v, _, _ in root]
+    moves = [(m, p) for _, m, p in root]
+    depth = 1
+    search.deadline = t0 + budget_ms / 1000
+    if node_budget: search.max_nodes = node_budget
+    cut, best = "depth", None
+    while depth < SEARCH_MAX_DEPTH:
+        if abs(max(values)) >= WIN_SCORE:
+            cut = "solved"
+            break
+        order = sorted(range(len(moves)), key=lambda k: values[k] + extra[k], reverse=True)
+        new = [None] * len(moves)
+        try:
+            for k in order:
+                mtype, payload = moves[k]
+                # An average over deals needs every deal's exact value, so
+                # the root window stays open (alpha-beta still runs below it).
+                v = 0.0
+                for deal in deals:
+                    search.player = deal
+                    undo = make_move(bot, deal, mtype, payload)
+                    try:
+                        v += search.after_move(True, depth, -math.inf, math.inf)
+                    finally:
+                        unmake_move(bot, deal, undo)
+                new[k] = v / len(deals)
+        except _SearchTimeout:
+            cut = "nodes" if search.nodes >= search.max_nodes else "time"
+            # The previous best is searched first with an open window, so a
+            # deeper move that finished and beats it is better; the rest of
+            # the budget is not wasted on a discarded iteration.
+            done = [k for k in order if new[k] is not None]
+            if done: best = max(done, key=lambda k: new[k] + extra[k])
+            break
+        values, depth = new, depth + 1
+    if best is None: best = max(range(len(moves)), key=lambda k: values[k] + extra[k])
+    ms = (time.perf_counter() - t0) * 1000
+    last_search_stats.clear()
+    last_search_stats.update(depth=depth, nodes=search.nodes, deals=len(deals), ms=ms, cut=cut,
+                             nps=search.nodes / ms * 1000 if ms else 0.0)
+    return moves[best]
+
+# ============================================================
+# ROLLOUTS
+# ============================================================
+# The expectiminimax search above does not beat the one-ply bot: its player
+# layer minimises heuristic() over a sampled hand, and even on the player's
+# real hand two plies of that score no better than one ply. Playing the
+# position on instead, with both sides choosing their one-ply best move,
+# does. The ROLLOUT_CANDIDATES best one-ply moves (personality bonus
+# included) are each played out ROLLOUT_PLIES[difficulty] plies further, with
+# refills, on ROLLOUT_DEALS re-deals of the player's unseen cards (deal_unseen)
+# and of the bot's own deck order, the same deals for every candidate. A
+# line that ends the game scores +-WIN_SCORE, any other its end position's
+# heuristic(); the candidate with the best average, plus personality noise,
+# is played. 0 plies is the one-ply choice.
+
+# Filled in after every decision: candidates, deals, plies, elapsed ms, what
+# ended it ("deals", "time" or "stop").
+last_rollout_stats: dict = {}
+
+def _decided(bot, player):
+    """WIN_SCORE/-WIN_SCORE once a side holds two slots, else None."""
+    wb = wp = 0
+    for i in range(3):
+        pc, bc = player.caravans[i], bot.caravans[i]
+        st, w = slot_outcome(pc.score(), pc.for_sale(), bc.score(), bc.for_sale())
+        if st == "ready":
+            if w == "bot": wb += 1
+            else: wp += 1
+    return WIN_SCORE if wb >= 2 else -WIN_SCORE if wp >= 2 else None
+
+def _greedy_move(me, opp, w):
+    """The mover's one-ply best move, without noise or personality bonus."""
+    best, move = None, None
+    for mtype, payload in _bot_candidates(me, opp):
+        undo = make_move(me, opp, mtype, payload)
+        if undo is None: continue
+        h = cached_heuristic(opp, me, w)
+        unmake_move(me, opp, undo)
+        if best is None or h > best: best, move = h, (mtype, payload)
+    return move
+
+def _play_refill(me, opp, mtype, payload, undos):
+    """make_move plus the refill, both recorded on `undos`; False if the
+    mover cannot refill (and so loses)."""
+    undos.append((me, opp, make_move(me, opp, mtype, payload)))
+    drawn = 0
+    while len(me.hand) < HAND_TARGET_SIZE and me.deck:
+        me.hand.append(me.deck.pop())
+        drawn += 1
+    undos.append((me, None, drawn))
+    return len(me.hand) >= HAND_TARGET_SIZE
+
+def _undo_all(undos):
+    for me, opp, undo in reversed(undos):
+        if opp is not None: unmake_move(me, opp, undo)
+        else:
+            for _ in range(undo): me.deck.append(me.hand.pop())
+
+def _rollout(bot, player, move, plies, w):
+    """Value for the bot of `move` followed by `plies` greedy plies."""
+    undos = []
+    try:
+        if not _play_refill(bot, player, *move, undos): return -WIN_SCORE
+        me, opp = player, bot
+        for _ in range(plies):
+            t = _decided(bot, player)
+            if t is not None: return t
+            m = _greedy_move(me, opp, w)
+            if m is None: break
+            if not _play_refill(me, opp, *m, undos): return WIN_SCORE if me is player else -WIN_SCORE
+            me, opp = opp, me
+        t = _decided(bot, player)
+        return t if t is not None else heuristic(player, bot, w)
+    finally:
+        _undo_all(undos)
+
+def rollout_choose_move(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY, stop=None,
+                        p_jack=0.0, plies=None, tracker=None):
+    """Best of the one-ply candidates by greedy rollouts (see above), within
+    ROLLOUT_TIME_MS or until `stop`; at least one deal always completes.
+    `plies` overrides ROLLOUT_PLIES[difficulty]."""
+    pers = PERSONALITIES.get(personality_key, BENNY)
+    if plies is None: plies = ROLLOUT_PLIES.get(difficulty, 0)
+    t0 = time.perf_counter()
+    scored = []
+    for mtype, payload in _bot_candidates(bot, player):
+        undo = make_move(bot, player, mtype, payload)
+        if undo is None: continue
+        try:
+            h = cached_heuristic(player, bot, pers.weights, p_jack, tracker)
+        finally:
+            unmake_move(bot, player, undo)
+        scored.append((h + _personality_bonus(bot, player, mtype, payload, pers), mtype, payload))
+    last_rollout_stats.clear()
+    if not scored: return "discard", {"card_idx": 0}
+    scored.sort(key=lambda x: x[0], reverse=True)
+    moves = [(m, p) for _, m, p in scored[:ROLLOUT_CANDIDATES]]
+    rng = random.Random(random.random())
+    me = _clone_full(bot)                  # the bot does not know its deck order either
+    totals, deals, cut = [0.0] * len(moves), 0, "deals"
+    while deals < ROLLOUT_DEALS and len(moves) > 1:
+        if deals and stop is not None and stop.is_set(): cut = "stop"; break
+        if deals and (time.perf_counter() - t0) * 1000 > ROLLOUT_TIME_MS: cut = "time"; break
+        deal = deal_unseen(player, rng)
+        rng.shuffle(me.deck)
+        for k, move in enumerate(moves):
+            totals[k] += _rollout(me, deal, move, plies, pers.weights)
+        deals += 1
+    noise = pers.noise.get(difficulty, 80)
+    best = max(range(len(moves)), key=lambda k: totals[k] / max(deals, 1) + random.randint(-noise, noise))
+    last_rollout_stats.update(candidates=len(moves), deals=deals, plies=plies,
+                              ms=(time.perf_counter() - t0) * 1000, cut=cut)
+    return moves[best]
+
+def bot_take_turn(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY, observer=None, strategy=None,
+                  move=None, tracker=None, node_budget=None):
+    """Plays one bot turn. `move` is a decision made in advance (see BotThinker);
+    without it the move is chosen here. `observer` should feed `tracker`."""
     from src.ui import get_bot_tell, set_bot_tell
     from src.config import HAND_OPENING_SIZE, HAND_TARGET_SIZE
     pers = PERSONALITIES.get(personality_key, BENNY)
-    mtype, payload = bot_choose_move(bot, player, difficulty, personality_key)
+    mtype, payload = move or bot_choose_move(bot, player, difficulty, personality_key, strategy,
+                                             tracker=tracker, node_budget=node_budget)
     msg = ""
     was_play = False
     commentary = ""
@@ -132,7 +603,7 @@ def bot_take_turn(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY):
     if mtype == "play_number":
         i, ci = payload["card_idx"], payload["cav"]
         card = bot.hand[i] if 0 <= i < len(bot.hand) else None
-        ok, _ = play_number(bot, i, ci)
+        ok, _ = play_number(bot, i, ci, observer)
         if ok and card:
             msg = f"Bot played {card.label()} on caravan #{ci+1}"
             was_play = True
@@ -141,7 +612,7 @@ def bot_take_turn(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY):
                 tell = get_bot_tell(personality_key, "26")
                 if tell: set_bot_tell(tell, (195, 162, 52))
         else:
-            discard_hand_card(bot, 0)
+            discard_hand_card(bot, 0, observer)
             msg = "Bot: failed → discard"
     elif mtype == "play_pic":
         i, own, ci, ei = payload["card_idx"], payload["owner"], payload["cav"], payload["entry"]
@@ -149,7 +620,7 @@ def bot_take_turn(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY):
         tgt = bot if own == "bot" else player
         tlbl = (tgt.caravans[ci].nums[ei].card.label()
                 if 0 <= ci < 3 and 0 <= ei < len(tgt.caravans[ci].nums) else "?")
-        ok, _ = play_picture(bot, player, i, tgt, ci, ei)
+        ok, _ = play_picture(bot, player, i, tgt, ci, ei, observer)
         if ok and pic:
             side = "self" if own == "bot" else "you"
             if pic.rank == "J":
@@ -169,22 +640,235 @@ def bot_take_turn(bot, player, difficulty, personality_key=DEFAULT_PERSONALITY):
                 msg = f"Bot played {pic.label()} on {side}: {tlbl}"
             was_play = True
         else:
-            discard_hand_card(bot, 0)
+            discard_hand_card(bot, 0, observer)
             msg = "Bot: failed → discard"
     elif mtype == "discard":
         i = payload["card_idx"]
         card = bot.hand[i] if 0 <= i < len(bot.hand) else None
-        discard_hand_card(bot, i)
+        discard_hand_card(bot, i, observer)
         msg = f"Bot discarded {card.label() if card else '?'}"
     elif mtype == "disband":
         ci = payload["cav"]
         if disband_caravan(bot, ci):
             msg = f"Bot disbanded caravan #{ci+1}"
         else:
-            discard_hand_card(bot, 0)
+            discard_hand_card(bot, 0, observer)
             msg = "Bot: failed disband → discard"
 
     if commentary: msg = f'"{commentary}"'
-    if not draw_to_hand(bot, HAND_TARGET_SIZE):
+    if not draw_to_hand(bot, HAND_TARGET_SIZE, observer):
         return False, T("bot_deck_empty_win"), False
     return True, msg, was_play
+
+# ============================================================
+# ENDGAME SOLVER
+# ============================================================
+# With only a few cards left in the decks every line ends quickly: a side
+# that cannot refill to HAND_TARGET_SIZE after a move loses on the spot, so
+# only disbands are free. The solver searches these lines to the end and
+# returns the bot's exact win probability (draws count 1/2, the stalemate
+# counter is not modelled). Draws are chance nodes over the deck as a
+# multiset. The player's hand is never read: each root move is solved on
+# ENDGAME_DEALS re-deals of the player's unseen cards (deal_unseen) and
+# scored by its average, which is exact only once the player's deck is empty
+# and their hand is known. Within a deal both sides see everything.
+# Positions are memoised on a canonical key (caravan pairs in any slot
+# order, hands and decks as multisets), with alpha-beta bounds; the key
+# includes the player's hand, so deals share the memo.
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+
+# Filled in after every solve: nodes, memo entries, deals, value, elapsed ms.
+last_endgame_stats: dict = {}
+
+class _Endgame:
+    def __init__(self, bot, player, cap, stop=None, prune=True):
+        self.bot, self.player = bot, player
+        self.cap, self.stop = cap, stop
+        self.prune = prune
+        self.nodes = 0
+        self.memo = {}
+
+    def _sides(self, bot_moves):
+        return (self.bot, self.player) if bot_moves else (self.player, self.bot)
+
+    def key(self, bot_moves):
+        b, p = self.bot, self.player
+        pairs = tuple(sorted((b.caravans[i]._hash, p.caravans[i]._hash) for i in range(3)))
+        return (bot_moves, pairs, hand_hash(b.hand), hand_hash(p.hand), hand_hash(b.deck), hand_hash(p.deck))
+
+    def terminal(self):
+        wb = wp = 0
+        for i in range(3):
+            pc, bc = self.player.caravans[i], self.bot.caravans[i]
+            st, w = slot_outcome(pc.score(), pc.for_sale(), bc.score(), bc.for_sale())
+            if st == "ready":
+                if w == "bot": wb += 1
+                else: wp += 1
+        return 1.0 if wb >= 2 else 0.0 if wp >= 2 else None
+
+    def value(self, bot_moves, alpha, beta):
+        self.nodes += 1
+        if self.nodes > self.cap or (self.stop is not None and self.stop.is_set()):
+            raise _SearchTimeout
+        k = self.key(bot_moves)
+        hit = self.memo.get(k)
+        if hit is not None:
+            v, flag = hit
+            if flag == _EXACT or (flag == _LOWER and v >= beta) or (flag == _UPPER and v <= alpha):
+                return v
+        a0, b0 = alpha, beta
+        me, opp = self._sides(bot_moves)
+        best = None
+        for mtype, payload in _bot_candidates(me, opp, self.prune):
+            undo = make_move(me, opp, mtype, payload)
+            if undo is None: continue
+            try:
+                v = self.after_move(bot_moves, alpha, beta)
+            finally:
+                unmake_move(me, opp, undo)
+            if bot_moves:
+                if best is None or v > best: best = v
+                alpha = max(alpha, best)
+            else:
+                if best is None or v < best: best = v
+                beta = min(beta, best)
+            if alpha >= beta: break
+        if best is None: best = 0.5
+        flag = _UPPER if best <= a0 else _LOWER if best >= b0 else _EXACT
+        self.memo[k] = (best, flag)
+        return best
+
+    def after_move(self, bot_moves, alpha, beta):
+        me, _ = self._sides(bot_moves)
+        if len(me.hand) + len(me.deck) < HAND_TARGET_SIZE:
+            return 0.0 if bot_moves else 1.0                         # decked out
+        t = self.terminal()
+        if t is not None: return t
+        if len(me.hand) < HAND_TARGET_SIZE: return self.chance(bot_moves)
+        return self.value(not bot_moves, alpha, beta)
+
+    def chance(self, bot_moves):
+        me, _ = self._sides(bot_moves)
+        if len(me.hand) >= HAND_TARGET_SIZE: return self.value(not bot_moves, 0.0, 1.0)
+        deck = me.deck
+        counts = {}
+        for c in deck: counts[c] = counts.get(c, 0) + 1
+        ev = 0.0
+        for card, n in counts.items():
+            j = deck.index(card)
+            deck[j], deck[-1] = deck[-1], deck[j]
+            me.hand.append(deck.pop())
+            try:
+                ev += n * self.chance(bot_moves)
+            finally:
+                deck.append(me.hand.pop())
+                deck[j], deck[-1] = deck[-1], deck[j]
+        return ev / len(deck)
+
+def endgame_choose_move(bot, player, node_cap=None, stop=None, prune=True):
+    """Best move by win probability averaged over the deals, or None if the
+    node cap (default ENDGAME_NODE_CAP, shared by all deals) was hit first.
+    prune=False also drops the symmetry pruning (for checking that it leaves
+    the value unchanged)."""
+    t0 = time.perf_counter()
+    rng = random.Random(random.random())
+    deals = [deal_unseen(player, rng) for _ in range(ENDGAME_DEALS if player.deck else 1)]
+    solver = _Endgame(bot, deals[0], node_cap or ENDGAME_NODE_CAP, stop, prune)
+    best, best_v = None, -1.0
+    try:
+        for mtype, payload in _bot_candidates(bot, deals[0], prune):
+            v = 0.0
+            for deal in deals:
+                solver.player = deal
+                undo = make_move(bot, deal, mtype, payload)
+                if undo is None: break
+                try:
+                    # Open window: the average needs each deal's exact value.
+                    v += solver.after_move(True, 0.0, 1.0)
+                finally:
+                    unmake_move(bot, deal, undo)
+            else:
+                v /= len(deals)
+                if v > best_v: best, best_v = (mtype, payload), v
+                if best_v >= 1.0: break
+    except _SearchTimeout:
+        best = None
+    last_endgame_stats.clear()
+    last_endgame_stats.update(nodes=solver.nodes, memo=len(solver.memo), deals=len(deals),
+                              value=best_v if best else None, ms=(time.perf_counter() - t0) * 1000)
+    return best
+
+# ============================================================
+# BACKGROUND THINKING
+# ============================================================
+class BotThinker:
+    """Runs bot_choose_move in a daemon thread on private copies of both
+    players, so the match loop keeps rendering while the bot thinks.
+
+    A result is tagged with the position it was computed for; poll() only
+    hands it out if the live position still matches. cancel() (undo, quit,
+    restart) drops any pending result and asks the search to stop early."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gen = 0
+        self._stop = threading.Event()
+        self._key = None
+        self._result = None
+        self.failed = False
+        self.stats = {}      # last_turn_stats of the most recent finished decision
+
+    @staticmethod
+    def position_key(bot, player):
+        return position_hash(bot, player), len(bot.deck), len(player.deck)
+
+    @property
+    def active(self):
+        """True from start() until the result is taken or cancelled."""
+        return self._key is not None
+
+    def start(self, bot, player, difficulty, personality_key=DEFAULT_PERSONALITY, strategy=None,
+              budget_ms=None, tracker=None):
+        self.cancel()
+        with self._lock:
+            gen = self._gen
+            self._key = self.position_key(bot, player)
+        stop = self._stop = threading.Event()
+        b, p = _clone_full(bot), _clone_full(player)
+        if tracker is not None: tracker = tracker.copy(b, p)
+
+        def work():
+            try:
+                # Waits here for a cancelled thinker that is still stopping.
+                with DECISION_LOCK:
+                    if stop.is_set(): return      # cancelled while waiting
+                    move = bot_choose_move(b, p, difficulty, personality_key, strategy, stop, budget_ms, tracker)
+                    stats = dict(last_turn_stats)
+            except Exception as e:
+                print(f"Bot thinker failed: {e}")
+                move, stats = None, {}
+            with self._lock:
+                if gen != self._gen: return
+                if move is None: self.failed = True
+                else:            self._result, self.stats = move, stats
+
+        threading.Thread(target=work, name="bot-thinker", daemon=True).start()
+
+    def poll(self, bot, player):
+        """The chosen (mtype, payload) once ready and still valid for this position, else None."""
+        with self._lock:
+            move, key = self._result, self._key
+        if move is None: return None
+        if key != self.position_key(bot, player):
+            self.cancel()
+            return None
+        self.cancel()
+        return move
+
+    def cancel(self):
+        with self._lock:
+            self._gen += 1
+            self._key = None
+            self._result = None
+            self.failed = False
+        self._stop.set()
+
@@ -37,6 +37,70 @@ TIMED_TURN_MS       = 30_000
 BOT_DELAY_MS: Dict[str, int] = {
     "easy": 900, "medium": 800, "hard": 700, "impossible": 600,
 }
+# Strategy per difficulty (src/bot.py bot_strategy). A tier only gets a
+# costlier strategy once it measures stronger than the one below it: the
+# one-ply bot (with its personality noise, and on easy / medium a pick among
+# the next-best moves) up to hard, greedy rollouts on impossible. The
+# expectiminimax search and ISMCTS lose to the one-ply bot at every budget
+# tried, so no tier uses them. Win rates per tier and budget:
+# docs/difficulty_calibration.md (tools/calibrate_difficulty.py).
+BOT_STRATEGY: Dict[str, str] = {
+    "easy": "greedy", "medium": "greedy", "hard": "greedy", "impossible": "rollout",
+}
+# Search nodes per bot move (src/bot.py), which plays the same on every
+# machine, even in anytime mode; 1 = one-ply, 0 = no node cap (the bot
+# thinks for its whole time budget).
+SEARCH_NODE_BUDGET: Dict[str, int] = {
+    "easy": 1, "medium": 300, "hard": 1_000, "impossible": 5_000,
+}
+# Think-time ceiling for the expectiminimax bot: only a safety net on slow
+# machines for the node-capped tiers (set well above what their nodes cost),
+# the whole budget of an uncapped one.
+SEARCH_BUDGET_MS: Dict[str, int] = {
+    "easy": 100, "medium": 500, "hard": 1_000, "impossible": 2_000,
+}
+SEARCH_MAX_DEPTH     = 8     # iterative deepening stops here even with time left
+SEARCH_CHANCE_DRAWS  = 3     # distinct draw outcomes sampled per chance node
+SEARCH_DEALS         = 3     # re-deals of the player's unseen hand searched per move
+# Rollout bot (src/bot.py): the ROLLOUT_CANDIDATES best one-ply moves are
+# each played on, both sides greedy, for the tier's ROLLOUT_PLIES plies on
+# ROLLOUT_DEALS re-deals of the player's unseen cards; 0 plies = one-ply.
+# Past 2 deals and 6 plies it measured no stronger against greedy.
+ROLLOUT_PLIES: Dict[str, int] = {
+    "easy": 0, "medium": 2, "hard": 4, "impossible": 6,
+}
+ROLLOUT_CANDIDATES   = 5
+ROLLOUT_DEALS        = 4
+ROLLOUT_TIME_MS      = 2_000   # safety ceiling; one deal always completes
+# Endgame solver (src/bot.py): used once both decks together hold at
+# most this many cards (0 = never), and abandoned past the node cap.
+ENDGAME_DECK_CARDS: Dict[str, int] = {
+    "easy": 0, "medium": 0, "hard": 3, "impossible": 4,
+}
+ENDGAME_NODE_CAP     = 4_000   # roughly half a second of pure-Python search
+ENDGAME_DEALS        = 4       # re-deals of the player's unseen hand solved per move
+# Anytime mode: the bot decides while the bot delay runs, so its move is
+# ready when the pause ends. The pause hides the think time; it does not buy
+# strength: every tier stops at its node, ply or iteration cap, since more
+# time measured no stronger (docs/difficulty_calibration.md). Only an
+# uncapped search or ISMCTS (budget 0) thinks for the whole pause.
+BOT_ANYTIME          = True
+# Bot strategy per (difficulty, personality); anything not listed follows
+# BOT_STRATEGY.
+# ISMCTS is not listed: at 250-2000 iterations it scored 34-47% against
+# hard:house:greedy (docs/difficulty_calibration.md).
+BOT_STRATEGY_OVERRIDES: Dict[Tuple[str, str], str] = {}
+# ISMCTS (src/ismcts.py) is sized like the search: iterations per bot move
+# (total across workers) per tier, with ISMCTS_TIME_MS only a safety ceiling
+# for slow machines; 0 = no cap (the bot thinks for its whole time budget).
+ISMCTS_ITERATION_BUDGET: Dict[str, int] = {
+    "easy": 100, "medium": 250, "hard": 500, "impossible": 1_500,
+}
+ISMCTS_ITERATIONS    = 20_000   # ismcts_choose_move() called without a tier
+ISMCTS_TIME_MS       = 3_000
+ISMCTS_WORKERS       = 0        # 0 = one per CPU core
+ISMCTS_EXPLORATION   = 0.7
+ISMCTS_ROLLOUT_PLIES = 8
 
 MAX_ART_CACHE_ENTRIES = 512
 
@@ -128,6 +192,8 @@ HISTORY_MAP_PATH = rpath("assets", "background", "history_map.jpeg")
 MENU_TILE_DIR  = rpath("assets", "menu_tiles")
 AVATARS_DIR    = rpath("assets", "avatars")
 PROFILE_BG_DIR = rpath("assets", "profile_backgrounds")
+BOT_WEIGHTS_FILE = rpath("assets", "bot_weights.json")   # written by tools/tune_weights.py
+LINEAR_EVAL_FILE = rpath("assets", "linear_eval.json")       # written by tools/train_linear_eval.py
 
 DEFAULT_AVATARS     = ["trader", "scavenger", "guard", "nomad", "wanderer"]
 DEFAULT_PROFILE_BGS = ["tent", "caravan", "shack", "bunker"]
@@ -135,6 +201,10 @@ DEFAULT_PROFILE_BGS = ["tent", "caravan", "shack", "bunker"]
 USE_ART             = True
 SHOW_LABEL_OVER_ART = False
 ART_DEBUG           = False
+# Cross-check cached caravan score/direction/suit against a full recompute.
+CARAVAN_CACHE_DEBUG = os.environ.get("DUSTWAY_CACHE_DEBUG") == "1"
+# Print the bot's per-turn search stats (depth, nodes, iterations) to stdout.
+BOT_STATS_DEBUG     = os.environ.get("DUSTWAY_BOT_STATS") == "1"
 
 RESOLUTIONS: List[Tuple[int,int,str]] = [
     (1024, 576,  "1024×576"),
@@ -152,6 +222,37 @@ GM_TIMED       = "timed"
 GM_TOURNAMENT  = "tournament"
 GM_NETWORK     = "network"
 NET_PORT       = 27015
+# Firebase lobby polling (src/network.py): messages are fetched by key after
+# the last one delivered, at most NET_FETCH_LIMIT per poll, and deleted once
+# delivered. A missing message holds later ones back for NET_GAP_TIMEOUT_S;
+# then it is fetched by key, or reported to the match as lost (which asks
+# for a snapshot) if the server has none.
+NET_POLL_INTERVAL_S = 0.5
+NET_FETCH_LIMIT     = 32
+NET_GAP_TIMEOUT_S   = 3.0
+NET_LOBBY_CHECK_S   = 5.0     # how often the lobby itself is checked for deletion
+NET_ACCEPT_CHECK_S  = 1.0     # how often a waiting host checks whether someone joined
+# Opponent moves are pushed over a streaming GET (server-sent events) when
+# NET_STREAM is on; polling above is the fallback. Reconnects back off from
+# the first to the second NET_STREAM_BACKOFF_S value.
+NET_STREAM           = True
+NET_STREAM_TIMEOUT_S = 45.0    # Firebase sends a keep-alive every 30 s
+NET_STREAM_BACKOFF_S = (0.5, 8.0)
+NET_STREAM_MAX_FAILS = 5       # failed connects in a row before polling for the rest of the match
+# Outgoing moves go through one sender thread per match, in order; whatever
+# queues up during a request is sent as one PATCH. A failed PATCH is retried,
+# backing off from the first to the second NET_SEND_BACKOFF_S value.
+NET_SEND_BACKOFF_S = (0.25, 4.0)
+# A move that has not arrived NET_RESYNC_TIMEOUT_S after a later one did
+# (or a snapshot asked for that long ago) makes the match ask for a snapshot.
+NET_RESYNC_TIMEOUT_S = 5.0
+# All Firebase requests share keep-alive connections (src/http_pool.py): at
+# most HTTP_POOL_SIZE in flight and kept open per host. Background writes
+# hold at most HTTP_POOL_SIZE - 1 of them; the event stream holds none.
+HTTP_POOL_SIZE      = 4
+HTTP_TIMEOUT_S      = 3.0
+HTTP_METRICS_WINDOW = 512     # requests kept for the p50/p99 latencies
+HTTP_MAX_REDIRECTS  = 5       # Location hops followed per request or stream
 
 # ============================================================
 # LOCALISATION
@@ -0,0 +1,167 @@
+"""
+Headless bot-vs-bot batch simulator.
+
+Plays N matches between two (difficulty, personality) bots with the same
+rules as run_match / run_spectator (opening phase, HAND_TARGET_SIZE refills,
+STALEMATE_THRESHOLD draws, deck-out losses) but without drawing anything,
+spread over a process pool.
+
+    python -m src.headless --a hard:house --b medium:yes_man -n 400 -j 8
+    python -m src.headless --smoke      # one match per strategy, in-process
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import sys
+import math
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config import HAND_OPENING_SIZE, HAND_TARGET_SIZE, STALEMATE_THRESHOLD
+from src.models import (
+    PERSONALITIES, DEFAULT_PERSONALITY, PlayerState, Caravan, build_deck_from_selection,
+    load_deck_selection, ensure_min30_selection, draw_to_hand, bot_opening_play, check_game_end,
+)
+from src.bot import bot_take_turn
+from src.tracker import CardTracker, card_pool
+import src.ismcts as ismcts
+
+DIFFICULTIES = ("easy", "medium", "hard", "impossible")
+
+def play_match(a, b, seed, deck_keys=None, a_first=True, on_turn=None):
+    """Plays one match between bot specs a and b, each (difficulty, personality),
+    (difficulty, personality, strategy) or (difficulty, personality, strategy,
+    node_budget), strategy None for the default. Returns (winner "a"/"b"/None,
+    reason, main-phase turns). `on_turn(bot_a, bot_b)` is called after
+    every main-phase turn."""
+    random.seed(seed)
+    bot_a = PlayerState("Bot A", [Caravan() for _ in range(3)], build_deck_from_selection(deck_keys), [], [])
+    bot_b = PlayerState("Bot B", [Caravan() for _ in range(3)], build_deck_from_selection(deck_keys), [], [])
+    pool = card_pool(deck_keys)
+    track_a, track_b = CardTracker(bot_a, bot_b, pool, pool), CardTracker(bot_b, bot_a, pool, pool)
+
+    def observer(event, **data):
+        track_a.observe(event, **data)
+        track_b.observe(event, **data)
+
+    draw_to_hand(bot_a, HAND_OPENING_SIZE, observer)
+    draw_to_hand(bot_b, HAND_OPENING_SIZE, observer)
+    sides = [("a", bot_a, bot_b, a, track_a), ("b", bot_b, bot_a, b, track_b)]
+    if not a_first: sides.reverse()
+
+    for half in range(6):
+        bot_opening_play(sides[half % 2][1], observer)
+    bot_a.hand = bot_a.hand[:HAND_TARGET_SIZE]
+    bot_b.hand = bot_b.hand[:HAND_TARGET_SIZE]
+    draw_to_hand(bot_a, HAND_TARGET_SIZE, observer)
+    draw_to_hand(bot_b, HAND_TARGET_SIZE, observer)
+
+    consecutive_discards, turns = 0, 0
+    while True:
+        name, mover, opponent, (diff, pk, *extra), tracker = sides[turns % 2]
+        turns += 1
+        strategy, nodes = (list(extra) + [None, None])[:2]
+        ok, _, was_play = bot_take_turn(mover, opponent, diff, pk, observer, strategy,
+                                        tracker=tracker, node_budget=nodes)
+        if not ok: return ("b" if name == "a" else "a"), "deck", turns
+        consecutive_discards = 0 if was_play else consecutive_discards + 1
+        if on_turn is not None: on_turn(bot_a, bot_b)
+        ended, win, _ = check_game_end(bot_b, bot_a)    # bot_a sits in the "bot" seat
+        if ended: return ("a" if win == "bot" else "b"), "caravans", turns
+        if consecutive_discards >= STALEMATE_THRESHOLD: return None, "stalemate", turns
+
+def _worker_init():
+    # Each simulator process is already one core's worth of work.
+    ismcts.set_pool_enabled(False)
+
+def _play(job):
+    return play_match(*job)
+
+def wilson_interval(k, n, z=1.96):
+    """Wilson score interval for k successes out of n."""
+    if n == 0: return 0.0, 0.0
+    p = k / n
+    d = 1 + z * z / n
+    c = (p + z * z / (2 * n)) / d
+    h = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / d
+    return max(0.0, c - h), min(1.0, c + h)
+
+def run_batch(a, b, n, workers=None, seed=1, deck_keys=None):
+    """Plays n matches (first move alternates) and returns a summary dict."""
+    jobs = [(a, b, seed + i, deck_keys, i % 2 == 0) for i in range(n)]
+    workers = workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+            results = list(pool.map(_play, jobs, chunksize=max(1, n // (workers * 8))))
+    else:
+        results = [_play(j) for j in jobs]
+    secs = time.perf_counter() - t0
+    out = {"matches": n, "seconds": secs, "matches_per_sec": n / secs if secs else 0.0,
+           "avg_turns": sum(r[2] for r in results) / n if n else 0.0, "reasons": {}}
+    for key in ("a", "b", None):
+        k = sum(1 for r in results if r[0] == key)
+        out["draw" if key is None else key] = (k, k / n if n else 0.0, wilson_interval(k, n))
+    for r in results: out["reasons"][r[1]] = out["reasons"].get(r[1], 0) + 1
+    return out
+
+STRATEGIES = ("greedy", "search", "rollout", "ismcts", "linear")
+
+def _bot_spec(text):
+    diff, _, rest = text.partition(":")
+    pk, _, rest = rest.partition(":")
+    strategy, _, nodes = rest.partition(":")
+    pk = pk or DEFAULT_PERSONALITY
+    if (diff not in DIFFICULTIES or pk not in PERSONALITIES or (strategy and strategy not in STRATEGIES)
+            or (nodes and not nodes.isdigit())):
+        raise argparse.ArgumentTypeError(
+            f"expected difficulty:personality[:strategy[:nodes]] with difficulty in {DIFFICULTIES}, "
+            f"personality in {tuple(PERSONALITIES)} and strategy in {STRATEGIES}")
+    if nodes: return diff, pk, strategy or None, int(nodes)
+    return (diff, pk, strategy) if strategy else (diff, pk)
+
+def spec_label(spec):
+    """"hard:house", "hard:house:search:3000", ... for a bot spec."""
+    return ":".join("" if x is None else str(x) for x in spec)
+
+def smoke(seed=1):
+    """Plays one match per strategy (and the default) against hard:house:greedy,
+    in this process, so every search path runs at least once; raises on the
+    first failure."""
+    for strategy in (None,) + STRATEGIES:
+        spec = ("impossible", "house") + ((strategy,) if strategy else ())
+        t0 = time.perf_counter()
+        winner, reason, turns = play_match(spec, ("hard", "house", "greedy"), seed)
+        print(f"  {spec_label(spec):<26} ok  {reason:<9} {turns:3d} turns  {time.perf_counter() - t0:5.1f} s")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m src.headless", description="Headless bot-vs-bot matches.")
+    ap.add_argument("--a", type=_bot_spec, default=("hard", "house"), help="difficulty:personality[:strategy[:nodes]]")
+    ap.add_argument("--b", type=_bot_spec, default=("medium", DEFAULT_PERSONALITY),
+                    help="difficulty:personality[:strategy[:nodes]]")
+    ap.add_argument("-n", "--matches", type=int, default=200)
+    ap.add_argument("-j", "--workers", type=int, default=0, help="processes (0 = one per core)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--saved-deck", action="store_true", help="use the deck saved in the deck builder")
+    ap.add_argument("--smoke", action="store_true", help="one match per strategy, then exit")
+    args = ap.parse_args(argv)
+    if args.smoke: return smoke(args.seed)
+
+    deck_keys = None
+    if args.saved_deck:
+        deck_keys = load_deck_selection()
+        if deck_keys: deck_keys = ensure_min30_selection(deck_keys)
+    res = run_batch(args.a, args.b, args.matches, args.workers or None, args.seed, deck_keys)
+
+    print(f"A = {spec_label(args.a)}   B = {spec_label(args.b)}   ({res['matches']} matches)")
+    for label, key in (("A wins", "a"), ("B wins", "b"), ("Draws ", "draw")):
+        k, p, (lo, hi) = res[key]
+        print(f"  {label}: {k:5d}  {p:6.1%}  95% CI [{lo:6.1%}, {hi:6.1%}]")
+    reasons = ", ".join(f"{k} {v}" for k, v in sorted(res["reasons"].items()))
+    print(f"  ended by: {reasons}")
+    print(f"  avg turns {res['avg_turns']:.1f}, {res['matches_per_sec']:.2f} matches/s ({res['seconds']:.1f} s)")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,212 @@
+"""
+Shared keep-alive HTTP client for all Firebase traffic.
+
+One HttpPool per base URL (get_pool()) keeps up to HTTP_POOL_SIZE idle
+http.client connections open between requests, so a request reuses an
+established TCP/TLS session instead of handshaking again, and never has
+more than HTTP_POOL_SIZE requests in flight. A request that fails on a
+reused connection (the server closed it while idle) is retried once on a
+fresh one, but only if it is a read or the request never went out: a
+write that was sent may have been applied, and sending it again would
+apply it twice. Fire-and-forget writes go through submit(), a worker pool
+one smaller than that, so they can never hold every slot between them;
+the match's own sender, polls and gap fetches always get one. stream()
+uses a connection of its own, outside the slots. Redirects (301 / 302 / 307 /
+308, as Firebase sends to move a database to another server) are followed
+through the Location header, on the target's own pool, up to
+HTTP_MAX_REDIRECTS times; the method and body are kept.
+
+Every request is timed; metrics() gives counts and p50/p99 over the last
+HTTP_METRICS_WINDOW requests.
+"""
+import json
+import time
+import socket
+import threading
+import http.client
+import urllib.parse
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import HTTP_POOL_SIZE, HTTP_TIMEOUT_S, HTTP_METRICS_WINDOW, HTTP_MAX_REDIRECTS
+
+class HttpError(OSError):
+    def __init__(self, status, reason):
+        super().__init__(f"HTTP {status} {reason}")
+        self.status = status
+
+_REDIRECTS = (301, 302, 307, 308)
+_SAFE = ("GET", "HEAD")     # retried on a fresh connection even after being sent
+
+# http.client writes the headers and body of a request separately; without
+# TCP_NODELAY a reused connection waits out the peer's delayed ACK on each.
+class _HTTPConnection(http.client.HTTPConnection):
+    def connect(self):
+        super().connect()
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    def connect(self):
+        super().connect()
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+class HttpPool:
+    def __init__(self, base_url, size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT_S):
+        url = urllib.parse.urlsplit(base_url)
+        self.https = url.scheme == "https"
+        self.host = url.hostname
+        self.port = url.port or (443 if self.https else 80)
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self._idle = []                              # idle connections, most recent last
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._size = size
+        self._executor = None
+        self._times = deque(maxlen=HTTP_METRICS_WINDOW)
+        self.requests = self.errors = self.connects = 0
+
+    def _connect(self, timeout):
+        with self._lock: self.connects += 1
+        cls = _HTTPSConnection if self.https else _HTTPConnection
+        return cls(self.host, self.port, timeout=timeout)
+
+    def _url(self, path):
+        scheme, default = ("https", 443) if self.https else ("http", 80)
+        port = "" if self.port == default else f":{self.port}"
+        return f"{scheme}://{self.host}{port}{self.prefix}{path}"
+
+    def _follow(self, path, location):
+        """The pool and path a redirect from `path` points to; a relative
+        Location resolves against the request URL."""
+        url = urllib.parse.urlsplit(urllib.parse.urljoin(self._url(path), location))
+        target = url.path + ("?" + url.query if url.query else "")
+        if (url.scheme == "https") == self.https and url.hostname == self.host \
+                and (url.port or (443 if self.https else 80)) == self.port and target.startswith(self.prefix):
+            return self, target[len(self.prefix):]
+        return get_pool(f"{url.scheme}://{url.netloc}"), target
+
+    def request(self, method, path, body=None, timeout=None):
+        """Sends one request and returns the response body (bytes); raises
+        OSError / http.client.HTTPException on failure, HttpError on 4xx/5xx
+        (or on a redirect past HTTP_MAX_REDIRECTS)."""
+        pool = self
+        for _ in range(HTTP_MAX_REDIRECTS + 1):
+            status, reason, location, data = pool._send(method, path, body, timeout)
+            if location is None: return data
+            pool, path = pool._follow(path, location)
+        with pool._lock: pool.errors += 1
+        raise HttpError(status, f"{reason} (more than {HTTP_MAX_REDIRECTS} redirects)")
+
+    def _send(self, method, path, body, timeout):
+        """One round trip: (status, reason, redirect Location or None, body)."""
+        headers = {"Connection": "keep-alive"}
+        if body is not None: headers["Content-Type"] = "application/json"
+        t0 = time.perf_counter()
+        self._slots.acquire()
+        try:
+            for attempt in (0, 1):
+                with self._lock: conn = self._idle.pop() if self._idle else None
+                reused = conn is not None
+                if conn is None: conn = self._connect(timeout or self.timeout)
+                else: conn.timeout = timeout or self.timeout
+                sent = False
+                try:
+                    conn.request(method, self.prefix + path, body=body, headers=headers)
+                    sent = True
+                    res = conn.getresponse()
+                    data = res.read()
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    # A stale keep-alive connection; a sent write may have landed.
+                    if reused and attempt == 0 and (not sent or method in _SAFE): continue
+                    raise
+                if res.will_close: conn.close()
+                else:
+                    with self._lock: self._idle.append(conn)
+                location = res.getheader("Location") if res.status in _REDIRECTS else None
+                if location is None and res.status >= 400: raise HttpError(res.status, res.reason)
+                return res.status, res.reason, location, data
+        except Exception:
+            with self._lock: self.errors += 1
+            raise
+        finally:
+            self._slots.release()
+            with self._lock:
+                self.requests += 1
+                self._times.append((time.perf_counter() - t0) * 1000)
+
+    def json(self, method, path, data=None, send=False, timeout=None):
+        """request() with a JSON body (when `send`) and a decoded JSON result."""
+        body = json.dumps(data).encode() if send else None
+        raw = self.request(method, path, body, timeout)
+        return json.loads(raw) if raw and raw != b"null" else None
+
+    def defer(self, fn, *args):
+        """Runs fn(*args) on the pool's worker threads; returns the Future."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max(1, self._size - 1), thread_name_prefix="http-pool")
+        return self._executor.submit(fn, *args)
+
+    def submit(self, method, path, data=None, send=True):
+        """json() in the background; errors are dropped, as the callers treat
+        these writes as best effort. Returns the Future."""
+        def run():
+            try: return self.json(method, path, data, send)
+            except Exception: return None
+        return self.defer(run)
+
+    @contextmanager
+    def stream(self, path, timeout=None):
+        """A long-lived GET on its own connection (outside the pool's slots),
+        yielding the open response for line-by-line reading."""
+        pool = self
+        for _ in range(HTTP_MAX_REDIRECTS + 1):
+            conn = pool._connect(timeout or self.timeout)
+            t0 = time.perf_counter()
+            try:
+                conn.request("GET", pool.prefix + path, headers={"Accept": "text/event-stream"})
+                res = conn.getresponse()
+            except BaseException:
+                conn.close()
+                raise
+            with pool._lock:
+                pool.requests += 1
+                pool._times.append((time.perf_counter() - t0) * 1000)
+            location = res.getheader("Location") if res.status in _REDIRECTS else None
+            if location is None: break
+            conn.close()
+            pool, path = pool._follow(path, location)
+        else:
+            raise HttpError(res.status, f"{res.reason} (more than {HTTP_MAX_REDIRECTS} redirects)")
+        try:
+            if res.status >= 400: raise HttpError(res.status, res.reason)
+            yield res
+        finally:
+            conn.close()
+
+    def metrics(self):
+        with self._lock:
+            times = sorted(self._times)
+            out = {"requests": self.requests, "errors": self.errors, "connects": self.connects,
+                   "idle": len(self._idle)}
+        pick = lambda q: times[min(len(times) - 1, int(q * len(times)))] if times else 0.0
+        out.update(p50_ms=pick(0.50), p99_ms=pick(0.99))
+        return out
+
+    def close(self):
+        with self._lock: idle, self._idle = self._idle, []
+        for conn in idle: conn.close()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(base_url):
+    """The shared HttpPool for a base URL."""
+    base_url = base_url.rstrip("/")
+    with _pools_lock:
+        pool = _pools.get(base_url)
+        if pool is None: pool = _pools[base_url] = HttpPool(base_url)
+        return pool
@@ -0,0 +1,287 @@
+"""
+Information-set Monte Carlo Tree Search for the bot.
+
+Every iteration deals a fresh determinization of what the bot cannot see
+(the player's hand and both deck orders), walks the shared tree with UCB
+restricted to the moves legal in that deal, then plays a few plies out on
+CompactState and scores the end position with the bot's heuristic. Trees
+grown in separate processes are merged by root visit count.
+"""
+import os
+import math
+import time
+import atexit
+import random
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from src.config import (
+    HAND_TARGET_SIZE,
+    ISMCTS_ITERATIONS, ISMCTS_TIME_MS, ISMCTS_WORKERS, ISMCTS_EXPLORATION, ISMCTS_ROLLOUT_PLIES,
+)
+from src.models import (
+    compact_from_players, compact_move_to_payload, slot_outcome,
+    CM_NUMBER, CM_PIC, CM_DISCARD, CM_DISBAND, CODE_VALUE, CODE_KING, CODE_RANK, DEFAULT_WEIGHTS,
+    _entry_value,
+)
+
+PLAYER_SIDE, BOT_SIDE = 0, 1    # side numbering of compact_from_players(player, bot)
+
+# Filled in after every decision: iterations, workers, elapsed ms, what ended
+# the search ("iterations", "time" or "stop"), iterations/sec, and pool_error
+# once the pool has failed.
+last_ismcts_stats: dict = {}
+
+# ============================================================
+# DETERMINIZATION
+# ============================================================
+# Moves are keyed by card code instead of hand index, since the player's
+# hand order differs between deals: (kind, card, slot, entry).
+def _move_key(cs, side, move):
+    kind, i, slot, ei = move
+    if kind == CM_DISBAND: return move
+    return kind, cs.hands[side][i], slot, ei
+
+def _key_move(cs, side, key):
+    kind, c, slot, ei = key
+    if kind == CM_DISBAND: return key
+    return kind, cs.hands[side].index(c), slot, ei
+
+def determinize(cs, rng):
+    """A copy of `cs` with the player's unseen cards (hand and deck) re-dealt
+    and both decks shuffled. The bot knows which cards the player still
+    holds between hand and deck, not where they are."""
+    d = cs.copy()
+    hand, deck = d.hands[PLAYER_SIDE], d.decks[PLAYER_SIDE]
+    unseen = hand + deck
+    rng.shuffle(unseen)
+    d.hands[PLAYER_SIDE], d.decks[PLAYER_SIDE] = unseen[:len(hand)], unseen[len(hand):]
+    rng.shuffle(d.decks[BOT_SIDE])
+    return d
+
+# ============================================================
+# TREE
+# ============================================================
+class _Node:
+    __slots__ = ("side", "children", "visits", "wins", "avail")
+
+    def __init__(self, side):
+        self.side = side          # who made the move leading here
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.avail = 1
+
+    def ucb(self, c):
+        return self.wins / self.visits + c * math.sqrt(math.log(self.avail) / self.visits)
+
+def _result(winner, side):
+    if winner < 0: return 0.5
+    return 1.0 if winner == side else 0.0
+
+def compact_heuristic(cs, w=DEFAULT_WEIGHTS):
+    """bot.heuristic() without a tracker, on a CompactState, from the bot's side."""
+    score = 0
+    for i in range(3):
+        pv, bv = cs.scores[PLAYER_SIDE * 3 + i], cs.scores[BOT_SIDE * 3 + i]
+        ps, bs = 21 <= pv <= 26, 21 <= bv <= 26
+        st, win = slot_outcome(pv, ps, bv, bs)
+        if st == "ready":
+            score += w.slot_win if win == "bot" else -w.slot_win
+        elif st == "tie":
+            score -= w.slot_tie
+        else:
+            score += bv * w.own_value if bv <= 26 else -(bv - 26) * w.own_bust
+            score -= pv * w.opp_value if pv <= 26 else -(pv - 26) * w.opp_bust
+        if bs: score += w.own_sale + (bv - 21) * w.own_sale_step
+        if ps: score -= w.opp_sale + (pv - 21) * w.opp_sale_step
+        if 18 <= pv <= 20: score -= w.opp_near
+        if 27 <= pv <= 29: score -= w.opp_over
+        bt = _trend(cs, BOT_SIDE * 3 + i)
+        if bv > 22 and bt > 0: score -= bt * w.own_trend
+        pt = _trend(cs, PLAYER_SIDE * 3 + i)
+        if pv > 22 and pt > 0: score += pt * w.opp_trend
+    return score
+
+def _trend(cs, slot):
+    s, cv = cs.scores[slot], cs.cavs[slot]
+    if not cv or s <= 22: return 0
+    d = cs.direction(slot)
+    if d > 0: return CODE_VALUE[cv[-1] & 63]
+    if d < 0 and s > 26: return -CODE_VALUE[cv[-1] & 63]
+    return 0
+
+def _sensible(cs, side, m):
+    """Rollout filter: no plays that push one of our own caravans past 26."""
+    kind, i, slot, ei = m
+    if slot // 3 != side or kind not in (CM_NUMBER, CM_PIC): return kind != CM_DISBAND
+    c = cs.hands[side][i]
+    if kind == CM_NUMBER: return cs.scores[slot] + CODE_VALUE[c] <= 26
+    if CODE_KING[c]: return cs.scores[slot] + _entry_value(cs.cavs[slot][ei]) <= 26    # a King doubles the entry
+    return CODE_RANK[c] != 10 or cs.scores[slot] > 26    # own Jack only to fix a bust
+
+def _rollout(cs, side, rng, weights):
+    """Short playout with a lightly filtered random policy; returns the
+    bot's expected result in [0, 1] (exact if the game ends)."""
+    for _ in range(ISMCTS_ROLLOUT_PLIES):
+        moves = cs.moves(side)
+        good = [m for m in moves if m[0] != CM_DISCARD and _sensible(cs, side, m)]
+        cs.apply(side, rng.choice(good) if good else rng.choice([m for m in moves if m[0] == CM_DISCARD]))
+        if not cs.draw(side, HAND_TARGET_SIZE): return _result(1 - side, BOT_SIDE)
+        win = cs.winner()
+        if win >= 0: return _result(win, BOT_SIDE)
+        side = 1 - side
+    return 1.0 / (1.0 + math.exp(-compact_heuristic(cs, weights) / 400))
+
+def _iterate(root, cs, rng, c, weights):
+    path, node, side, winner = [root], root, BOT_SIDE, None
+    while True:
+        legal = {_move_key(cs, side, m): m for m in cs.moves(side)}
+        kids = node.children
+        untried = [k for k in legal if k not in kids]
+        for k in legal:
+            if k in kids: kids[k].avail += 1
+        if untried:
+            k = rng.choice(untried)
+            kids[k] = child = _Node(side)
+        else:
+            k = max(legal, key=lambda k: kids[k].ucb(c))
+            child = kids[k]
+        cs.apply(side, legal[k])
+        path.append(child)
+        node = child
+        if not cs.draw(side, HAND_TARGET_SIZE):
+            winner = 1 - side
+            break
+        win = cs.winner()
+        if win >= 0:
+            winner = win
+            break
+        side = 1 - side
+        if untried: break
+    r = _rollout(cs, side, rng, weights) if winner is None else _result(winner, BOT_SIDE)
+    for n in path:
+        n.visits += 1
+        n.wins += r if n.side == BOT_SIDE else 1.0 - r
+
+def run_ismcts(cs, iterations, time_ms, seed, c=ISMCTS_EXPLORATION, stop=None, weights=DEFAULT_WEIGHTS):
+    """Grows one tree from `cs` (bot to move). Returns ({move key: visits}, iterations)."""
+    rng = random.Random(seed)
+    root = _Node(PLAYER_SIDE)
+    deadline = time.perf_counter() + time_ms / 1000 if time_ms else None
+    n = 0
+    while n < iterations:
+        _iterate(root, determinize(cs, rng), rng, c, weights)
+        n += 1
+        if not n & 15:
+            if deadline is not None and time.perf_counter() > deadline: break
+            if stop is not None and stop.is_set(): break
+    return {k: ch.visits for k, ch in root.children.items()}, n
+
+# ============================================================
+# PROCESS POOL
+# ============================================================
+# A threading.Event cannot reach other processes, so every pool shares one
+# multiprocessing.Event, handed to the workers when they start: _search sets
+# it once the caller's `stop` is set, and each worker's run_ismcts sees it
+# within 16 iterations. One search uses the pool at a time (bot decisions
+# are serialised), so one event is enough.
+# Workers are spawned, not forked: the pool is first needed on the
+# BotThinker thread, and forking a process that runs other threads (pygame,
+# the network loops) can deadlock the child.
+_MP = multiprocessing.get_context("spawn")
+_pool = None
+_pool_workers = 0
+_pool_enabled = True
+_pool_stop = None
+_worker_stop = None      # _pool_stop, inside a worker
+pool_error = ""          # why the pool was turned off, if it failed
+
+def _init_worker(stop):
+    global _worker_stop
+    _worker_stop = stop
+
+def _run_pooled(cs, iterations, time_ms, seed, weights):
+    return run_ismcts(cs, iterations, time_ms, seed, stop=_worker_stop, weights=weights)
+
+def default_workers():
+    return ISMCTS_WORKERS if ISMCTS_WORKERS > 0 else (os.cpu_count() or 1)
+
+def set_pool_enabled(enabled):
+    """Turns the worker pool off (e.g. inside processes that are themselves pool workers)."""
+    global _pool_enabled
+    _pool_enabled = enabled
+    if not enabled: shutdown_pool()
+
+def _get_pool(workers):
+    global _pool, _pool_workers, _pool_stop
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _pool_stop = _MP.Event()
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_MP, initializer=_init_worker,
+                                    initargs=(_pool_stop,))
+        _pool_workers = workers
+    return _pool
+
+def shutdown_pool():
+    global _pool, _pool_workers, _pool_stop
+    if _pool is not None:
+        _pool_stop.set()
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool, _pool_workers, _pool_stop = None, 0, None
+
+atexit.register(shutdown_pool)
+
+def _search(cs, iterations, time_ms, workers, stop=None, weights=DEFAULT_WEIGHTS):
+    global pool_error
+    seeds = [random.getrandbits(32) for _ in range(workers)]
+    if workers > 1 and _pool_enabled:
+        per = max(1, iterations // workers)
+        try:
+            pool = _get_pool(workers)
+            _pool_stop.clear()
+            futures = [pool.submit(_run_pooled, cs, per, time_ms, s, weights) for s in seeds]
+            if stop is not None:
+                while wait(futures, timeout=0.02).not_done:
+                    if stop.is_set():
+                        _pool_stop.set()
+                        break
+            return [f.result() for f in futures]
+        except Exception as e:
+            pool_error = f"{type(e).__name__}: {e}"
+            set_pool_enabled(False)
+    return [run_ismcts(cs, iterations, time_ms, seeds[0], stop=stop, weights=weights)]
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+def ismcts_choose_move(bot, player, iterations=None, time_ms=None, workers=None, stop=None,
+                       weights=DEFAULT_WEIGHTS):
+    """Picks the bot's move as (mtype, payload). Stops at `iterations` in
+    total or after `time_ms`, whichever comes first, or once `stop` is set
+    (pool workers follow within about 20 ms and 16 iterations)."""
+    if iterations is None: iterations = ISMCTS_ITERATIONS
+    if time_ms is None: time_ms = ISMCTS_TIME_MS
+    if workers is None: workers = default_workers()
+    t0 = time.perf_counter()
+    cs = compact_from_players(player, bot)
+    legal = cs.moves(BOT_SIDE)
+    if not legal:
+        last_ismcts_stats.clear()
+        return "discard", {"card_idx": 0}
+    visits, total = {}, 0
+    for counts, n in _search(cs, iterations, time_ms, workers, stop, weights):
+        total += n
+        for k, v in counts.items(): visits[k] = visits.get(k, 0) + v
+    if visits:
+        key = max(visits, key=visits.get)
+        move = _key_move(cs, BOT_SIDE, key)
+    else:
+        move = legal[0]
+    ms = (time.perf_counter() - t0) * 1000
+    cut = "stop" if stop is not None and stop.is_set() else "time" if ms >= time_ms else "iterations"
+    last_ismcts_stats.clear()
+    last_ismcts_stats.update(iterations=total, workers=workers, ms=ms, cut=cut,
+                             ips=total / ms * 1000 if ms else 0.0)
+    if pool_error: last_ismcts_stats["pool_error"] = pool_error
+    return compact_move_to_payload(BOT_SIDE, move)
@@ -0,0 +1,138 @@
+"""
+Learned linear evaluation, an alternative to bot.heuristic().
+
+features() describes a position from the bot's side as a fixed vector; a
+logistic model trained on self-play results (tools/train_linear_eval.py)
+turns it into a win logit. The three slots share weights (their features
+are summed), so the model does not care which slot is which. Candidate
+positions are scored together, one row each, in a single matrix product.
+
+NumPy is optional (requirements.txt lists it for this module and
+src/vecenv.py): without it, or without a usable weights file, get_eval()
+returns None and the "linear" strategy plays with the hand-written
+heuristic; `unavailable` says why.
+
+Weights file (JSON):
+  "features": [names]     must equal FEATURE_NAMES
+  "weights":  [floats]    one per feature, logit units
+  "trained":  {..}        free-form provenance (matches, rows, accuracy)
+"""
+import os
+import json
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.models import slot_outcome
+
+# Logit -> heuristic-sized units, so personality bonuses and noise keep their meaning.
+EVAL_SCALE = 400
+
+_BUCKETS = ((0, 10), (11, 17), (18, 20), (21, 26), (27, 29), (30, 1 << 30))
+_SIDE = tuple(f"b{lo}_{hi}" for lo, hi in _BUCKETS[:-1]) + ("b30+", "score", "up", "down", "trend", "cards")
+FEATURE_NAMES = (
+    tuple(f"own_{n}" for n in _SIDE) + tuple(f"opp_{n}" for n in _SIDE)
+    + ("won", "lost", "tied")
+    + ("won*lost", "won^2", "lost^2")
+    + ("hand_num", "hand_J", "hand_Q", "hand_K", "hand_JKR", "own_deck", "opp_deck", "bias")
+)
+N_FEATURES = len(FEATURE_NAMES)
+_HAND_SLOT = {"J": 1, "Q": 2, "K": 3, "JKR": 4}
+
+def _side(x, o, cav):
+    s = cav.score()
+    for k, (lo, hi) in enumerate(_BUCKETS):
+        if lo <= s <= hi:
+            x[o + k] += 1.0
+            break
+    x[o + 6] += s / 26
+    d = cav.effective_direction()
+    if d == "up": x[o + 7] += 1.0
+    elif d == "down": x[o + 8] += 1.0
+    x[o + 9] += cav.trend() / 10
+    x[o + 10] += len(cav.nums) / 5
+
+def features(player, bot):
+    """Feature vector (list of floats, FEATURE_NAMES order) of the position, from the bot's side."""
+    x = [0.0] * N_FEATURES
+    won = lost = 0
+    for i in range(3):
+        bc, pc = bot.caravans[i], player.caravans[i]
+        _side(x, 0, bc)
+        _side(x, 11, pc)
+        st, w = slot_outcome(pc.score(), pc.for_sale(), bc.score(), bc.for_sale())
+        if st == "ready":
+            if w == "bot": won += 1
+            else: lost += 1
+        elif st == "tie":
+            x[24] += 1.0
+    x[22], x[23] = float(won), float(lost)
+    x[25], x[26], x[27] = float(won * lost), float(won * won), float(lost * lost)
+    for c in bot.hand: x[28 + _HAND_SLOT.get(c.rank, 0)] += 1.0
+    x[33], x[34], x[35] = len(bot.deck) / 54, len(player.deck) / 54, 1.0
+    return x
+
+# ============================================================
+# MODEL
+# ============================================================
+class LinearEval:
+    def __init__(self, weights, trained=None):
+        self.w = np.asarray(weights, dtype=np.float64)
+        self.trained = trained or {}
+
+    def score_rows(self, rows):
+        """Heuristic-sized scores for a batch of feature rows, in one product."""
+        return np.asarray(rows, dtype=np.float64) @ self.w * EVAL_SCALE
+
+    def score(self, player, bot):
+        return float(self.score_rows([features(player, bot)])[0])
+
+    def to_dict(self):
+        return {"features": list(FEATURE_NAMES), "weights": [float(v) for v in self.w], "trained": self.trained}
+
+def fit_logistic(X, y, l2=1e-3, iters=25):
+    """Newton's method (IRLS) for L2-regularised logistic regression; y in [0, 1]."""
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    w = np.zeros(X.shape[1])
+    reg = l2 * len(y) * np.eye(X.shape[1])
+    reg[-1, -1] = 0.0                                   # bias is not shrunk
+    for _ in range(iters):
+        p = 1.0 / (1.0 + np.exp(-(X @ w)))
+        g = X.T @ (p - y) + reg @ w
+        H = (X * (p * (1 - p))[:, None]).T @ X + reg
+        step = np.linalg.solve(H, g)
+        w -= step
+        if np.abs(step).max() < 1e-6: break
+    return w
+
+def save_eval(model, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(model.to_dict(), f, indent=1)
+    os.replace(tmp, path)
+
+_model = None
+_loaded = False
+unavailable = ""    # why get_eval() returned None, once it has been called
+
+def get_eval():
+    """The trained model, loaded on first use; None without NumPy or a usable weights file."""
+    global _model, _loaded, unavailable
+    if _loaded: return _model
+    _loaded = True
+    from src.config import LINEAR_EVAL_FILE
+    if np is None:
+        unavailable = "NumPy is not installed"
+    elif not os.path.exists(LINEAR_EVAL_FILE):
+        unavailable = f"no weights file at {LINEAR_EVAL_FILE}"
+    else:
+        try:
+            with open(LINEAR_EVAL_FILE, "r", encoding="utf-8") as f: data = json.load(f)
+            if tuple(data["features"]) != FEATURE_NAMES:
+                unavailable = "the weights were trained on other features"
+            else:
+                _model = LinearEval(data["weights"], data.get("trained"))
+        except Exception as e:
+            unavailable = f"failed to load the weights: {e}"
+    return _model
@@ -1,16 +1,51 @@
 import os
 import json
 import random
+from array import array
 from dataclasses import dataclass, field
 from typing import List, Tuple, Dict, Any, Optional
 import src.state as state
-from src.config import T, DECK_FILE, SUIT_SYMBOL, SUIT_COLOR
-from src.achievements import unlock_achievement
+from src.config import T, DECK_FILE, SUIT_SYMBOL, SUIT_COLOR, CARAVAN_CACHE_DEBUG
 from src.security import secure_save, secure_load
 
 # ============================================================
 # BOT PERSONALITIES
 # ============================================================
+@dataclass(frozen=True)
+class HeuristicWeights:
+    """Constants of bot.heuristic(); tuned offline by tools/tune_weights.py."""
+    slot_win:      int = 600    # slot decided in the bot's favour (negated if lost)
+    slot_tie:      int = 120
+    own_value:     int = 4      # per point on an undecided bot caravan <= 26
+    own_bust:      int = 60     # per point over 26
+    opp_value:     int = 4
+    opp_bust:      int = 30
+    own_sale:      int = 250    # bot caravan in 21-26 ...
+    own_sale_step: int = 20     # ... plus this per point over 21
+    opp_sale:      int = 320
+    opp_sale_step: int = 24
+    opp_near:      int = 120    # player caravan at 18-20
+    opp_over:      int = 90     # player caravan at 27-29
+    own_trend:     int = 8      # per point the bot's top card pushes past 22
+    opp_trend:     int = 6
+    jack_threat:   int = 25     # % of a won slot at risk when the player surely holds a Jack
+    own_draw:      int = 80     # per open bot caravan under 21, times the chance the next draw sells it
+    salt:          int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Mixed into transposition-table keys so differently weighted bots never share entries.
+        object.__setattr__(self, "salt", hash(tuple(getattr(self, f) for f in HEURISTIC_WEIGHT_FIELDS))
+                           & ((1 << 64) - 1))
+
+    def to_dict(self): return {f: getattr(self, f) for f in HEURISTIC_WEIGHT_FIELDS}
+
+HEURISTIC_WEIGHT_FIELDS = (
+    "slot_win", "slot_tie", "own_value", "own_bust", "opp_value", "opp_bust", "own_sale",
+    "own_sale_step", "opp_sale", "opp_sale_step", "opp_near", "opp_over", "own_trend", "opp_trend",
+    "jack_threat", "own_draw",
+)
+DEFAULT_WEIGHTS = HeuristicWeights()
+
 @dataclass
 class BotPersonality:
     key:         str
@@ -20,6 +55,7 @@ class BotPersonality:
     defense_bias: int        # extra score when playing for self
     commentary:  List[str]  # random lines shown as bot messages
     delay_mult:  float      # multiplier on BOT_DELAY_MS
+    weights:     HeuristicWeights = DEFAULT_WEIGHTS
 
 BENNY = BotPersonality(
     key="benny", display_key="bot_benny",
@@ -71,22 +107,46 @@ def get_bot_delay_ms(diff: str, personality_key: str = DEFAULT_PERSONALITY) -> i
     pers = PERSONALITIES.get(personality_key, BENNY)
     return max(500, int(base * getattr(pers, "delay_mult", 1.0)))
 
+def apply_bot_weights(data: Dict[str, Any]):
+    """Applies a weights dict (see tools/tune_weights.py): "heuristic" goes to
+    every personality, "personalities" overrides per-personality biases."""
+    known = {f: int(v) for f, v in data.get("heuristic", {}).items() if f in HEURISTIC_WEIGHT_FIELDS}
+    for key, pers in PERSONALITIES.items():
+        if known: pers.weights = HeuristicWeights(**{**pers.weights.to_dict(), **known})
+        over = data.get("personalities", {}).get(key, {})
+        if "attack_bias" in over:  pers.attack_bias = int(over["attack_bias"])
+        if "defense_bias" in over: pers.defense_bias = int(over["defense_bias"])
+        if "noise" in over:        pers.noise = {**pers.noise, **{k: int(v) for k, v in over["noise"].items()}}
+
+def load_bot_weights(path=None) -> bool:
+    """Loads tuned bot weights if the file exists; the built-in values stay otherwise."""
+    from src.config import BOT_WEIGHTS_FILE
+    path = path or BOT_WEIGHTS_FILE
+    if not os.path.exists(path): return False
+    try:
+        with open(path, "r", encoding="utf-8") as f: apply_bot_weights(json.load(f))
+        return True
+    except Exception as e:
+        print(f"Failed to load bot weights: {e}")
+        return False
+
 
 # ============================================================
 # CARD DATACLASSES
 # ============================================================
+RANKS = ("A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K")
+SUITS = ("S", "H", "D", "C")
+_RANK_VALUE = {r: (i + 1 if i < 10 else 0) for i, r in enumerate(RANKS)}
+_PICTURE_RANKS = frozenset(("J", "Q", "K", "JKR"))
+
 @dataclass(frozen=True)
 class Card:
     rank: str
     suit: Optional[str] = None
 
-    def is_number(self): return self.rank == "A" or self.rank.isdigit()
-    def is_picture(self): return self.rank in ("J", "Q", "K", "JKR")
-
-    def value(self):
-        if self.rank == "A": return 1
-        if self.rank.isdigit(): return int(self.rank)
-        return 0
+    def is_number(self): return _RANK_VALUE.get(self.rank, 0) > 0
+    def is_picture(self): return self.rank in _PICTURE_RANKS
+    def value(self): return _RANK_VALUE.get(self.rank, 0)
 
     def label(self):
         if self.rank == "JKR":
@@ -112,10 +172,28 @@ class Card:
 class NumEntry:
     card: Card
     pics: List[Card] = field(default_factory=list)
+    _cav: Optional["Caravan"] = field(default=None, init=False, repr=False, compare=False)
 
     def kings_count(self): return sum(1 for p in self.pics if p.rank == "K")
     def effective_value(self): return self.card.value() * (2 ** self.kings_count())
 
+    def attach(self, pic):
+        """Attaches a picture card and keeps the owning caravan's cache current."""
+        if self._cav is None: self.pics.append(pic); return
+        self._cav._hash ^= _z_pic(self.card, len(self.pics), pic)
+        self._cav._change_entry(self, self.pics.append, pic)
+
+    def detach(self):
+        """Removes the most recently attached picture (undo of attach)."""
+        if self._cav is None: return self.pics.pop()
+        self._cav._hash ^= _z_pic(self.card, len(self.pics) - 1, self.pics[-1])
+        return self._cav._change_entry(self, self.pics.pop)
+
+    def _zobrist(self):
+        h = 0
+        for k, pc in enumerate(self.pics): h ^= _z_pic(self.card, k, pc)
+        return h
+
     def tooltip_lines(self):
         lines = [self.card.display_name(), T("base_value", self.card.value())]
         if self.pics:
@@ -127,31 +205,148 @@ class NumEntry:
 
 @dataclass
 class Caravan:
+    """A caravan row. Score, effective direction and effective suit are cached
+    and kept current by push/insert/remove_at/clear/restore and
+    NumEntry.attach/detach, so mutate `nums` only through those. The same
+    paths maintain per-rank and per-suit entry counts for Joker lookups."""
     nums: List[NumEntry] = field(default_factory=list)
+    _score: int = field(default=0, init=False, repr=False, compare=False)
+    _dir: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _suit: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _ranks: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _suits: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _hash: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self): self.restore(self.nums)
 
     def empty(self): return len(self.nums) == 0
     def top(self): return self.nums[-1] if self.nums else None
 
-    def base_direction(self):
-        if len(self.nums) < 2: return None
-        a, b = self.nums[-2].card.value(), self.nums[-1].card.value()
-        return "up" if b > a else "down" if b < a else None
-
-    def effective_direction(self):
+    # ── mutation (cache-maintaining) ─────────────────────────
+    def push(self, ne):
+        self._hash ^= _z_link(self.nums[-1].card if self.nums else None, ne.card) ^ ne._zobrist()
+        self._index(ne, 1)
+        self.nums.append(ne)
+        self._score += ne.effective_value()
+        self._refresh_top()
+
+    def insert(self, idx, ne):
+        self._hash ^= self._z_splice(idx, ne, idx) ^ ne._zobrist()
+        self._index(ne, 1)
+        self.nums.insert(idx, ne)
+        self._score += ne.effective_value()
+        if idx >= len(self.nums) - 2: self._refresh_top()
+
+    def remove_at(self, idx):
+        if idx < 0: idx += len(self.nums)
+        near_top = idx >= len(self.nums) - 2
+        ne = self.nums[idx]
+        self._hash ^= self._z_splice(idx, ne, idx + 1) ^ ne._zobrist()
+        self.nums.pop(idx)
+        self._index(ne, -1)
+        self._score -= ne.effective_value()
+        if near_top: self._refresh_top()
+        return ne
+
+    def clear(self):
+        """Empties the caravan and returns the old entry list untouched."""
+        old = self.nums
+        for ne in old: ne._cav = None
+        self.nums = []
+        self._score, self._dir, self._suit = 0, None, None
+        self._ranks, self._suits = {}, {}
+        self._hash = 0
+        return old
+
+    def restore(self, nums):
+        self.nums = nums
+        self._ranks, self._suits = {}, {}
+        for ne in nums: self._index(ne, 1)
+        self._hash = self._compute_hash()
+        self._score = self._compute_score()
+        self._refresh_top()
+
+    def _index(self, ne, delta):
+        ne._cav = self if delta > 0 else None
+        r, s = ne.card.rank, ne.card.suit
+        self._ranks[r] = self._ranks.get(r, 0) + delta
+        self._suits[s] = self._suits.get(s, 0) + delta
+
+    def _z_splice(self, idx, ne, nxt_idx):
+        """Link keys that change when `ne` goes in (or out) between nums[idx-1] and nums[nxt_idx]."""
+        prev = self.nums[idx - 1].card if idx > 0 else None
+        nxt = self.nums[nxt_idx].card if nxt_idx < len(self.nums) else None
+        h = _z_link(prev, ne.card)
+        if nxt is not None: h ^= _z_link(prev, nxt) ^ _z_link(ne.card, nxt)
+        return h
+
+    def count_rank(self, rank): return self._ranks.get(rank, 0)
+    def count_suit(self, suit): return self._suits.get(suit, 0)
+
+    def _change_entry(self, ne, fn, *args):
+        before = ne.effective_value()
+        out = fn(*args)
+        self._score += ne.effective_value() - before
+        if ne is self.top(): self._refresh_top()
+        return out
+
+    def _refresh_top(self):
+        self._dir = self._compute_direction()
+        self._suit = self._compute_suit()
+
+    # ── full recompute (cache source of truth) ───────────────
+    def _compute_score(self): return sum(ne.effective_value() for ne in self.nums)
+
+    def _compute_hash(self):
+        h, prev = 0, None
+        for ne in self.nums:
+            h ^= _z_link(prev, ne.card) ^ ne._zobrist()
+            prev = ne.card
+        return h
+
+    def _compute_direction(self):
         base = self.base_direction()
         if base is None: return None
-        top = self.top()
-        if not top: return base
-        q = sum(1 for p in top.pics if p.rank == "Q")
+        q = sum(1 for p in self.nums[-1].pics if p.rank == "Q")
         return ("down" if base == "up" else "up") if q % 2 == 1 else base
 
-    def effective_suit(self):
+    def _compute_suit(self):
         top = self.top()
         if not top: return None
         queens = [p for p in top.pics if p.rank == "Q" and p.suit in SUIT_SYMBOL]
         return queens[-1].suit if queens else top.card.suit
 
-    def score(self): return sum(ne.effective_value() for ne in self.nums)
+    def _verify_cache(self):
+        got = (self._score, self._dir, self._suit,
+               {k: v for k, v in self._ranks.items() if v}, {k: v for k, v in self._suits.items() if v},
+               self._hash)
+        ranks, suits = {}, {}
+        for ne in self.nums:
+            ranks[ne.card.rank] = ranks.get(ne.card.rank, 0) + 1
+            suits[ne.card.suit] = suits.get(ne.card.suit, 0) + 1
+        want = (self._compute_score(), self._compute_direction(), self._compute_suit(), ranks, suits,
+                self._compute_hash())
+        if got != want:
+            raise RuntimeError(f"Caravan cache out of sync: cached {got}, actual {want}")
+
+    # ── queries ──────────────────────────────────────────────
+    def base_direction(self):
+        if len(self.nums) < 2: return None
+        a, b = self.nums[-2].card.value(), self.nums[-1].card.value()
+        return "up" if b > a else "down" if b < a else None
+
+    def effective_direction(self):
+        if CARAVAN_CACHE_DEBUG: self._verify_cache()
+        return self._dir
+
+    def effective_suit(self):
+        if CARAVAN_CACHE_DEBUG: self._verify_cache()
+        return self._suit
+
+    def score(self):
+        if CARAVAN_CACHE_DEBUG: self._verify_cache()
+        return self._score
+
     def for_sale(self): return 21 <= self.score() <= 26
 
     def trend(self):
@@ -212,10 +407,11 @@ def ensure_min30_selection(keys):
     while len(keys) < 30 and pool: keys.append(pool.pop())
     return keys
 
-def draw_to_hand(p, target):
+def draw_to_hand(p, target, observer=None):
     while len(p.hand) < target:
         if not p.deck: return False
         p.hand.append(p.deck.pop())
+        _emit(observer, "card_drawn", actor=p, card=p.hand[-1])
     return True
 
 def move_card_to_discard(p, c): p.discard.append(c)
@@ -228,6 +424,18 @@ def move_entry_to_discard(p, entry):
 # ============================================================
 # GAME RULES
 # ============================================================
+# The rules never touch achievements, sounds or effects. Functions that a
+# real match calls take an optional `observer(event, **data)` and report
+# notable outcomes through it; simulations simply pass none.
+#   "caravan_26"   actor, cav      a number play brought a caravan to 26
+#   "jack_on_ten"  actor           a Jack removed an entry worth 10
+#   "joker_sweep"  actor, removed  a Joker was played (removed = entries hit)
+#   "opening_deal" actor, cav      bot_opening_play placed a card
+#   "card_drawn"   actor, card     a card left the actor's deck for the hand
+#   "card_shown"   actor, card     a hand card was played or discarded
+def _emit(observer, event, **data):
+    if observer is not None: observer(event, **data)
+
 def can_attach_picture(entry): return len(entry.pics) < 3
 
 def can_play_number_on_caravan(card, caravan):
@@ -251,60 +459,79 @@ def can_play_picture_on_target(pic, entry, is_last):
     return True
 
 def apply_jack(actor, caravan, idx):
-    entry = caravan.nums.pop(idx)
+    entry = caravan.remove_at(idx)
     move_entry_to_discard(actor, entry)
 
-def apply_king(entry, king): entry.pics.append(king)
-def apply_queen(entry, queen): entry.pics.append(queen)
-
-def apply_joker(actor, p1, p2, target_entry, joker_card):
-    target_entry.pics.append(joker_card)
-    tgt_rank = target_entry.card.rank
-    tgt_suit = target_entry.card.suit
-    def should_remove(ne):
-        if ne is target_entry: return False
-        return ne.card.suit == tgt_suit if tgt_rank == "A" else ne.card.rank == tgt_rank
-    removed = 0
+def apply_king(entry, king): entry.attach(king)
+def apply_queen(entry, queen): entry.attach(queen)
+
+def _joker_counts(cav, target_entry):
+    """Entries in `cav` a Joker on target_entry removes: an Ace target hits
+    its suit, anything else hits its rank. Never counts the target itself."""
+    card = target_entry.card
+    if card.rank == "A":
+        n = cav.count_suit(card.suit)
+        return n - (target_entry._cav is cav)
+    n = cav.count_rank(card.rank)
+    return n - (target_entry._cav is cav)
+
+def joker_hits(p1, p2, target_entry):
+    """How many entries a Joker on target_entry would remove, from the
+    caravan indexes only (no scan, no simulation)."""
+    return sum(_joker_counts(cav, target_entry) for owner in (p1, p2) for cav in owner.caravans)
+
+def _joker_sweep(actor, p1, p2, target_entry):
+    """Removes every entry the Joker on target_entry hits. Caravans with no
+    hit are skipped via the index. Returns (caravan, index, entry) records
+    in ascending index order per caravan."""
+    tgt = target_entry.card
+    by_suit = tgt.rank == "A"
+    removed = []
     for owner in (p1, p2):
         for cav in owner.caravans:
-            keep, rem = [], []
-            for ne in cav.nums:
-                (rem if should_remove(ne) else keep).append(ne)
-            for ne in rem:
-                move_entry_to_discard(actor, ne)
-                removed += 1
-            cav.nums = keep
-    if removed >= 3: unlock_achievement("JOKER_BOMB")
-
-def discard_hand_card(actor, idx):
+            if _joker_counts(cav, target_entry) <= 0: continue
+            hits = [k for k, ne in enumerate(cav.nums) if ne is not target_entry and
+                    (ne.card.suit == tgt.suit if by_suit else ne.card.rank == tgt.rank)]
+            for k in hits:
+                removed.append((cav, k, cav.nums[k]))
+                move_entry_to_discard(actor, cav.nums[k])
+            for k in reversed(hits): cav.remove_at(k)
+    return removed
+
+def apply_joker(actor, p1, p2, target_entry, joker_card, observer=None):
+    target_entry.attach(joker_card)
+    removed = _joker_sweep(actor, p1, p2, target_entry)
+    _emit(observer, "joker_sweep", actor=actor, removed=len(removed))
+
+def discard_hand_card(actor, idx, observer=None):
     if not (0 <= idx < len(actor.hand)): return False
-    move_card_to_discard(actor, actor.hand.pop(idx))
+    card = actor.hand.pop(idx)
+    move_card_to_discard(actor, card)
+    _emit(observer, "card_shown", actor=actor, card=card)
     return True
 
 def disband_caravan(actor, cav_i):
     if cav_i not in (0, 1, 2): return False
     cav = actor.caravans[cav_i]
     if cav.empty(): return False
-    for ne in cav.nums: move_entry_to_discard(actor, ne)
-    cav.nums = []
+    for ne in cav.clear(): move_entry_to_discard(actor, ne)
     return True
 
-def play_number(actor, card_idx, cav_i):
+def play_number(actor, card_idx, cav_i, observer=None):
     if not (0 <= card_idx < len(actor.hand)): return False, "No such card."
     if cav_i not in (0, 1, 2): return False, "Invalid caravan."
     card = actor.hand[card_idx]
     if not card.is_number(): return False, "Not a number card."
     if not can_play_number_on_caravan(card, actor.caravans[cav_i]):
         return False, "Invalid play."
-    actor.caravans[cav_i].nums.append(NumEntry(card=card))
+    actor.caravans[cav_i].push(NumEntry(card=card))
     actor.hand.pop(card_idx)
-    sc = actor.caravans[cav_i].score()
-    if sc == 26:
-        unlock_achievement("PERFECT_26")
-        state.deferred_bursts.append(("cav26", cav_i, actor.name))
+    _emit(observer, "card_shown", actor=actor, card=card)
+    if actor.caravans[cav_i].score() == 26:
+        _emit(observer, "caravan_26", actor=actor, cav=cav_i)
     return True, ""
 
-def play_picture(actor, opponent, card_idx, target_owner, cav_i, entry_i):
+def play_picture(actor, opponent, card_idx, target_owner, cav_i, entry_i, observer=None):
     if not (0 <= card_idx < len(actor.hand)): return False, "No such card."
     pic = actor.hand[card_idx]
     if not pic.is_picture(): return False, "Not a face card."
@@ -316,15 +543,97 @@ def play_picture(actor, opponent, card_idx, target_owner, cav_i, entry_i):
     if not can_play_picture_on_target(pic, entry, is_last):
         return False, "Invalid (Q=last card only / limit 3)."
     if pic.rank == "J":
-        if entry.effective_value() == 10: unlock_achievement("JACK_ATTACK")
+        if entry.effective_value() == 10: _emit(observer, "jack_on_ten", actor=actor)
         apply_jack(actor, cav, entry_i)
     elif pic.rank == "K": apply_king(entry, pic)
     elif pic.rank == "Q": apply_queen(entry, pic)
-    elif pic.rank == "JKR": apply_joker(actor, actor, opponent, entry, pic)
+    elif pic.rank == "JKR": apply_joker(actor, actor, opponent, entry, pic, observer)
     actor.hand.pop(card_idx)
+    _emit(observer, "card_shown", actor=actor, card=pic)
     return True, ""
 
 
+# ============================================================
+# REVERSIBLE MOVES
+# ============================================================
+# Moves use the same (mtype, payload) pairs as the bot:
+#   ("play_number", {"card_idx", "cav"})
+#   ("play_pic",    {"card_idx", "owner", "cav", "entry"})   owner "bot" = actor
+#   ("discard",     {"card_idx"})
+#   ("disband",     {"cav"})
+# make_move() applies one in place and returns an undo record (None if the
+# move is illegal, state untouched). unmake_move() reverts it exactly, so
+# search code can evaluate candidates without cloning either player.
+# No achievements or effects are triggered here.
+
+def make_move(actor, opponent, mtype, payload):
+    i = payload.get("card_idx", -1)
+    if mtype == "play_number":
+        ci = payload["cav"]
+        if not (0 <= i < len(actor.hand)) or ci not in (0, 1, 2): return None
+        card = actor.hand[i]
+        if not can_play_number_on_caravan(card, actor.caravans[ci]): return None
+        actor.caravans[ci].push(NumEntry(card=card))
+        actor.hand.pop(i)
+        return ("n", i, ci)
+    if mtype == "play_pic":
+        ci, ei = payload["cav"], payload["entry"]
+        if not (0 <= i < len(actor.hand)) or ci not in (0, 1, 2): return None
+        tgt = actor if payload["owner"] == "bot" else opponent
+        cav = tgt.caravans[ci]
+        if not (0 <= ei < len(cav.nums)): return None
+        pic, ne = actor.hand[i], cav.nums[ei]
+        if not can_play_picture_on_target(pic, ne, ei == len(cav.nums) - 1): return None
+        if pic.rank == "J":
+            apply_jack(actor, cav, ei)
+            undo = ("j", i, pic, cav, ei, ne)
+        elif pic.rank == "JKR":
+            ne.attach(pic)
+            undo = ("x", i, pic, ne, _joker_sweep(actor, actor, opponent, ne))
+        else:
+            ne.attach(pic)
+            undo = ("p", i, pic, ne)
+        actor.hand.pop(i)
+        return undo
+    if mtype == "discard":
+        return ("d", i) if discard_hand_card(actor, i) else None
+    if mtype == "disband":
+        ci = payload["cav"]
+        old = actor.caravans[ci].nums if ci in (0, 1, 2) else None
+        return ("b", ci, old) if disband_caravan(actor, ci) else None
+    return None
+
+def _undiscard_entry(actor, ne):
+    del actor.discard[-(1 + len(ne.pics)):]
+
+def unmake_move(actor, opponent, undo):
+    kind = undo[0]
+    if kind == "n":
+        _, i, ci = undo
+        actor.hand.insert(i, actor.caravans[ci].remove_at(-1).card)
+    elif kind == "j":
+        _, i, pic, cav, ei, ne = undo
+        _undiscard_entry(actor, ne)
+        cav.insert(ei, ne)
+        actor.hand.insert(i, pic)
+    elif kind == "x":
+        _, i, pic, ne, removed = undo
+        for cav, k, rne in reversed(removed): _undiscard_entry(actor, rne)
+        for cav, k, rne in removed: cav.insert(k, rne)
+        ne.detach()
+        actor.hand.insert(i, pic)
+    elif kind == "p":
+        _, i, pic, ne = undo
+        ne.detach()
+        actor.hand.insert(i, pic)
+    elif kind == "d":
+        actor.hand.insert(undo[1], actor.discard.pop())
+    elif kind == "b":
+        _, ci, old = undo
+        for ne in reversed(old): _undiscard_entry(actor, ne)
+        actor.caravans[ci].restore(old)
+
+
 # ============================================================
 # WIN CONDITIONS
 # ============================================================
@@ -371,7 +680,7 @@ def take_snapshot(player, bot):
 def restore_snapshot(snapshot):
     return snapshot[0], snapshot[1]
 
-def bot_opening_play(bot):
+def bot_opening_play(bot, observer=None):
     # Find an empty caravan slot
     empty_idx = -1
     for i in range(3):
@@ -389,10 +698,324 @@ def bot_opening_play(bot):
     if card_idx == -1:
         # If no number cards, bot must discard a card
         if bot.hand:
-            discard_hand_card(bot, 0)
+            discard_hand_card(bot, 0, observer)
         return
     # Play the card on the empty caravan
-    if state.sounds:
-        state.sounds.play("deal")
     card = bot.hand.pop(card_idx)
-    bot.caravans[empty_idx].nums.append(NumEntry(card=card))
+    bot.caravans[empty_idx].push(NumEntry(card=card))
+    _emit(observer, "card_shown", actor=bot, card=card)
+    _emit(observer, "opening_deal", actor=bot, cav=empty_idx)
+
+
+# ============================================================
+# COMPACT STATE (simulation)
+# ============================================================
+# Cards are small ints: suit * 13 + rank index for the 52 suited cards,
+# JOKER_CODE for either Joker. A caravan entry is one packed int:
+#   bits 0-5 card code, bits 6-11 / 12-17 / 18-23 attached pictures
+# in play order, NO_CARD (63) in unused picture slots. Every per-card
+# question is a lookup in the CODE_* tables.
+JOKER_CODE = 52
+NO_CARD    = 63
+_EMPTY_PICS = (NO_CARD << 6) | (NO_CARD << 12) | (NO_CARD << 18)
+
+CODE_CARD:   List[Optional[Card]] = [None] * 64
+CODE_VALUE:  List[int] = [0] * 64     # 1..10 for numbers, 0 otherwise
+CODE_RANK:   List[int] = [-1] * 64    # index into RANKS, 13 for a Joker
+CODE_SUIT:   List[int] = [-1] * 64    # index into SUITS, -1 for a Joker
+CODE_NUMBER: List[bool] = [False] * 64
+CODE_PIC:    List[bool] = [False] * 64
+CODE_KING:   List[int] = [0] * 64
+CODE_QUEEN:  List[int] = [0] * 64
+
+for _s, _su in enumerate(SUITS):
+    for _r, _rk in enumerate(RANKS):
+        _c = _s * 13 + _r
+        CODE_CARD[_c] = Card(_rk, _su)
+        CODE_VALUE[_c] = _RANK_VALUE[_rk]
+        CODE_RANK[_c], CODE_SUIT[_c] = _r, _s
+        CODE_NUMBER[_c] = _r < 10
+        CODE_PIC[_c] = _r >= 10
+        CODE_KING[_c] = int(_rk == "K")
+        CODE_QUEEN[_c] = int(_rk == "Q")
+CODE_CARD[JOKER_CODE] = Card("JKR")
+CODE_RANK[JOKER_CODE] = 13
+CODE_PIC[JOKER_CODE] = True
+
+_CODE_OF_CARD = {c: code for code, c in enumerate(CODE_CARD) if c is not None}
+
+def card_code(card: Card) -> int:
+    return _CODE_OF_CARD[card]
+
+def pack_entry(ne: NumEntry) -> int:
+    if len(ne.pics) > 3: raise ValueError("entry holds more than 3 pictures")
+    e = card_code(ne.card) | _EMPTY_PICS
+    for k, pc in enumerate(ne.pics):
+        sh = 6 + 6 * k
+        e = (e & ~(63 << sh)) | (card_code(pc) << sh)
+    return e
+
+def unpack_entry(e: int) -> NumEntry:
+    return NumEntry(card=CODE_CARD[e & 63],
+                    pics=[CODE_CARD[pc] for pc in _entry_pics(e)])
+
+def _entry_pics(e):
+    out = []
+    for sh in (6, 12, 18):
+        pc = (e >> sh) & 63
+        if pc == NO_CARD: break
+        out.append(pc)
+    return out
+
+def _entry_npics(e):
+    if (e >> 6) & 63 == NO_CARD: return 0
+    if (e >> 12) & 63 == NO_CARD: return 1
+    return 2 if (e >> 18) & 63 == NO_CARD else 3
+
+def _entry_value(e):
+    k = CODE_KING[(e >> 6) & 63] + CODE_KING[(e >> 12) & 63] + CODE_KING[(e >> 18) & 63]
+    return CODE_VALUE[e & 63] << k
+
+# Move kinds for CompactState.moves()/apply(); a move is
+# (kind, hand_idx, slot, entry_idx) where slot = side * 3 + caravan.
+CM_NUMBER, CM_PIC, CM_DISCARD, CM_DISBAND = 0, 1, 2, 3
+
+# Typed arrays: card codes fit a byte, packed entries 24 bits, scores a short.
+def _cards(xs=()):   return array("B", xs)
+def _entries(xs=()): return array("L", xs)
+
+class CompactState:
+    """Both players of a match as typed int arrays. Slots 0-2 are side 0's
+    caravans, 3-5 side 1's. Scores are kept up to date on every mutation."""
+    __slots__ = ("names", "cavs", "scores", "hands", "decks", "discards")
+
+    def __init__(self, names=("", ""), cavs=None, hands=None, decks=None, discards=None):
+        self.names = tuple(names)
+        self.cavs = [_entries(cv) for cv in cavs] if cavs is not None else [_entries() for _ in range(6)]
+        self.hands = [_cards(h) for h in hands] if hands is not None else [_cards(), _cards()]
+        self.decks = [_cards(d) for d in decks] if decks is not None else [_cards(), _cards()]
+        self.discards = [_cards(d) for d in discards] if discards is not None else [_cards(), _cards()]
+        self.scores = array("h", (sum(_entry_value(e) for e in cv) for cv in self.cavs))
+
+    def copy(self):
+        cs = CompactState.__new__(CompactState)
+        cs.names = self.names
+        cs.cavs = [cv[:] for cv in self.cavs]
+        cs.scores = self.scores[:]
+        cs.hands = [self.hands[0][:], self.hands[1][:]]
+        cs.decks = [self.decks[0][:], self.decks[1][:]]
+        cs.discards = [self.discards[0][:], self.discards[1][:]]
+        return cs
+
+    # ── caravan queries ──────────────────────────────────────
+    def direction(self, slot):
+        """+1 up, -1 down, 0 none; Queens on the top entry already applied."""
+        cv = self.cavs[slot]
+        if len(cv) < 2: return 0
+        a, top = CODE_VALUE[cv[-2] & 63], cv[-1]
+        d = 1 if CODE_VALUE[top & 63] > a else -1 if CODE_VALUE[top & 63] < a else 0
+        q = CODE_QUEEN[(top >> 6) & 63] + CODE_QUEEN[(top >> 12) & 63] + CODE_QUEEN[(top >> 18) & 63]
+        return -d if q & 1 else d
+
+    def suit(self, slot):
+        cv = self.cavs[slot]
+        if not cv: return -1
+        top, s = cv[-1], CODE_SUIT[cv[-1] & 63]
+        for sh in (6, 12, 18):
+            pc = (top >> sh) & 63
+            if CODE_QUEEN[pc]: s = CODE_SUIT[pc]
+        return s
+
+    def for_sale(self, slot): return 21 <= self.scores[slot] <= 26
+
+    def can_play_number(self, code, slot):
+        if not CODE_NUMBER[code]: return False
+        cv = self.cavs[slot]
+        if not cv: return True
+        v, last_v = CODE_VALUE[code], CODE_VALUE[cv[-1] & 63]
+        if v == last_v: return False
+        if len(cv) == 1: return True
+        d = self.direction(slot)
+        if (d > 0 and v > last_v) or (d < 0 and v < last_v): return True
+        return CODE_SUIT[code] == self.suit(slot)
+
+    # ── rules ────────────────────────────────────────────────
+    def moves(self, side):
+        """Every legal move for `side`, unpruned (each hand index and slot,
+        busting plays included): number plays, pictures on own then opponent
+        caravans, discards, disbands. Unlike _bot_candidates, no move is
+        collapsed or dropped and the order differs."""
+        hand, out = self.hands[side], []
+        own = range(side * 3, side * 3 + 3)
+        for i, c in enumerate(hand):
+            if CODE_NUMBER[c]:
+                for slot in own:
+                    if self.can_play_number(c, slot): out.append((CM_NUMBER, i, slot, 0))
+        for i, c in enumerate(hand):
+            if not CODE_PIC[c]: continue
+            for slot in _SLOT_ORDER[side]:
+                cv = self.cavs[slot]
+                last = len(cv) - 1
+                for ei, e in enumerate(cv):
+                    if (e >> 18) & 63 != NO_CARD: continue
+                    if CODE_QUEEN[c] and ei != last: continue
+                    out.append((CM_PIC, i, slot, ei))
+        for i in range(len(hand)): out.append((CM_DISCARD, i, 0, 0))
+        for slot in own:
+            if self.cavs[slot]: out.append((CM_DISBAND, 0, slot, 0))
+        return out
+
+    def apply(self, side, move):
+        """Applies a move from moves(); returns the number of entries a Joker removed."""
+        kind, i, slot, ei = move
+        hand, disc = self.hands[side], self.discards[side]
+        if kind == CM_DISCARD:
+            disc.append(hand.pop(i))
+            return 0
+        if kind == CM_DISBAND:
+            for e in self.cavs[slot]: self._discard_entry(disc, e)
+            self.cavs[slot] = _entries()
+            self.scores[slot] = 0
+            return 0
+        c = hand.pop(i)
+        cv = self.cavs[slot]
+        if kind == CM_NUMBER:
+            cv.append(c | _EMPTY_PICS)
+            self.scores[slot] += CODE_VALUE[c]
+            return 0
+        e = cv[ei]
+        if CODE_RANK[c] == 10:                       # Jack
+            del cv[ei]
+            self.scores[slot] -= _entry_value(e)
+            self._discard_entry(disc, e)
+            return 0
+        sh = 6 + 6 * _entry_npics(e)
+        ne = (e & ~(63 << sh)) | (c << sh)
+        cv[ei] = ne
+        if CODE_KING[c]: self.scores[slot] += _entry_value(e)
+        if c != JOKER_CODE: return 0
+        tc = e & 63
+        by_suit = CODE_RANK[tc] == 0
+        key = CODE_SUIT[tc] if by_suit else CODE_RANK[tc]
+        table = CODE_SUIT if by_suit else CODE_RANK
+        removed = 0
+        for s2 in _SLOT_ORDER[side]:
+            cv2 = self.cavs[s2]
+            keep = []
+            for k, e2 in enumerate(cv2):
+                if table[e2 & 63] == key and not (s2 == slot and k == ei):
+                    self.scores[s2] -= _entry_value(e2)
+                    self._discard_entry(disc, e2)
+                    removed += 1
+                else:
+                    keep.append(e2)
+            if len(keep) != len(cv2): self.cavs[s2] = _entries(keep)
+        return removed
+
+    @staticmethod
+    def _discard_entry(disc, e):
+        disc.append(e & 63)
+        disc.extend(_entry_pics(e))
+
+    def draw(self, side, target):
+        hand, deck = self.hands[side], self.decks[side]
+        while len(hand) < target:
+            if not deck: return False
+            hand.append(deck.pop())
+        return True
+
+    def winner(self):
+        """0 or 1 once a side has won two slots, else -1 (see check_game_end)."""
+        w = [0, 0]
+        for ci in range(3):
+            a, b = ci, ci + 3
+            st, who = slot_outcome(self.scores[a], self.for_sale(a),
+                                   self.scores[b], self.for_sale(b))
+            if st == "ready": w[0 if who == "player" else 1] += 1
+        return 0 if w[0] >= 2 else 1 if w[1] >= 2 else -1
+
+_SLOT_ORDER = ((0, 1, 2, 3, 4, 5), (3, 4, 5, 0, 1, 2))
+
+def compact_from_players(p0: PlayerState, p1: PlayerState) -> CompactState:
+    return CompactState(
+        names=(p0.name, p1.name),
+        cavs=[[pack_entry(ne) for ne in cv.nums] for p in (p0, p1) for cv in p.caravans],
+        hands=[[card_code(c) for c in p.hand] for p in (p0, p1)],
+        decks=[[card_code(c) for c in p.deck] for p in (p0, p1)],
+        discards=[[card_code(c) for c in p.discard] for p in (p0, p1)],
+    )
+
+def compact_to_players(cs: CompactState) -> Tuple[PlayerState, PlayerState]:
+    return tuple(PlayerState(
+        name=cs.names[side],
+        caravans=[Caravan([unpack_entry(e) for e in cs.cavs[side * 3 + ci]]) for ci in range(3)],
+        deck=[CODE_CARD[c] for c in cs.decks[side]],
+        discard=[CODE_CARD[c] for c in cs.discards[side]],
+        hand=[CODE_CARD[c] for c in cs.hands[side]],
+    ) for side in (0, 1))
+
+def compact_move_to_payload(side, move):
+    """Translates a compact move into the bot's (mtype, payload) form for `side`."""
+    kind, i, slot, ei = move
+    if kind == CM_NUMBER: return "play_number", {"card_idx": i, "cav": slot % 3}
+    if kind == CM_PIC:
+        owner = "bot" if slot // 3 == side else "player"
+        return "play_pic", {"card_idx": i, "owner": owner, "cav": slot % 3, "entry": ei}
+    if kind == CM_DISCARD: return "discard", {"card_idx": i}
+    return "disband", {"cav": slot % 3}
+
+
+# ============================================================
+# ZOBRIST HASHING
+# ============================================================
+# 64-bit position keys for search. A caravan's key XORs one link key per
+# consecutive (previous card, card) pair plus one key per attached picture,
+# so a push, a mid-row removal or an attach updates it in O(1) (cards in a
+# row are normally unique, so the links pin down the order). Caravans keep their key
+# in Caravan._hash. Hands are multisets summed mod 2**64; they hold at most
+# HAND_OPENING_SIZE cards, so they are folded in when a key is requested.
+# The seed is fixed so keys agree across processes and sessions.
+_MASK64 = (1 << 64) - 1
+_Z_START = 64                                        # "previous card" of the first entry
+
+def _zobrist_tables(seed=0x5EED_CA2A):
+    rng = random.Random(seed)
+    r64 = lambda n: [rng.getrandbits(64) for _ in range(n)]
+    link = [r64(64) for _ in range(65)]
+    pic = [[r64(64) for _ in range(3)] for _ in range(64)]
+    return link, pic, r64(64), r64(6), r64(2)
+
+Z_LINK, Z_PIC, Z_HAND, Z_SLOT, Z_SIDE = _zobrist_tables()
+
+def _z_link(prev, card):
+    return Z_LINK[_Z_START if prev is None else _CODE_OF_CARD[prev]][_CODE_OF_CARD[card]]
+
+def _z_pic(card, k, pic):
+    return Z_PIC[_CODE_OF_CARD[card]][k][_CODE_OF_CARD[pic]]
+
+def _mix64(x):
+    """splitmix64 finalizer, so slot keys don't combine linearly."""
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+def hand_hash(hand) -> int:
+    h = 0
+    for c in hand: h += Z_HAND[_CODE_OF_CARD[c]]
+    return h & _MASK64
+
+def board_hash(to_move: PlayerState, other: PlayerState) -> int:
+    """Key of all six caravans (contents and attached pictures) with the side
+    to move; ignores hands. Enough for anything that only reads caravans."""
+    h = 0
+    for k, cav in enumerate(to_move.caravans):
+        if cav._hash: h ^= _mix64(cav._hash ^ Z_SLOT[k])
+    for k, cav in enumerate(other.caravans):
+        if cav._hash: h ^= _mix64(cav._hash ^ Z_SLOT[3 + k])
+    return h
+
+def position_hash(to_move: PlayerState, other: PlayerState) -> int:
+    """board_hash plus both hands."""
+    return (board_hash(to_move, other)
+            ^ _mix64(hand_hash(to_move.hand) ^ Z_SIDE[0])
+            ^ _mix64(hand_hash(other.hand) ^ Z_SIDE[1]))
@@ -1,4 +1,5 @@
 import json
+import zlib
 import socket as _socket
 import threading as _threading
 import queue as _queue_mod
@@ -12,7 +13,9 @@ from src.config import (
     T, NET_PORT, GM_NETWORK, BG, ACCENT, TEXT, TEXT_DIM, YELLOW, RED, OUT_OK,
     BTN, BTN_H, PANEL_BORD, HAND_OPENING_SIZE, HAND_TARGET_SIZE,
     STALEMATE_THRESHOLD, GM_TIMED, TIMER_OK, TIMER_WARN, TIMER_CRIT, UNDO_CLR, _BASE_W,
-    add_history, FIREBASE_URL
+    add_history, FIREBASE_URL, NET_POLL_INTERVAL_S, NET_FETCH_LIMIT, NET_GAP_TIMEOUT_S, NET_LOBBY_CHECK_S,
+    NET_ACCEPT_CHECK_S, NET_STREAM, NET_STREAM_TIMEOUT_S, NET_STREAM_BACKOFF_S, NET_STREAM_MAX_FAILS,
+    NET_SEND_BACKOFF_S, NET_RESYNC_TIMEOUT_S, HTTP_METRICS_WINDOW
 )
 from src.models import (
     Card, NumEntry, Caravan, PlayerState, BotPersonality, PERSONALITIES, DEFAULT_PERSONALITY,
@@ -20,37 +23,43 @@ from src.models import (
     ensure_min30_selection, draw_to_hand, move_card_to_discard, move_entry_to_discard,
     can_attach_picture, can_play_number_on_caravan, can_play_picture_on_target,
     apply_jack, apply_king, apply_queen, apply_joker, discard_hand_card, disband_caravan,
-    play_number, play_picture, check_game_end, get_bot_delay_ms
+    play_number, play_picture, check_game_end, get_bot_delay_ms, card_code
 )
+from src.achievements import rules_event_observer
+from src.http_pool import get_pool
 from src.ui import (
     draw_ui_background, draw_panel, draw_panel_title_bar, draw_text_center,
     draw_button, draw_minimal_chip, draw_text, draw_board, ui_rects, caravan_slots,
     build_entry_hitboxes, get_idx_at, trigger_shake, wrap_text, lighten
 )
 
-import urllib.request
-import urllib.error
+import urllib.parse
 import time
 import uuid
+from collections import deque
+
+# Message keys under /lobbies/<id>/pN_msgs: "m" + the sender's message
+# number, zero-padded so Firebase's $key order is send order.
+def _msg_key(n: int) -> str: return f"m{n:09d}"
+
+def _msg_num(key: str) -> Optional[int]:
+    try: return int(key[1:]) if key[:1] == "m" else None
+    except ValueError: return None
 
 class FirebaseFriends:
     @staticmethod
     def _req(method, path, data=None):
-        try:
-            import urllib.request
-            url = f"{FIREBASE_URL.rstrip('/')}{path}"
-            req = urllib.request.Request(url, method=method)
-            if data is not None:
-                req.data = json.dumps(data).encode()
-                req.add_header("Content-Type", "application/json")
-            with urllib.request.urlopen(req, timeout=3) as res:
-                body = res.read().decode()
-                return json.loads(body) if body != "null" else None
+        try: return get_pool(FIREBASE_URL).json(method, path, data, send=method != "GET")
         except: return None
 
+    @staticmethod
+    def _send(method, path, data):
+        # Fire-and-forget write on the pool's worker threads.
+        get_pool(FIREBASE_URL).submit(method, path, data)
+
     @staticmethod
     def sync_profile(code: str, name: str, icon: str):
-        import time, threading
+        import time
         from src.state import app_settings, app_stats
         if not code: return
         data = {
@@ -63,7 +72,7 @@ class FirebaseFriends:
             "caps": app_settings.caps if app_settings else 0,
             "friends": app_settings.friends if app_settings else []
         }
-        threading.Thread(target=lambda: FirebaseFriends._req("PATCH", f"/users/{code}.json", data), daemon=True).start()
+        FirebaseFriends._send("PATCH", f"/users/{code}.json", data)
 
     @staticmethod
     def lookup_friend(code: str) -> Optional[dict]:
@@ -72,10 +81,9 @@ class FirebaseFriends:
 
     @staticmethod
     def send_friend_request(my_code: str, target_code: str, my_name: str):
-        import threading
         if not my_code or not target_code: return
         data = {my_code: my_name}
-        threading.Thread(target=lambda: FirebaseFriends._req("PATCH", f"/users/{target_code}/requests.json", data), daemon=True).start()
+        FirebaseFriends._send("PATCH", f"/users/{target_code}/requests.json", data)
 
     @staticmethod
     def get_pending_requests(my_code: str) -> dict:
@@ -85,26 +93,23 @@ class FirebaseFriends:
 
     @staticmethod
     def remove_friend_request(my_code: str, from_code: str):
-        import threading
         if not my_code or not from_code: return
         data = {from_code: None}
-        threading.Thread(target=lambda: FirebaseFriends._req("PATCH", f"/users/{my_code}/requests.json", data), daemon=True).start()
+        FirebaseFriends._send("PATCH", f"/users/{my_code}/requests.json", data)
 
     @staticmethod
     def add_mutual_friend(my_code: str, friend_code: str):
-        import threading
         if not my_code or not friend_code: return
         data = {my_code: True}
-        threading.Thread(target=lambda: FirebaseFriends._req("PATCH", f"/users/{friend_code}/new_friends.json", data), daemon=True).start()
+        FirebaseFriends._send("PATCH", f"/users/{friend_code}/new_friends.json", data)
 
     @staticmethod
     def pop_new_friends(my_code: str) -> list:
         if not my_code: return []
         res = FirebaseFriends._req("GET", f"/users/{my_code}/new_friends.json")
         if isinstance(res, dict) and res:
-            import threading
             # Clear new_friends by setting it to None
-            threading.Thread(target=lambda: FirebaseFriends._req("PUT", f"/users/{my_code}/new_friends.json", None), daemon=True).start()
+            FirebaseFriends._send("PUT", f"/users/{my_code}/new_friends.json", None)
             return list(res.keys())
         return []
 
@@ -124,11 +129,10 @@ class FirebaseFriends:
     @staticmethod
     def add_to_global_event(amount: int):
         if amount <= 0: return
-        import threading
         def _add():
             current = FirebaseFriends.get_global_event()
             FirebaseFriends._req("PUT", "/server_state/global_caps.json", current + amount)
-        threading.Thread(target=_add, daemon=True).start()
+        get_pool(FIREBASE_URL).defer(_add)
 
 class NetworkManager:
     def __init__(self):
@@ -141,29 +145,39 @@ class NetworkManager:
         self.last_msg_time: int                  = 0
         self._polling_thread: Optional[_threading.Thread] = None
         self._fb_url:   str                      = FIREBASE_URL.rstrip("/")
+        self._send_n:   int                      = 0     # number of the last message sent
+        self._send_lock = _threading.Lock()
+        self._outbox:   _queue_mod.Queue         = _queue_mod.Queue()   # (key, msg, time queued); None = close
+        self._sender:   Optional[_threading.Thread] = None
+        self._send_times: deque                  = deque(maxlen=HTTP_METRICS_WINDOW)
+        self.send_stats: dict                    = {"sent": 0, "batches": 0, "retries": 0, "dropped": 0}
+        self._next_n:   int                      = 1     # number of the next message to deliver
+        self._ahead:    dict                     = {}    # fetched past a missing one, by number
+        self._gap_since: Optional[float]         = None
+        self._take_lock = _threading.Lock()
+        self.use_stream: bool                    = NET_STREAM
+        self._tasks:    _queue_mod.Queue         = _queue_mod.Queue()   # (op, result) of finished tasks
+        self.task:      str                      = ""    # lobby operation running in the background
+        self._closed:   bool                     = False
+        self._next_accept_check: float           = 0.0
+        self.transport: str                      = ""    # "stream" or "poll" once receiving
 
     def _fb_get(self, path: str) -> any:
         # Returns the decoded JSON if successful.
         # Returns "NETWORK_ERROR" if there was an exception.
-        try:
-            req = urllib.request.Request(f"{self._fb_url}{path}")
-            with urllib.request.urlopen(req, timeout=3) as res:
-                data = res.read().decode()
-                return json.loads(data) if data != "null" else None
+        try: return get_pool(self._fb_url).json("GET", path)
         except: return "NETWORK_ERROR"
 
     def _fb_patch(self, path: str, data: dict) -> bool:
         try:
-            req = urllib.request.Request(f"{self._fb_url}{path}", data=json.dumps(data).encode(), method="PATCH")
-            req.add_header("Content-Type", "application/json")
-            with urllib.request.urlopen(req, timeout=3) as res: return True
+            get_pool(self._fb_url).request("PATCH", path, json.dumps(data).encode())
+            return True
         except: return False
 
     def _fb_put(self, path: str, data: dict) -> bool:
         try:
-            req = urllib.request.Request(f"{self._fb_url}{path}", data=json.dumps(data).encode(), method="PUT")
-            req.add_header("Content-Type", "application/json")
-            with urllib.request.urlopen(req, timeout=3) as res: return True
+            get_pool(self._fb_url).request("PUT", path, json.dumps(data).encode())
+            return True
         except: return False
 
     def find_match(self) -> bool:
@@ -236,43 +250,251 @@ class NetworkManager:
             self.error = str(e)
             return False
 
+    def _check_accept(self) -> bool:
+        lobby = self._fb_get(f"/lobbies/{self.lobby_id}/state.json")
+        if lobby == "playing" and self.connected:
+            self._start_polling()
+            return True
+        return False
+
     def poll_accept(self) -> bool:
+        # Never blocks: the lobby is checked in the background at most every
+        # NET_ACCEPT_CHECK_S, and a later call sees the result.
         if self._polling_thread and self._polling_thread.is_alive(): return True
         if not self.connected or self.role != "host": return False
-        
-        lobby = self._fb_get(f"/lobbies/{self.lobby_id}.json")
-        if lobby != "NETWORK_ERROR" and lobby and lobby.get("state") == "playing":
-            self._start_polling()
-            return True
+        if not self.task and time.monotonic() >= self._next_accept_check:
+            self._next_accept_check = time.monotonic() + NET_ACCEPT_CHECK_S
+            self.run_task("check_accept")
         return False
 
+    # ── Background lobby tasks ───────────────────────────────
+    # The lobby screen never waits on Firebase: find_match,
+    # create_private_match, join_private_match and the accept check run one
+    # at a time on a worker thread, and poll_task() hands back (op, result).
+    _TASKS = {"find_match": "find_match", "create_private_match": "create_private_match",
+              "join_private_match": "join_private_match", "check_accept": "_check_accept"}
+
+    def run_task(self, op: str, *args) -> bool:
+        """Starts a lobby operation in the background; False if one is already running."""
+        if self.task: return False
+        self.task = op
+        fn = getattr(self, self._TASKS[op])
+        def work():
+            try: result = fn(*args)
+            except Exception as e:
+                self.error, result = str(e), None
+            if self._closed and self.connected: self.close()    # cancelled while it ran
+            self.task = ""
+            self._tasks.put((op, result))
+        _threading.Thread(target=work, name=f"net-{op}", daemon=True).start()
+        return True
+
+    def poll_task(self) -> Optional[tuple]:
+        try: return self._tasks.get_nowait()
+        except _queue_mod.Empty: return None
+
     def _start_polling(self):
         self._polling_thread = _threading.Thread(target=self._recv_loop, daemon=True)
         self._polling_thread.start()
 
+    def _opp_msgs_path(self, key: str = "") -> str:
+        """The opponent's message list, or one message in it."""
+        sub = f"/{key}" if key else ""
+        return f"/lobbies/{self.lobby_id}/{'p2' if self.role == 'host' else 'p1'}_msgs{sub}.json"
+
+    def _take(self, items) -> int:
+        """Buffers (key, msg) pairs from the opponent, queues whatever is now
+        in order and deletes it server-side. Returns the number delivered.
+
+        A missing message holds later ones back. After NET_GAP_TIMEOUT_S its
+        key is fetched on its own; if the server has no such key it is lost,
+        and {"t": "gap"} is queued in its place so the match asks for a
+        snapshot. Called from the receiving thread and from the gap timer."""
+        with self._take_lock:
+            for k, msg in items:
+                n = _msg_num(k)
+                if n is not None and n >= self._next_n and msg is not None: self._ahead[n] = msg
+            n = self._deliver()
+            if self._ahead and self._fill_gap(): n += self._deliver()
+            return n
+
+    def _fill_gap(self) -> bool:
+        """True once the missing message is fetched or given up on."""
+        now = time.monotonic()
+        if self._gap_since is None:
+            self._gap_since = now
+            self._recheck_later()       # the stream may stay quiet until then
+        if now - self._gap_since < NET_GAP_TIMEOUT_S: return False
+        msg = self._fb_get(self._opp_msgs_path(_msg_key(self._next_n)))
+        if msg == "NETWORK_ERROR":
+            self._recheck_later()
+            return False
+        if msg is not None: self._ahead[self._next_n] = msg
+        else:
+            self._q.put({"t": "gap", "n": self._next_n})
+            self._next_n = min(self._ahead)
+        return True
+
+    def _recheck_later(self):
+        if not self.connected: return
+        t = _threading.Timer(NET_GAP_TIMEOUT_S + 0.05, self._take, ((),))
+        t.daemon = True
+        t.start()
+
+    def _deliver(self) -> int:
+        done = []
+        while self._next_n in self._ahead:
+            self._q.put(self._ahead.pop(self._next_n))
+            done.append(_msg_key(self._next_n))
+            self._next_n += 1
+        if done:
+            self._gap_since = None
+            self._fb_patch(self._opp_msgs_path(), {k: None for k in done})
+        return len(done)
+
+    def _poll_msgs(self) -> int:
+        """One incremental fetch: asks only for keys from the next undelivered message on."""
+        q = urllib.parse.urlencode({"orderBy": '"$key"', "startAt": f'"{_msg_key(self._next_n)}"',
+                                    "limitToFirst": NET_FETCH_LIMIT})
+        msgs = self._fb_get(f"{self._opp_msgs_path()}?{q}")
+        if msgs == "NETWORK_ERROR": return 0
+        return self._take((msgs or {}).items())
+
     def _recv_loop(self):
-        opp_id = "p2" if self.role == "host" else "p1"
-        last_keys = set()
+        if self.use_stream: self._stream_loop()
+        self._poll_loop()
+
+    def _poll_loop(self):
+        self.transport = "poll"
+        last_check = time.monotonic()
         while self.connected:
             try:
-                msgs = self._fb_get(f"/lobbies/{self.lobby_id}/{opp_id}_msgs.json")
-                if msgs != "NETWORK_ERROR" and isinstance(msgs, dict):
-                    for k, msg in msgs.items():
-                        if k not in last_keys:
-                            self._q.put(msg)
-                            last_keys.add(k)
-                
-                lobby = self._fb_get(f"/lobbies/{self.lobby_id}/state.json")
-                if lobby != "NETWORK_ERROR" and lobby is None:
-                    # Lobby was actually deleted, not a network timeout.
-                    self.connected = False
+                self._poll_msgs()
+                if time.monotonic() - last_check >= NET_LOBBY_CHECK_S:
+                    last_check = time.monotonic()
+                    lobby = self._fb_get(f"/lobbies/{self.lobby_id}/state.json")
+                    if lobby != "NETWORK_ERROR" and lobby is None:
+                        # Lobby was actually deleted, not a network timeout.
+                        self.connected = False
             except: pass
-            time.sleep(0.5)
-
+            time.sleep(NET_POLL_INTERVAL_S)
+
+    # ── Streaming (server-sent events) ───────────────────────
+    # One long-lived GET on the lobby with Accept: text/event-stream; Firebase
+    # answers with "put"/"patch" events ({"path", "data"} relative to the lobby)
+    # for every change and "keep-alive" every 30 s. While the stream is down
+    # the loop polls between reconnects; after NET_STREAM_MAX_FAILS failed
+    # connects in a row it returns and polling takes over for the match.
+    def _stream_loop(self):
+        backoff, fails = NET_STREAM_BACKOFF_S[0], 0
+        while self.connected:
+            try:
+                if self._stream_once(): backoff, fails = NET_STREAM_BACKOFF_S[0], 0
+            except Exception:
+                pass
+            if not self.connected: return
+            fails += 1
+            if fails >= NET_STREAM_MAX_FAILS: return
+            self.transport = "poll"
+            until = time.monotonic() + backoff
+            while self.connected and time.monotonic() < until:
+                try: self._poll_msgs()
+                except Exception: pass
+                time.sleep(min(NET_POLL_INTERVAL_S, backoff))
+            backoff = min(backoff * 2, NET_STREAM_BACKOFF_S[1])
+
+    def _stream_once(self) -> bool:
+        """Reads one stream until it ends; True if it delivered any event."""
+        got = False
+        with get_pool(self._fb_url).stream(f"/lobbies/{self.lobby_id}.json", NET_STREAM_TIMEOUT_S) as res:
+            self.transport = "stream"
+            event = ""
+            for raw in res:
+                if not self.connected: break
+                line = raw.decode("utf-8").rstrip("\r\n")
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    if event in ("cancel", "auth_revoked"): break
+                    if event in ("put", "patch"):
+                        self._on_stream_event(event, json.loads(line[5:]))
+                        got = True
+        return got
+
+    def _on_stream_event(self, event: str, payload: dict):
+        opp = "p2_msgs" if self.role == "host" else "p1_msgs"
+        base = [p for p in (payload.get("path") or "/").split("/") if p]
+        data = payload.get("data")
+        if event == "patch" and isinstance(data, dict):
+            changes = [(base + [p for p in k.split("/") if p], v) for k, v in data.items()]
+        else:
+            changes = [(base, data)]
+        items = []
+        for parts, value in changes:
+            if not parts:
+                if value is None:
+                    self.connected = False      # the lobby itself was deleted
+                    return
+                if isinstance(value, dict) and isinstance(value.get(opp), dict): items += value[opp].items()
+            elif parts[0] == opp:
+                if len(parts) == 1 and isinstance(value, dict): items += value.items()
+                elif len(parts) == 2: items.append((parts[1], value))
+        if items: self._take(items)
+
+    # ── Sending ──────────────────────────────────────────────
+    # send() only numbers the message and queues it; one sender thread PATCHes
+    # the queue in order. Messages queued while a PATCH is in flight (or being
+    # retried) go out together in the next one, which Firebase applies
+    # atomically, so the opponent never sees a later message before an
+    # earlier one. Failures are retried with backoff while connected.
     def send(self, msg: dict):
         if not self.connected: return
-        msg_id = str(int(time.time() * 1000)) + str(uuid.uuid4())[:4]
-        _threading.Thread(target=self._fb_patch, args=(f"/lobbies/{self.lobby_id}/{self.player_id}_msgs.json", {msg_id: msg}), daemon=True).start()
+        with self._send_lock:
+            self._send_n += 1
+            self._outbox.put((_msg_key(self._send_n), msg, time.perf_counter()))
+            if self._sender is None:
+                self._sender = _threading.Thread(target=self._send_loop, name="net-sender", daemon=True)
+                self._sender.start()
+
+    def _drain(self, batch: list) -> bool:
+        """Moves everything queued onto `batch`; True if close() was among it."""
+        closing = False
+        while True:
+            try: item = self._outbox.get_nowait()
+            except _queue_mod.Empty: return closing
+            if item is None: closing = True
+            else: batch.append(item)
+
+    def _send_loop(self):
+        path = f"/lobbies/{self.lobby_id}/{self.player_id}_msgs.json"
+        closing = False
+        while not closing:
+            first = self._outbox.get()
+            batch = [first] if first is not None else []
+            closing = first is None or self._drain(batch)
+            backoff = NET_SEND_BACKOFF_S[0]
+            while batch and not self._fb_patch(path, {k: m for k, m, _ in batch}):
+                if not self.connected:
+                    self.send_stats["dropped"] += len(batch)
+                    batch = []
+                    break
+                self.send_stats["retries"] += 1
+                time.sleep(backoff)
+                backoff = min(backoff * 2, NET_SEND_BACKOFF_S[1])
+                closing = self._drain(batch) or closing
+            if batch:
+                now = time.perf_counter()
+                self._send_times.extend((now - t) * 1000 for _, _, t in batch)
+                self.send_stats["sent"] += len(batch)
+                self.send_stats["batches"] += 1
+        if self.lobby_id and self.role == "host":
+            self._fb_put(f"/lobbies/{self.lobby_id}.json", None)
+
+    def send_metrics(self) -> dict:
+        """Queue depth, counters and send latency (queued to acknowledged)."""
+        times = sorted(self._send_times)
+        pick = lambda q: times[min(len(times) - 1, int(q * len(times)))] if times else 0.0
+        return dict(self.send_stats, queued=self._outbox.qsize(), p50_ms=pick(0.5), p99_ms=pick(0.99))
 
     def poll(self) -> Optional[dict]:
         try: return self._q.get_nowait()
@@ -280,8 +502,13 @@ class NetworkManager:
 
     def close(self):
         self.connected = False
+        self._closed = True
+        with self._send_lock:
+            if self._sender is not None:
+                self._outbox.put(None)      # the sender flushes, then deletes a hosted lobby
+                return
         if self.lobby_id and self.role == "host":
-            _threading.Thread(target=self._fb_put, args=(f"/lobbies/{self.lobby_id}.json", None), daemon=True).start()
+            get_pool(self._fb_url).submit("PUT", f"/lobbies/{self.lobby_id}.json", None)
 
     @staticmethod
     def local_ip() -> str:
@@ -323,13 +550,58 @@ def _dp(d: dict) -> PlayerState:
         hand=[_dc(c) for c in d.get("hand", [])]
     )
 
-def net_encode(p1: PlayerState, p2: PlayerState, phase: str, p1_to_move: bool, oht: int) -> dict:
-    return {"t": "s", "p1": _sp(p1), "p2": _sp(p2), "ph": phase, "pm": p1_to_move, "oht": oht}
+def net_encode(p1: PlayerState, p2: PlayerState, phase: str, p1_to_move: bool, oht: int, seq: int = 0) -> dict:
+    """Full snapshot, sent on join and on resync. `seq` is the sender's last action seq."""
+    return {"t": "s", "p1": _sp(p1), "p2": _sp(p2), "ph": phase, "pm": p1_to_move, "oht": oht, "q": seq}
 
 def net_decode(d: dict):
     return _dp(d["p1"]), _dp(d["p2"]), d["ph"], d["pm"], d.get("oht", 0)
 
 
+# ── Move protocol ────────────────────────────────────────────
+# After the first snapshot each side sends only its own moves:
+#   {"t": "a", "q": seq, "a": action, "h": state hash after the move}
+# with action one of
+#   ["o", hand_idx, cav]               opening card
+#   ["n", hand_idx, cav]               number card
+#   ["p", hand_idx, own, cav, entry]   picture; own = 1 targets the sender's caravan
+#   ["d", hand_idx]                    discard
+#   ["b", cav]                         disband
+# The receiver replays it through the rules below, refills like the sender
+# and compares hashes; a mismatch asks for a snapshot ({"t": "rs"}).
+def net_action_msg(seq: int, action: list, h: int) -> dict:
+    return {"t": "a", "q": seq, "a": action, "h": h}
+
+def net_state_hash(p1: PlayerState, p2: PlayerState, phase: str, p1_to_move: bool, oht: int) -> int:
+    """CRC32 of everything a move can change, for desync detection."""
+    def side(p):
+        return ([[[card_code(ne.card), [card_code(x) for x in ne.pics]] for ne in cv.nums] for cv in p.caravans],
+                [card_code(c) for c in p.deck], [card_code(c) for c in p.discard], [card_code(c) for c in p.hand])
+    blob = json.dumps([side(p1), side(p2), phase, p1_to_move, oht], separators=(",", ":"))
+    return zlib.crc32(blob.encode())
+
+def apply_net_action(mover: PlayerState, other: PlayerState, action: list) -> bool:
+    """Replays the rules part of an action for `mover`; the caller refills and
+    passes the turn the same way it does for its own moves."""
+    try:
+        kind = action[0]
+        if kind == "o":
+            i, ci = action[1], action[2]
+            if not (0 <= i < len(mover.hand)) or ci not in (0, 1, 2): return False
+            if not mover.hand[i].is_number() or not mover.caravans[ci].empty(): return False
+            mover.caravans[ci].push(NumEntry(card=mover.hand.pop(i)))
+            return True
+        if kind == "n": return play_number(mover, action[1], action[2])[0]
+        if kind == "p":
+            tgt = mover if action[2] else other
+            return play_picture(mover, other, action[1], tgt, action[3], action[4])[0]
+        if kind == "d": return discard_hand_card(mover, action[1])
+        if kind == "b": return disband_caravan(mover, action[1])
+    except (IndexError, TypeError):
+        pass
+    return False
+
+
 # ── Lobby screen ─────────────────────────────────────────────
 def network_lobby_screen() -> Optional["NetworkManager"]:
     TINY = state.TINY
@@ -352,9 +624,27 @@ def network_lobby_screen() -> Optional["NetworkManager"]:
     FPS = 60
     clock = pygame.time.Clock()
 
+    def _error():
+        return ("Error: " if state.language == "en" else "Ошибка: ") + nm.error
+
     while True:
         clock.tick(FPS)
         now = pygame.time.get_ticks()
+        done = nm.poll_task() if nm else None
+        if done:
+            op, result = done
+            if op == "find_match":
+                if result and nm.role == "client": return nm
+                if result: mode = "host"
+                else:
+                    status, mode, nm = _error(), "", None
+            elif op == "create_private_match":
+                if result: mode = "host_private"
+                else:
+                    status, mode, nm = _error(), "", None
+            elif op == "join_private_match":
+                if result: return nm
+                status, nm = _error(), None
         pw, ph = min(760, WIDTH - 40), min(470, HEIGHT - 60)
         panel = pygame.Rect(WIDTH // 2 - pw // 2, HEIGHT // 2 - ph // 2, pw, ph)
         draw_ui_background()
@@ -389,6 +679,9 @@ def network_lobby_screen() -> Optional["NetworkManager"]:
             draw_text_center(("Connecting to server" if state.language == "en" else "Подключение к серверу") + dots,
                              pygame.Rect(info.x, info.y + 34, info.w, 36), YELLOW, FONT)
 
+            r_cancel = pygame.Rect(panel.x + (pw - 210) // 2, panel.bottom - 56, 210, 42)
+            draw_button("Cancel" if state.language == "en" else "Отмена", r_cancel, pos, (100, 28, 28), lighten((100, 28, 28), 30), SMALL)
+
         elif mode == "host":
             dots = "." * (1 + (now // 400) % 3)
             draw_text_center(("Waiting for opponent" if state.language == "en" else "Ожидание соперника") + dots,
@@ -458,14 +751,10 @@ def network_lobby_screen() -> Optional["NetworkManager"]:
                     elif e.unicode.isdigit() and len(private_code_input) < 4:
                         private_code_input += e.unicode
                         status = ""
-                    elif e.key == pygame.K_RETURN and len(private_code_input) == 4:
+                    elif e.key == pygame.K_RETURN and len(private_code_input) == 4 and not nm:
                         status = "Connecting..." if state.language == "en" else "Подключение..."
                         nm = NetworkManager()
-                        if nm.join_private_match(private_code_input):
-                            return nm
-                        else:
-                            status = ("Error: " if state.language == "en" else "Ошибка: ") + nm.error
-                            nm = None
+                        nm.run_task("join_private_match", private_code_input)
             if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
                 if mode == "":
                     r_find = pygame.Rect(info.centerx - 160, info.y + 30, 320, 50)
@@ -476,30 +765,18 @@ def network_lobby_screen() -> Optional["NetworkManager"]:
                     if r_find.collidepoint(e.pos):
                         mode = "searching"
                         nm = NetworkManager()
-                        if nm.find_match():
-                            if nm.role == "client":
-                                return nm
-                            else:
-                                mode = "host"
-                        else:
-                            status = ("Error: " if state.language == "en" else "Ошибка: ") + nm.error
-                            mode = ""
-                            nm = None
+                        nm.run_task("find_match")
                     elif r_create_priv.collidepoint(e.pos):
+                        mode = "searching"
                         nm = NetworkManager()
-                        code = nm.create_private_match()
-                        if code:
-                            mode = "host_private"
-                        else:
-                            status = ("Error: " if state.language == "en" else "Ошибка: ") + nm.error
-                            nm = None
+                        nm.run_task("create_private_match")
                     elif r_join_priv.collidepoint(e.pos):
                         mode = "join_private"
                         private_code_input = ""
                         status = ""
                     elif r_back.collidepoint(e.pos):
                         return None
-                elif mode in ("host", "host_private", "join_private"):
+                elif mode in ("searching", "host", "host_private", "join_private"):
                     r_c = pygame.Rect(panel.x + (pw - 210) // 2, panel.bottom - 56, 210, 42)
                     if r_c.collidepoint(e.pos):
                         if nm: nm.close(); nm = None
@@ -507,14 +784,10 @@ def network_lobby_screen() -> Optional["NetworkManager"]:
                         status = ""
                     elif mode == "join_private":
                         r_join = pygame.Rect(info.centerx - 120, info.y + 160, 240, 50)
-                        if r_join.collidepoint(e.pos) and len(private_code_input) == 4:
+                        if r_join.collidepoint(e.pos) and len(private_code_input) == 4 and not nm:
                             status = "Connecting..." if state.language == "en" else "Подключение..."
                             nm = NetworkManager()
-                            if nm.join_private_match(private_code_input):
-                                return nm
-                            else:
-                                status = ("Error: " if state.language == "en" else "Ошибка: ") + nm.error
-                                nm = None
+                            nm.run_task("join_private_match", private_code_input)
 
 
 def _draw_net_hud(is_host: bool, is_my_turn: bool):
@@ -576,11 +849,19 @@ def run_network_match(nm: "NetworkManager") -> str:
             if msg and msg.get("t") == "s":
                 p1, p2, phase0, pm0, oht0 = net_decode(msg)
                 opening_ht = oht0
+                in_seq0 = msg.get("q", 0) + 1
                 break
 
     phase = "OPENING"
     p1_to_move = True
+    out_seq = 0          # last action seq sent
+    in_seq = 1           # next action seq expected from the opponent
+    pending = {}         # actions that arrived ahead of in_seq
+    waiting_since = 0.0  # when pending started waiting on a missing in_seq
+    resyncing = False    # asked for a snapshot: opponent actions and our input wait until it comes
+    resync_asked = 0.0
     if not is_host:
+        in_seq = in_seq0
         phase = phase0
         p1_to_move = pm0
         opening_ht = oht0
@@ -589,8 +870,55 @@ def run_network_match(nm: "NetworkManager") -> str:
     def opp() -> PlayerState: return p2 if is_host else p1
     def my_turn() -> bool: return p1_to_move if is_host else (not p1_to_move)
 
-    def sync():
-        nm.send(net_encode(p1, p2, phase, p1_to_move, opening_ht))
+    def sync(action: list):
+        """Sends one of our moves, already applied, refilled and turn passed."""
+        nonlocal out_seq
+        out_seq += 1
+        nm.send(net_action_msg(out_seq, action, net_state_hash(p1, p2, phase, p1_to_move, opening_ht)))
+
+    def send_snapshot():
+        nm.send(net_encode(p1, p2, phase, p1_to_move, opening_ht, out_seq))
+
+    def replay(action: list) -> bool:
+        """Applies an opponent move with the same follow-up as our own moves below."""
+        nonlocal phase, p1_to_move, opening_ht, consecutive_discards
+        if not apply_net_action(opp(), me(), action): return False
+        p1_to_move = not p1_to_move
+        if action[0] == "o":
+            opening_ht += 1
+            if opening_ht >= 6:
+                me().hand = me().hand[:HAND_TARGET_SIZE]
+                opp().hand = opp().hand[:HAND_TARGET_SIZE]
+                draw_to_hand(opp(), HAND_TARGET_SIZE)
+                phase = "MAIN"
+                p1_to_move = True
+            return True
+        draw_to_hand(opp(), HAND_TARGET_SIZE)
+        consecutive_discards = 0 if action[0] in ("n", "p") else consecutive_discards + 1
+        return True
+
+    def ask_resync():
+        nonlocal resyncing, resync_asked
+        pending.clear()
+        resyncing, resync_asked = True, time.monotonic()
+        nm.send({"t": "rs"})
+
+    def replay_pending():
+        nonlocal in_seq, waiting_since
+        while in_seq in pending:
+            m = pending.pop(in_seq)
+            in_seq += 1
+            if not replay(m.get("a") or [""]) or m.get("h") != net_state_hash(p1, p2, phase, p1_to_move, opening_ht):
+                ask_resync()
+                return
+        if pending and not waiting_since: waiting_since = time.monotonic()
+        elif not pending: waiting_since = 0.0
+
+    def receive_action(msg: dict):
+        q = msg.get("q", 0)
+        if resyncing or q < in_seq: return
+        pending[q] = msg
+        replay_pending()
 
     def apply_incoming(msg: dict):
         nonlocal p1, p2, phase, p1_to_move, opening_ht
@@ -625,10 +953,25 @@ def run_network_match(nm: "NetworkManager") -> str:
             if net_msg is None: break
             if net_msg.get("t") == "s":
                 apply_incoming(net_msg)
+                in_seq = net_msg.get("q", 0) + 1
+                for q in [q for q in pending if q < in_seq]: del pending[q]
+                resyncing, waiting_since = False, 0.0
+                replay_pending()
+                hitboxes_dirty = True
+            elif net_msg.get("t") == "a":
+                receive_action(net_msg)
                 hitboxes_dirty = True
+            elif net_msg.get("t") == "rs":
+                send_snapshot()
+            elif net_msg.get("t") == "gap":
+                # The transport lost a message, most likely a move: nothing after it can be replayed.
+                if not resyncing: ask_resync()
             elif net_msg.get("t") == "chat":
                 msg_str = f"Opp: {net_msg.get('text', '')}"
                 msg_until = now + 2500
+        # A move that never arrives (or a snapshot that never comes) must not hang the match.
+        waited = time.monotonic() - (resync_asked if resyncing else waiting_since)
+        if (resyncing or waiting_since) and waited >= NET_RESYNC_TIMEOUT_S: ask_resync()
 
         if hitboxes_dirty:
             _, ba_, pa_, _ = ui_rects()
@@ -651,7 +994,7 @@ def run_network_match(nm: "NetworkManager") -> str:
         _draw_net_hud(is_host, my_turn())
         pygame.display.flip()
 
-        if phase == "MAIN":
+        if phase == "MAIN" and not resyncing:
             ended, win, _ = check_game_end(me(), opp())
             if ended:
                 elapsed = now - start_ms
@@ -699,7 +1042,8 @@ def run_network_match(nm: "NetworkManager") -> str:
                     hitboxes_dirty = True
                     continue
 
-            if not my_turn(): continue
+            # While resyncing the board may be wrong; a move made on it would be overwritten.
+            if not my_turn() or resyncing: continue
 
             if e.type == pygame.MOUSEWHEEL and ui.hand_scroll_on:
                 hand_scroll = max(0, min(ui.hand_max_scroll, hand_scroll - e.y * 50))
@@ -718,7 +1062,7 @@ def run_network_match(nm: "NetworkManager") -> str:
                         consecutive_discards += 1
                         hitboxes_dirty = True
                         p1_to_move = not p1_to_move
-                        sync()
+                        sync(["d", selected])
                         selected = -1
 
                 cav_keys = {pygame.K_1: 0, pygame.K_2: 1, pygame.K_3: 2}
@@ -726,7 +1070,8 @@ def run_network_match(nm: "NetworkManager") -> str:
                     ci = cav_keys[e.key]
                     c = me().hand[selected]
                     if c.is_number():
-                        ok, emsg = play_number(me(), selected, ci)
+                        action = ["n", selected, ci]
+                        ok, emsg = play_number(me(), selected, ci, rules_event_observer)
                         selected = -1
                         if not ok:
                             msg_str = emsg
@@ -737,7 +1082,7 @@ def run_network_match(nm: "NetworkManager") -> str:
                             hitboxes_dirty = True
                             draw_to_hand(me(), HAND_TARGET_SIZE)
                             p1_to_move = not p1_to_move
-                            sync()
+                            sync(action)
 
             if phase == "OPENING" and e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
                 mpos = e.pos
@@ -760,8 +1105,9 @@ def run_network_match(nm: "NetworkManager") -> str:
                                 selected = -1
                                 break
                             if state.sounds: state.sounds.play("deal")
+                            action = ["o", selected, ci]
                             card = me().hand.pop(selected)
-                            me().caravans[ci].nums.append(NumEntry(card=card))
+                            me().caravans[ci].push(NumEntry(card=card))
                             selected = -1
                             hitboxes_dirty = True
                             opening_ht += 1
@@ -772,7 +1118,7 @@ def run_network_match(nm: "NetworkManager") -> str:
                                 draw_to_hand(me(), HAND_TARGET_SIZE)
                                 phase = "MAIN"
                                 p1_to_move = True
-                            sync()
+                            sync(action)
                             break
                 continue
 
@@ -788,7 +1134,7 @@ def run_network_match(nm: "NetworkManager") -> str:
                             consecutive_discards += 1
                             hitboxes_dirty = True
                             p1_to_move = not p1_to_move
-                            sync()
+                            sync(["d", hi])
                         continue
                     for ci, r in enumerate(ui.ply_slots):
                         if r.collidepoint(*mpos):
@@ -797,7 +1143,7 @@ def run_network_match(nm: "NetworkManager") -> str:
                                 consecutive_discards += 1
                                 hitboxes_dirty = True
                                 p1_to_move = not p1_to_move
-                                sync()
+                                sync(["b", ci])
                             else:
                                 msg_str = T("nothing_disband")
                                 msg_until = now + 1000
@@ -815,7 +1161,8 @@ def run_network_match(nm: "NetworkManager") -> str:
                     if c.is_number():
                         for ci, r in enumerate(ui.ply_slots):
                             if r.collidepoint(*mpos):
-                                ok, emsg = play_number(me(), selected, ci)
+                                action = ["n", selected, ci]
+                                ok, emsg = play_number(me(), selected, ci, rules_event_observer)
                                 selected = -1
                                 if not ok:
                                     msg_str = emsg
@@ -826,7 +1173,7 @@ def run_network_match(nm: "NetworkManager") -> str:
                                 hitboxes_dirty = True
                                 draw_to_hand(me(), HAND_TARGET_SIZE)
                                 p1_to_move = not p1_to_move
-                                sync()
+                                sync(action)
                                 break
 
                     elif c.is_picture():
@@ -842,7 +1189,8 @@ def run_network_match(nm: "NetworkManager") -> str:
                             continue
                         own, ci, ei = hit
                         tgt = me() if own == "player" else opp()
-                        ok, emsg = play_picture(me(), opp(), selected, tgt, ci, ei)
+                        action = ["p", selected, int(own == "player"), ci, ei]
+                        ok, emsg = play_picture(me(), opp(), selected, tgt, ci, ei, rules_event_observer)
                         selected = -1
                         if not ok:
                             msg_str = emsg
@@ -860,7 +1208,7 @@ def run_network_match(nm: "NetworkManager") -> str:
                         hitboxes_dirty = True
                         draw_to_hand(me(), HAND_TARGET_SIZE)
                         p1_to_move = not p1_to_move
-                        sync()
+                        sync(action)
 
     nm.close()
     return "menu"
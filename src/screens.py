@@ -33,6 +33,7 @@ from src.config import (
     CARD_FACE, CARD_BLACK, CARD_RED, CARD_JOKER,
     RES_ACTIVE, RES_ACT_H, ACH_BG, ACH_BORD, _BASE_CARD_W, _BASE_CARD_H, _BASE_W, _BASE_H,
     STALEMATE_THRESHOLD, TIMED_TURN_MS, HAND_OPENING_SIZE, HAND_TARGET_SIZE, UNDO_LEVELS,
+    BOT_ANYTIME, BOT_STATS_DEBUG,
     load_history, add_history, rpath, wpath, clamp, format_time_ms
 )
 from src.models import (
@@ -44,9 +45,10 @@ from src.models import (
 )
 from src.achievements import (
     ACH_IDS, load_achievements, save_achievements, unlock_achievement,
-    check_post_match_achievements, tick_achievement_popup
+    check_post_match_achievements, tick_achievement_popup, rules_event_observer
 )
-from src.bot import bot_take_turn
+from src.bot import bot_take_turn, BotThinker
+from src.tracker import CardTracker, card_pool
 from src.ui import (
     apply_resolution, draw_ui_background, draw_main_menu_background, draw_panel, draw_panel_title_bar, draw_text_center,
     draw_button, draw_minimal_chip, draw_text, draw_board, ui_rects, caravan_slots,
@@ -2366,8 +2368,15 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
 
     player = PlayerState(p_name, [Caravan() for _ in range(3)], p_deck, [], [])
     bot = PlayerState(b_name, [Caravan() for _ in range(3)], b_deck, [], [])
-    draw_to_hand(player, HAND_OPENING_SIZE)
-    draw_to_hand(bot, HAND_OPENING_SIZE)
+    # The bot counts cards against both deck lists (no bot in hot seat).
+    tracker = CardTracker(bot, player, b_deck, card_pool(sel_keys)) if game_mode != GM_HOT_SEAT else None
+
+    def match_observer(event, **data):
+        rules_event_observer(event, **data)
+        if tracker is not None: tracker.observe(event, **data)
+
+    draw_to_hand(player, HAND_OPENING_SIZE, match_observer)
+    draw_to_hand(bot, HAND_OPENING_SIZE, match_observer)
 
     phase = "OPENING"
     opening_halfturn = 0
@@ -2392,6 +2401,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
     running = True
     turn_start_ms = match_start_ms
     player_lost_first = False
+    thinker = BotThinker()   # bot decisions run off the render thread
 
     while running:
         clock.tick(FPS)
@@ -2403,8 +2413,8 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                     if sounds: sounds.play("discard")
                     if undo_stack and len(undo_stack) >= UNDO_LEVELS: undo_stack.pop(0)
                     undo_stack.append(take_snapshot(player, bot))
-                    discard_hand_card(player, 0)
-                    draw_to_hand(player, HAND_TARGET_SIZE)
+                    discard_hand_card(player, 0, match_observer)
+                    draw_to_hand(player, HAND_TARGET_SIZE, match_observer)
                     consecutive_discards += 1
                     hitboxes_dirty = True
                     if game_mode != GM_HOT_SEAT:
@@ -2434,8 +2444,16 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
         )
         hand_scroll = ui.hand_scroll
 
+        bot_move = None
         if game_mode != GM_HOT_SEAT and phase == "MAIN" and pending_bot and now >= pending_at:
-            ok2, rmsg, was_play = bot_take_turn(bot, player, diff, personality_key)
+            bot_move = thinker.poll(bot, player)
+            if bot_move is None and thinker.failed:
+                thinker.cancel()
+                bot_move = ()      # thinker gave up: decide synchronously below
+        if bot_move is not None:
+            ok2, rmsg, was_play = bot_take_turn(bot, player, diff, personality_key, match_observer,
+                                                move=bot_move or None, tracker=tracker)
+            if BOT_STATS_DEBUG and bot_move: print(f"bot turn: {thinker.stats}")
             pending_bot = False
             player_to_move = True
             selected = -1
@@ -2521,6 +2539,12 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                 wc = end_screen(T("draw_stalemate"), elapsed, caps_delta, result_context)
                 return wc, elapsed, caps_delta
 
+        # Start thinking as soon as the player's move lands, overlapping the bot delay
+        # (in anytime mode an uncapped search gets exactly what is left of it).
+        if game_mode != GM_HOT_SEAT and phase == "MAIN" and pending_bot and not thinker.active:
+            thinker.start(bot, player, diff, personality_key,
+                          budget_ms=max(0, pending_at - now) if BOT_ANYTIME else None, tracker=tracker)
+
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
                 app_settings.save()
@@ -2546,6 +2570,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                 if e.key == pygame.K_ESCAPE:
                     result = pause_menu(allow_undo=len(undo_stack) > 0)
                     if result == "quit_match":
+                        thinker.cancel()
                         elapsed = now - match_start_ms
                         app_stats.record("loss", elapsed)
                         app_stats.save()
@@ -2562,7 +2587,9 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
 
                 if phase == "MAIN" and player_to_move:
                     if e.key == pygame.K_u and undo_stack:
+                        thinker.cancel()
                         player, bot = restore_snapshot(undo_stack.pop())
+                        if tracker is not None: tracker.rebuild(bot, player)
                         selected = -1
                         consecutive_discards = 0
                         hitboxes_dirty = True
@@ -2574,8 +2601,8 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                         if len(undo_stack) >= UNDO_LEVELS: undo_stack.pop(0)
                         undo_stack.append(take_snapshot(player, bot))
                         if sounds: sounds.play("discard")
-                        if discard_hand_card(player, selected):
-                            if not draw_to_hand(player, HAND_TARGET_SIZE):
+                        if discard_hand_card(player, selected, match_observer):
+                            if not draw_to_hand(player, HAND_TARGET_SIZE, match_observer):
                                 elapsed = now - match_start_ms
                                 app_stats.record("loss", elapsed)
                                 app_stats.save()
@@ -2610,7 +2637,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                         if c.is_number():
                             if len(undo_stack) >= UNDO_LEVELS: undo_stack.pop(0)
                             undo_stack.append(take_snapshot(player, bot))
-                            ok, emsg = play_number(player, selected, ci)
+                            ok, emsg = play_number(player, selected, ci, match_observer)
                             if not ok:
                                 msg = emsg
                                 msg_until = now + 1400
@@ -2620,7 +2647,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                                 selected = -1
                                 hitboxes_dirty = True
                                 consecutive_discards = 0
-                                if not draw_to_hand(player, HAND_TARGET_SIZE):
+                                if not draw_to_hand(player, HAND_TARGET_SIZE, match_observer):
                                     elapsed = now - match_start_ms
                                     app_stats.record("loss", elapsed)
                                     app_stats.save()
@@ -2650,6 +2677,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                 if ui.pause_btn.collidepoint(*e.pos):
                     result = pause_menu(allow_undo=len(undo_stack) > 0)
                     if result == "quit_match":
+                        thinker.cancel()
                         elapsed = now - match_start_ms
                         app_stats.record("loss", elapsed)
                         app_stats.save()
@@ -2689,7 +2717,8 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                                     break
                                 if sounds: sounds.play("deal")
                                 card = player.hand.pop(selected)
-                                player.caravans[ci].nums.append(NumEntry(card=card))
+                                player.caravans[ci].push(NumEntry(card=card))
+                                match_observer("card_shown", actor=player, card=card)
                                 selected = -1
                                 hitboxes_dirty = True
                                 opening_halfturn += 1
@@ -2701,7 +2730,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                                     player_to_move = True
                                     opening_halfturn += 1
                                 else:
-                                    bot_opening_play(bot)
+                                    bot_opening_play(bot, match_observer)
                                     opening_halfturn += 1
                                     player_to_move = True
                                     hitboxes_dirty = True
@@ -2709,13 +2738,13 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                                     phase = "MAIN"
                                     player.hand = player.hand[:HAND_TARGET_SIZE]
                                     bot.hand = bot.hand[:HAND_TARGET_SIZE]
-                                    if not draw_to_hand(player, HAND_TARGET_SIZE):
+                                    if not draw_to_hand(player, HAND_TARGET_SIZE, match_observer):
                                         elapsed = now - match_start_ms
                                         app_stats.record("loss", elapsed)
                                         app_stats.save()
                                         wc = end_screen(T("bot_wins_deck"), elapsed, 0, result_context)
                                         return wc, elapsed, 0
-                                    if not draw_to_hand(bot, HAND_TARGET_SIZE):
+                                    if not draw_to_hand(bot, HAND_TARGET_SIZE, match_observer):
                                         elapsed = now - match_start_ms
                                         app_stats.record("win", elapsed)
                                         app_stats.save()
@@ -2734,8 +2763,8 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                             if len(undo_stack) >= UNDO_LEVELS: undo_stack.pop(0)
                             undo_stack.append(take_snapshot(player, bot))
                             if sounds: sounds.play("discard")
-                            if discard_hand_card(player, hi):
-                                if not draw_to_hand(player, HAND_TARGET_SIZE):
+                            if discard_hand_card(player, hi, match_observer):
+                                if not draw_to_hand(player, HAND_TARGET_SIZE, match_observer):
                                     elapsed = now - match_start_ms
                                     app_stats.record("loss", elapsed)
                                     app_stats.save()
@@ -2768,7 +2797,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                                 if len(undo_stack) >= UNDO_LEVELS: undo_stack.pop(0)
                                 undo_stack.append(take_snapshot(player, bot))
                                 if disband_caravan(player, ci):
-                                    if not draw_to_hand(player, HAND_TARGET_SIZE):
+                                    if not draw_to_hand(player, HAND_TARGET_SIZE, match_observer):
                                         elapsed = now - match_start_ms
                                         app_stats.record("loss", elapsed)
                                         app_stats.save()
@@ -2817,7 +2846,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                                 if r.collidepoint(*mpos):
                                     if len(undo_stack) >= UNDO_LEVELS: undo_stack.pop(0)
                                     undo_stack.append(take_snapshot(player, bot))
-                                    ok, emsg = play_number(player, selected, ci)
+                                    ok, emsg = play_number(player, selected, ci, match_observer)
                                     selected = -1
                                     if not ok:
                                         msg = emsg
@@ -2827,7 +2856,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                                     if sounds: sounds.play("play_card")
                                     consecutive_discards = 0
                                     hitboxes_dirty = True
-                                    if not draw_to_hand(player, HAND_TARGET_SIZE):
+                                    if not draw_to_hand(player, HAND_TARGET_SIZE, match_observer):
                                         elapsed = now - match_start_ms
                                         app_stats.record("loss", elapsed)
                                         app_stats.save()
@@ -2866,7 +2895,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                             tgt = player if own == "player" else bot
                             if len(undo_stack) >= UNDO_LEVELS: undo_stack.pop(0)
                             undo_stack.append(take_snapshot(player, bot))
-                            ok, emsg = play_picture(player, bot, selected, tgt, ci, ei)
+                            ok, emsg = play_picture(player, bot, selected, tgt, ci, ei, match_observer)
                             selected = -1
                             if not ok:
                                 msg = emsg
@@ -2883,7 +2912,7 @@ def run_match(diff: str, game_mode: str = GM_NORMAL,
                                 else: sounds.play("play_card")
                             consecutive_discards = 0
                             hitboxes_dirty = True
-                            if not draw_to_hand(player, HAND_TARGET_SIZE):
+                            if not draw_to_hand(player, HAND_TARGET_SIZE, match_observer):
                                 elapsed = now - match_start_ms
                                 app_stats.record("loss", elapsed)
                                 app_stats.save()
@@ -3563,7 +3592,7 @@ def run_spectator():
         pk = pers_a if a_to_move else pers_b
 
         if phase == "OPENING":
-            bot_opening_play(mover)
+            bot_opening_play(mover, rules_event_observer)
             opening_halfturn += 1
             hitboxes_dirty = True
             if opening_halfturn >= 6:
@@ -3573,7 +3602,7 @@ def run_spectator():
                 draw_to_hand(bot_a, HAND_TARGET_SIZE)
                 draw_to_hand(bot_b, HAND_TARGET_SIZE)
         else:
-            ok2, rmsg, was_play = bot_take_turn(mover, opponent, diff, pk)
+            ok2, rmsg, was_play = bot_take_turn(mover, opponent, diff, pk, rules_event_observer)
             consecutive_discards = (0 if was_play else consecutive_discards + 1)
             if rmsg: msg = rmsg; msg_until = now + 1200
             if not ok2:
@@ -0,0 +1,136 @@
+"""
+Card counting for the bot.
+
+CardTracker keeps the multiset of cards the bot has not seen yet, per side:
+for itself the cards still in its deck, for the player every card of the
+player's deck list that has not been played or discarded (hand and deck
+together). It is fed the "card_drawn" / "card_shown" rule events, so the
+queries never rescan discard piles; rebuild() resyncs it after an undo.
+The heuristic uses it for the chance that the player holds a Jack and the
+chance that the bot's next draw extends each of its caravans into 21-26.
+"""
+from collections import Counter
+from math import comb
+
+from src.models import RANKS, SUITS, Z_HAND, standard_card_list, card_code
+
+_RANK_INDEX = {r: i for i, r in enumerate(RANKS)}
+_RANK_INDEX["JKR"] = len(RANKS)
+_SUIT_INDEX = {s: i for i, s in enumerate(SUITS)}
+_MASK64 = (1 << 64) - 1
+
+def card_pool(keys=None):
+    """The cards of a deck selection (load_deck_selection() keys), unshuffled;
+    the standard deck with both Jokers when there is no selection."""
+    all_cards = standard_card_list(True)
+    if not keys: return all_cards
+    by_key = {c.key(): c for c in all_cards}
+    return [by_key[k] for k in keys if k in by_key]
+
+class _Unseen:
+    """A card multiset with per-rank and per-(suit, value) number counts,
+    and its hand_hash() as `key`."""
+    __slots__ = ("cards", "ranks", "values", "suited", "total", "key")
+
+    def __init__(self, cards=()):
+        self.cards = Counter(cards)
+        self.ranks = [0] * (len(RANKS) + 1)
+        self.values = [0] * 11                       # number cards by value
+        self.suited = [[0] * 11 for _ in SUITS]      # ... and by suit
+        self.key = 0
+        for c, n in self.cards.items(): self._count(c, n)
+        self.total = sum(self.cards.values())
+
+    def _count(self, card, n):
+        self.ranks[_RANK_INDEX[card.rank]] += n
+        if card.is_number():
+            self.values[card.value()] += n
+            self.suited[_SUIT_INDEX[card.suit]][card.value()] += n
+        self.key = (self.key + n * Z_HAND[card_code(card)]) & _MASK64
+
+    def remove(self, card):
+        if self.cards[card] <= 0: return     # not counted in this pool
+        self.cards[card] -= 1
+        self._count(card, -1)
+        self.total -= 1
+
+    def copy(self):
+        u = _Unseen.__new__(_Unseen)
+        u.cards, u.ranks, u.values, u.total, u.key = (Counter(self.cards), list(self.ranks), list(self.values),
+                                                      self.total, self.key)
+        u.suited = [list(s) for s in self.suited]
+        return u
+
+class CardTracker:
+    """What `me` can know about the cards still to come. Build it before the
+    opening draw from both deck lists (see card_pool) and chain observe()
+    into the match observer."""
+    def __init__(self, me, opp, my_pool, opp_pool):
+        self.me, self.opp = me, opp
+        self.mine = _Unseen(my_pool)       # still in my deck
+        self.theirs = _Unseen(opp_pool)    # in the opponent's hand or deck
+
+    def observe(self, event, **data):
+        actor = data.get("actor")
+        if event == "card_drawn" and actor is self.me:
+            self.mine.remove(data["card"])
+        elif event == "card_shown" and actor is self.opp:
+            self.theirs.remove(data["card"])
+
+    def rebuild(self, me, opp):
+        """Resyncs with a restored position (undo swaps in new PlayerState objects)."""
+        self.me, self.opp = me, opp
+        self.mine = _Unseen(me.deck)
+        self.theirs = _Unseen(opp.hand + opp.deck)
+
+    def copy(self, me=None, opp=None):
+        """An independent tracker, optionally bound to copies of the players."""
+        t = CardTracker.__new__(CardTracker)
+        t.me, t.opp = me or self.me, opp or self.opp
+        t.mine, t.theirs = self.mine.copy(), self.theirs.copy()
+        return t
+
+    @property
+    def draw_key(self):
+        """Changes whenever my draw odds do (for heuristic cache keys)."""
+        return self.mine.key
+
+    # ---- queries ----
+    def opp_unseen(self, rank):
+        """How many cards of `rank` ("A".."K", "JKR") the opponent may still hold or draw."""
+        return self.theirs.ranks[_RANK_INDEX[rank]]
+
+    def p_opp_holds(self, rank):
+        """Chance the opponent's current hand holds at least one `rank`."""
+        t = self.theirs
+        k, n, h = t.ranks[_RANK_INDEX[rank]], t.total, min(len(self.opp.hand), t.total)
+        if k == 0 or h == 0: return 0.0
+        if n - k < h: return 1.0
+        return 1.0 - comb(n - k, h) / comb(n, h)
+
+    def p_draw(self, rank):
+        """Chance my next draw is a `rank`."""
+        t = self.mine
+        return t.ranks[_RANK_INDEX[rank]] / t.total if t.total else 0.0
+
+    def p_extends(self, cav, into=None):
+        """Chance my next draw is a number card I could play on caravan `cav`
+        (can_play_number_on_caravan, counted by value instead of per card);
+        with `into` = (lo, hi), only one that brings its score into lo..hi."""
+        t = self.mine
+        if not t.total: return 0.0
+        values, nums = t.values, cav.nums
+        last = nums[-1].card.value() if nums else 0
+        if len(nums) >= 2:
+            d = cav.effective_direction()
+            suited = t.suited[_SUIT_INDEX[cav.effective_suit()]]
+        s, n = cav.score(), 0
+        for v in range(1, 11):
+            if v == last or (into and not into[0] <= s + v <= into[1]): continue
+            if len(nums) < 2 or (d == "up" and v > last) or (d == "down" and v < last): n += values[v]
+            else: n += suited[v]
+        return n / t.total
+
+    def p_draw_extends(self, cav_i):
+        """Chance my next draw is a number card I could play on my caravan `cav_i`."""
+        return self.p_extends(self.me.caravans[cav_i])
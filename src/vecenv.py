@@ -0,0 +1,318 @@
+"""
+Vectorised batch of matches for training and tuning (requires NumPy).
+
+VecEnv holds K independent MAIN-phase games in NumPy arrays and steps all
+of them with one batch of actions, following the CompactState rules: every
+move removes one hand card (except a disband) and refills to
+HAND_TARGET_SIZE, a side that cannot refill loses, two won slots end the
+match, STALEMATE_THRESHOLD turns in a row without a play is a draw.
+
+Games are dealt like a real match (build_deck_from_selection, the opening
+through bot_opening_play, trim and refill) and dealt again automatically
+when they end. Everything the caller sees is from the side to move:
+relative slots 0-2 are its caravans, 3-5 the opponent's.
+
+Actions are ints in [0, N_ACTIONS):
+  number   h * 3 + c                      hand card h on own caravan c
+  picture  A_PIC + (h * 6 + s) * E + e    hand card h on entry e of slot s
+  discard  A_DISCARD + h
+  disband  A_DISBAND + c
+A caravan holds at most VEC_MAX_ENTRIES entries; numbers on a full one are
+illegal.
+
+    env = VecEnv(1024, seed=1)
+    obs = env.reset()
+    obs, rewards, dones, info = env.step(actions)   # rewards[k, side]
+"""
+import random
+
+import numpy as np
+
+from src.config import HAND_OPENING_SIZE, HAND_TARGET_SIZE, STALEMATE_THRESHOLD
+from src.models import (
+    PlayerState, Caravan, build_deck_from_selection, draw_to_hand, bot_opening_play,
+    compact_from_players, _entry_pics, NO_CARD, JOKER_CODE,
+    CODE_VALUE, CODE_RANK, CODE_SUIT, CODE_NUMBER, CODE_PIC, CODE_KING, CODE_QUEEN,
+)
+
+VEC_MAX_ENTRIES = 12
+E = VEC_MAX_ENTRIES
+H = HAND_TARGET_SIZE
+DECK_MAX = 54
+
+A_PIC = H * 3
+A_DISCARD = A_PIC + H * 6 * E
+A_DISBAND = A_DISCARD + H
+N_ACTIONS = A_DISBAND + 3
+
+_VALUE = np.array(CODE_VALUE, dtype=np.int32)
+_RANK = np.array(CODE_RANK, dtype=np.int8)
+_SUIT = np.array(CODE_SUIT, dtype=np.int8)
+_NUMBER = np.array(CODE_NUMBER, dtype=bool)
+_PIC = np.array(CODE_PIC, dtype=bool)
+_KING = np.array(CODE_KING, dtype=bool)
+_QUEEN = np.array(CODE_QUEEN, dtype=bool)
+_JACK = _RANK == 10
+_JOKER = np.arange(64) == JOKER_CODE
+
+# Absolute slot of each relative slot, per side to move.
+_REL2ABS = np.array([[0, 1, 2, 3, 4, 5], [3, 4, 5, 0, 1, 2]])
+
+def deal_match(deck_keys=None, first=0):
+    """Both players of a fresh match after the opening, the way a real match
+    starts (see headless.play_match); side `first` opened first and moves first."""
+    p = [PlayerState(f"P{s}", [Caravan() for _ in range(3)], build_deck_from_selection(deck_keys), [], [])
+         for s in (0, 1)]
+    for q in p: draw_to_hand(q, HAND_OPENING_SIZE)
+    for half in range(6): bot_opening_play(p[(first + half) % 2])
+    for q in p:
+        q.hand = q.hand[:HAND_TARGET_SIZE]
+        draw_to_hand(q, HAND_TARGET_SIZE)
+    return p[0], p[1]
+
+class VecEnv:
+    def __init__(self, k, deck_keys=None, seed=None):
+        if seed is not None: random.seed(seed)
+        self.k = k
+        self.deck_keys = deck_keys
+        self.card = np.full((k, 6, E), NO_CARD, dtype=np.int8)
+        self.kings = np.zeros((k, 6, E), dtype=np.int8)
+        self.npics = np.zeros((k, 6, E), dtype=np.int8)
+        self.qpar = np.zeros((k, 6, E), dtype=np.int8)       # Queens attached, mod 2
+        self.qsuit = np.full((k, 6, E), -1, dtype=np.int8)   # suit of the last Queen
+        self.length = np.zeros((k, 6), dtype=np.int16)
+        self.score = np.zeros((k, 6), dtype=np.int32)
+        self.hand = np.full((k, 2, H), NO_CARD, dtype=np.int8)
+        self.hand_len = np.zeros((k, 2), dtype=np.int16)
+        self.deck = np.full((k, 2, DECK_MAX), NO_CARD, dtype=np.int8)
+        self.deck_len = np.zeros((k, 2), dtype=np.int16)
+        self.to_move = np.zeros(k, dtype=np.int8)
+        self.idle = np.zeros(k, dtype=np.int16)              # turns in a row without a play
+        self.games = 0
+        self._ar = np.arange(k)
+        self._mask = None                                    # legal_mask() of the current state
+
+    # ── dealing ──────────────────────────────────────────────
+    def _deal(self, g):
+        first = self.games % 2
+        self.games += 1
+        cs = compact_from_players(*deal_match(self.deck_keys, first))
+        self.card[g], self.kings[g], self.npics[g], self.qpar[g], self.qsuit[g] = NO_CARD, 0, 0, 0, -1
+        for slot, cv in enumerate(cs.cavs):
+            for j, e in enumerate(cv):
+                pics = _entry_pics(e)
+                queens = [pc for pc in pics if CODE_QUEEN[pc]]
+                self.card[g, slot, j] = e & 63
+                self.kings[g, slot, j] = sum(CODE_KING[pc] for pc in pics)
+                self.npics[g, slot, j] = len(pics)
+                self.qpar[g, slot, j] = len(queens) & 1
+                self.qsuit[g, slot, j] = CODE_SUIT[queens[-1]] if queens else -1
+            self.length[g, slot] = len(cv)
+            self.score[g, slot] = cs.scores[slot]
+        for s in (0, 1):
+            self.hand[g, s] = NO_CARD
+            self.hand[g, s, :len(cs.hands[s])] = cs.hands[s]
+            self.hand_len[g, s] = len(cs.hands[s])
+            self.deck[g, s] = NO_CARD
+            self.deck[g, s, :len(cs.decks[s])] = cs.decks[s]
+            self.deck_len[g, s] = len(cs.decks[s])
+        self.to_move[g] = first
+        self.idle[g] = 0
+
+    def reset(self):
+        for g in range(self.k): self._deal(g)
+        self._mask = None
+        return self.observe()
+
+    # ── views from the side to move ──────────────────────────
+    def _rel(self, a):
+        """a[K, 6, ...] reordered to relative slots."""
+        return a[self._ar[:, None], _REL2ABS[self.to_move]]
+
+    def _tops(self, card, length):
+        """Last value, previous value and top index per relative slot."""
+        top = np.maximum(length - 1, 0)
+        rows, slots = self._ar[:, None], np.arange(6)[None, :]
+        last_c = card[rows, slots, top]
+        prev_c = card[rows, slots, np.maximum(length - 2, 0)]
+        return top, _VALUE[last_c] * (length > 0), _VALUE[prev_c] * (length > 1), last_c
+
+    def legal_mask(self):
+        """[K, N_ACTIONS] bool, legal actions of the side to move. Cached until
+        the next step(); treat it as read-only."""
+        if self._mask is None: self._mask = self._legal_mask()
+        return self._mask
+
+    def _legal_mask(self):
+        k = self.k
+        ar = np.arange(k)
+        card, length = self._rel(self.card), self._rel(self.length)
+        npics, qpar, qsuit = self._rel(self.npics), self._rel(self.qpar), self._rel(self.qsuit)
+        hand = self.hand[ar, self.to_move]                                  # [K, H]
+        in_hand = np.arange(H)[None, :] < self.hand_len[ar, self.to_move][:, None]
+        top, last_v, prev_v, last_c = self._tops(card, length)
+        d = np.sign(last_v - prev_v) * (length > 1)
+        rows, slots = ar[:, None], np.arange(6)[None, :]
+        d = np.where(qpar[rows, slots, top] == 1, -d, d)
+        top_qs = qsuit[rows, slots, top]
+        suit = np.where(top_qs >= 0, top_qs, _SUIT[last_c])
+
+        mask = np.zeros((k, N_ACTIONS), dtype=bool)
+        hv, hs = _VALUE[hand][:, :, None], _SUIT[hand][:, :, None]          # [K, H, 1]
+        L, lv, dd, su = length[:, None, :3], last_v[:, None, :3], d[:, None, :3], suit[:, None, :3]
+        num = (L == 0) | ((hv != lv) & ((L == 1) | ((dd > 0) & (hv > lv)) | ((dd < 0) & (hv < lv)) | (hs == su)))
+        num &= (L < E) & (_NUMBER[hand] & in_hand)[:, :, None]
+        mask[:, :A_PIC] = num.reshape(k, -1)
+
+        e_idx = np.arange(E)[None, None, :]
+        target = (e_idx < length[:, :, None]) & (npics < 3)                 # [K, 6, E]
+        last = e_idx == (length[:, :, None] - 1)
+        pic_ok = (_PIC[hand] & in_hand)[:, :, None, None]
+        queen = _QUEEN[hand][:, :, None, None]
+        pic = pic_ok & target[:, None] & (~queen | last[:, None])           # [K, H, 6, E]
+        mask[:, A_PIC:A_DISCARD] = pic.reshape(k, -1)
+        mask[:, A_DISCARD:A_DISBAND] = in_hand
+        mask[:, A_DISBAND:] = length[:, :3] > 0
+        return mask
+
+    def observe(self):
+        ar = np.arange(self.k)
+        other = 1 - self.to_move
+        return {
+            "cards": self._rel(self.card), "kings": self._rel(self.kings), "npics": self._rel(self.npics),
+            "scores": self._rel(self.score), "lengths": self._rel(self.length),
+            "hand": self.hand[ar, self.to_move].copy(),
+            "deck_len": np.stack([self.deck_len[ar, self.to_move], self.deck_len[ar, other]], axis=1),
+            "opp_hand_len": self.hand_len[ar, other].copy(),
+            "to_move": self.to_move.copy(),
+            "mask": self.legal_mask(),
+        }
+
+    # ── stepping ─────────────────────────────────────────────
+    def _remove_entries(self, g, slot, keep):
+        """Compacts rows (g, slot) to the entries where keep[:, E] is set."""
+        order = np.argsort(~keep, axis=1, kind="stable")
+        for a in (self.card, self.kings, self.npics, self.qpar, self.qsuit):
+            a[g, slot] = np.take_along_axis(a[g, slot], order, axis=1)
+        n = keep.sum(axis=1)
+        empty = np.arange(E)[None, :] >= n[:, None]
+        self.card[g, slot] = np.where(empty, NO_CARD, self.card[g, slot])
+        for a in (self.kings, self.npics, self.qpar): a[g, slot] = np.where(empty, 0, a[g, slot])
+        self.qsuit[g, slot] = np.where(empty, -1, self.qsuit[g, slot])
+        self.length[g, slot] = n
+
+    def _rescore(self, g):
+        c = self.card[g]
+        self.score[g] = ((_VALUE[c] << self.kings[g]) * (c != NO_CARD)).sum(axis=2)
+
+    def step(self, actions):
+        """Plays one move in every game. Illegal actions are replaced by discarding
+        the first hand card (flagged in info["illegal"])."""
+        actions = np.asarray(actions, dtype=np.intp)
+        k = self.k
+        ar = np.arange(k)
+        side = self.to_move.astype(np.intp)
+        mask = self.legal_mask()
+        self._mask = None
+        illegal = ~mask[ar, actions]
+        actions = np.where(illegal, A_DISCARD, actions)
+
+        is_num, is_pic = actions < A_PIC, (actions >= A_PIC) & (actions < A_DISCARD)
+        is_dis, is_band = (actions >= A_DISCARD) & (actions < A_DISBAND), actions >= A_DISBAND
+        h = np.where(is_num, actions // 3, 0)
+        p = actions - A_PIC
+        h = np.where(is_pic, p // (6 * E), h)
+        h = np.where(is_dis, actions - A_DISCARD, h)
+        rel = np.where(is_num, actions % 3, np.where(is_pic, (p // E) % 6, actions - A_DISBAND))
+        slot = _REL2ABS[side, np.clip(rel, 0, 5)]
+        ent = np.where(is_pic, p % E, 0)
+        played = self.hand[ar, side, h]
+
+        # Numbers
+        g = np.nonzero(is_num)[0]
+        if len(g):
+            s, pos = slot[g], self.length[g, slot[g]]
+            self.card[g, s, pos] = played[g]
+            self.kings[g, s, pos] = self.npics[g, s, pos] = self.qpar[g, s, pos] = 0
+            self.qsuit[g, s, pos] = -1
+            self.length[g, s] += 1
+            self.score[g, s] += _VALUE[played[g]]
+        # Pictures
+        g = np.nonzero(is_pic)[0]
+        if len(g):
+            c, s, e = played[g], slot[g], ent[g]
+            val = _VALUE[self.card[g, s, e]] << self.kings[g, s, e]
+            kg = _KING[c]
+            self.score[g[kg], s[kg]] += val[kg]
+            self.kings[g[kg], s[kg], e[kg]] += 1
+            qg = _QUEEN[c]
+            self.qpar[g[qg], s[qg], e[qg]] ^= 1
+            self.qsuit[g[qg], s[qg], e[qg]] = _SUIT[c[qg]]
+            attach = ~_JACK[c]
+            self.npics[g[attach], s[attach], e[attach]] += 1
+            jg = _JACK[c]
+            if jg.any():
+                keep = np.arange(E)[None, :] < self.length[g[jg], s[jg]][:, None]
+                keep[np.arange(jg.sum()), e[jg]] = False
+                self.score[g[jg], s[jg]] -= val[jg]
+                self._remove_entries(g[jg], s[jg], keep)
+            xg = _JOKER[c]
+            if xg.any():
+                gx, sx, ex = g[xg], s[xg], e[xg]
+                tc = self.card[gx, sx, ex]
+                cards = self.card[gx]                                            # [G, 6, E]
+                by_suit = (_RANK[tc] == 0)[:, None, None]
+                hit = np.where(by_suit, _SUIT[cards] == _SUIT[tc][:, None, None],
+                               _RANK[cards] == _RANK[tc][:, None, None]) & (cards != NO_CARD)
+                hit[np.arange(len(gx)), sx, ex] = False
+                rows = np.nonzero(hit.any(axis=2))
+                if len(rows[0]):
+                    gg = gx[rows[0]]
+                    self._remove_entries(gg, rows[1], ~hit[rows] & (self.card[gg, rows[1]] != NO_CARD))
+                    self._rescore(np.unique(gx))
+        # Disbands
+        g = np.nonzero(is_band)[0]
+        if len(g):
+            s = slot[g]
+            self.card[g, s], self.kings[g, s], self.npics[g, s], self.qpar[g, s], self.qsuit[g, s] = NO_CARD, 0, 0, 0, -1
+            self.length[g, s] = 0
+            self.score[g, s] = 0
+
+        # The played or discarded card leaves the hand; refill one from the deck.
+        g = np.nonzero(~is_band)[0]
+        hs, hh = side[g], h[g]
+        idx = np.arange(H)[None, :]
+        src = np.minimum(idx + (idx >= hh[:, None]), H - 1)
+        self.hand[g, hs] = np.take_along_axis(self.hand[g, hs], src, axis=1)
+        self.hand_len[g, hs] -= 1
+        self.hand[g, hs, self.hand_len[g, hs]] = NO_CARD
+        need = self.hand_len[ar, side] < H
+        can = self.deck_len[ar, side] > 0
+        dg = np.nonzero(need & can)[0]
+        ds = side[dg]
+        self.deck_len[dg, ds] -= 1
+        self.hand[dg, ds, self.hand_len[dg, ds]] = self.deck[dg, ds, self.deck_len[dg, ds]]
+        self.deck[dg, ds, self.deck_len[dg, ds]] = NO_CARD
+        self.hand_len[dg, ds] += 1
+        decked = need & ~can
+
+        # Result: deck-out first, then two won slots, then the stalemate counter.
+        s0, s1 = self.score[:, :3], self.score[:, 3:]
+        f0, f1 = (s0 >= 21) & (s0 <= 26), (s1 >= 21) & (s1 <= 26)
+        w0 = ((f0 & ~f1) | (f0 & f1 & (s0 > s1))).sum(axis=1)
+        w1 = ((f1 & ~f0) | (f0 & f1 & (s1 > s0))).sum(axis=1)
+        winner = np.full(k, -1, dtype=np.int8)
+        winner[w0 >= 2], winner[w1 >= 2] = 0, 1
+        winner = np.where(decked, 1 - side, winner)
+        self.idle = np.where(is_num | is_pic, 0, self.idle + 1)
+        stalemate = (winner < 0) & (self.idle >= STALEMATE_THRESHOLD)
+        dones = (winner >= 0) | stalemate
+        rewards = np.zeros((k, 2), dtype=np.float32)
+        won = winner >= 0
+        rewards[np.nonzero(won)[0], winner[won]] = 1.0
+        rewards[np.nonzero(won)[0], 1 - winner[won]] = -1.0
+
+        self.to_move ^= 1
+        for gd in np.nonzero(dones)[0]: self._deal(gd)
+        info = {"winner": winner, "stalemate": stalemate, "illegal": illegal}
+        return self.observe(), rewards, dones, info
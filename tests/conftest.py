@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+@pytest.fixture
+def positions():
+    """Fresh copies of the first positions of tools/positions.json, bot to move."""
+    from bench_positions import saved_suite
+    return saved_suite(40)
+
+
+@pytest.fixture
+def sides(positions):
+    """(mover, other) pairs: every position from the bot's and the player's side."""
+    return [(b, p) for p, b in positions] + [(p, b) for p, b in positions]
@@ -0,0 +1,41 @@
+import random
+
+from src.config import HAND_TARGET_SIZE
+from src.models import (
+    compact_from_players, compact_to_players, compact_move_to_payload, make_move, draw_to_hand,
+    check_game_end, pack_entry, unpack_entry, NumEntry, Card,
+)
+
+
+def test_players_round_trip(positions):
+    for player, bot in positions:
+        p, b = compact_to_players(compact_from_players(player, bot))
+        assert (p, b) == (player, bot)
+        for cav, orig in zip(p.caravans + b.caravans, player.caravans + bot.caravans):
+            assert cav.score() == orig.score()
+
+
+def test_entry_round_trip():
+    ne = NumEntry(Card("7", "H"), [Card("K", "S"), Card("Q", "D"), Card("JKR")])
+    assert unpack_entry(pack_entry(ne)) == ne
+    assert unpack_entry(pack_entry(NumEntry(Card("A", "C")))) == NumEntry(Card("A", "C"))
+
+
+def test_apply_matches_make_move(positions):
+    """The same random line played on CompactState and on the players ends in the same position."""
+    rng = random.Random(3)
+    for player, bot in positions:
+        cs = compact_from_players(player, bot)
+        side, mover, other = 1, bot, player
+        for _ in range(20):
+            move = rng.choice(cs.moves(side))
+            cs.apply(side, move)
+            mtype, payload = compact_move_to_payload(side, move)
+            assert make_move(mover, other, mtype, payload) is not None
+            assert cs.draw(side, HAND_TARGET_SIZE) == draw_to_hand(mover, HAND_TARGET_SIZE)
+            assert list(cs.scores) == [cav.score() for p in (player, bot) for cav in p.caravans]
+            assert compact_to_players(cs) == (player, bot)
+            ended, win, _ = check_game_end(player, bot)
+            assert cs.winner() == (-1 if not ended else 1 if win == "bot" else 0)
+            if ended or not mover.hand: break
+            side, mover, other = side ^ 1, other, mover
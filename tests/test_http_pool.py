@@ -0,0 +1,108 @@
+import http.client
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.http_pool import HttpPool
+
+
+class _Stale:
+    """An idle connection the server has closed: the request goes out, the
+    response never comes."""
+    def __init__(self, fail_on_send=False):
+        self.fail_on_send = fail_on_send
+        self.sent = []
+        self.timeout = None
+
+    def request(self, method, url, body=None, headers=None):
+        if self.fail_on_send: raise BrokenPipeError()
+        self.sent.append(method)
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected("closed")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def log_message(self, *args): pass
+        def _reply(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            if n: self.rfile.read(n)
+            hits.append(self.command)
+            if self.headers.get("Accept") == "text/event-stream":
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                self.wfile.write(b"event: keep-alive\ndata: null\n\n")
+                self.wfile.flush()
+                release.wait(5)
+                self.close_connection = True
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", "4")
+            self.end_headers()
+            self.wfile.write(b"null")
+        do_GET = do_PATCH = do_PUT = _reply
+
+    hits, release = [], threading.Event()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}", hits
+    release.set()
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_stale_read_is_retried(server):
+    url, hits = server
+    pool = HttpPool(url)
+    stale = _Stale()
+    pool._idle.append(stale)
+    assert pool.request("GET", "/x.json") == b"null"
+    assert stale.sent == ["GET"] and hits == ["GET"]
+
+
+@pytest.mark.parametrize("method", ["PATCH", "PUT", "POST"])
+def test_sent_write_is_not_resent(server, method):
+    url, hits = server
+    pool = HttpPool(url)
+    pool._idle.append(_Stale())
+    with pytest.raises(http.client.RemoteDisconnected):
+        pool.request(method, "/x.json", b"{}")
+    assert hits == []
+
+
+def test_unsent_write_is_retried(server):
+    url, hits = server
+    pool = HttpPool(url)
+    pool._idle.append(_Stale(fail_on_send=True))
+    assert pool.request("PATCH", "/x.json", b"{}") == b"null"
+    assert hits == ["PATCH"]
+
+
+def test_stream_takes_no_slot(server):
+    url, hits = server
+    pool = HttpPool(url, size=1)
+    with pool.stream("/lobby.json", timeout=5) as res:
+        assert res.readline().startswith(b"event:")
+        assert pool.request("GET", "/x.json", timeout=2) == b"null"
+
+
+def test_background_writes_leave_a_slot():
+    pool = HttpPool("http://127.0.0.1:1", size=3)
+    gate, running = threading.Event(), threading.Semaphore(0)
+    def hold():
+        running.release()
+        gate.wait(5)
+    futures = [pool.defer(hold) for _ in range(3)]
+    for _ in range(2): assert running.acquire(timeout=2)
+    assert not running.acquire(timeout=0.2)
+    gate.set()
+    for f in futures: f.result(timeout=5)
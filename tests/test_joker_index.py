@@ -0,0 +1,62 @@
+from src.models import (
+    _clone_full, _joker_sweep, joker_hits, make_move, unmake_move, NumEntry, Card, Caravan, PlayerState,
+)
+from src.bot import _bot_candidates
+
+
+def _scan_hits(p1, p2, target):
+    t = target.card
+    hit = (lambda ne: ne.card.suit == t.suit) if t.rank == "A" else (lambda ne: ne.card.rank == t.rank)
+    return [(cav, k) for p in (p1, p2) for cav in p.caravans
+            for k, ne in enumerate(cav.nums) if ne is not target and hit(ne)]
+
+
+def _entries(player, bot):
+    return [ne for p in (bot, player) for cav in p.caravans for ne in cav.nums]
+
+
+def test_rank_and_suit_counts_match_the_entries(positions):
+    for player, bot in positions:
+        for cav in player.caravans + bot.caravans:
+            for r in {ne.card.rank for ne in cav.nums}:
+                assert cav.count_rank(r) == sum(ne.card.rank == r for ne in cav.nums)
+            for s in {ne.card.suit for ne in cav.nums}:
+                assert cav.count_suit(s) == sum(ne.card.suit == s for ne in cav.nums)
+
+
+def test_joker_hits_matches_a_full_scan(positions):
+    for player, bot in positions:
+        for ne in _entries(player, bot):
+            assert joker_hits(bot, player, ne) == len(_scan_hits(bot, player, ne))
+
+
+def test_sweep_removes_what_the_scan_finds(positions):
+    for player, bot in positions:
+        for k in range(len(_entries(player, bot))):
+            b, p = _clone_full(bot), _clone_full(player)
+            target = _entries(p, b)[k]
+            want = sorted((id(cav), cav.nums[i].card.key()) for cav, i in _scan_hits(b, p, target))
+            removed = _joker_sweep(b, b, p, target)
+            assert sorted((id(cav), ne.card.key()) for cav, _, ne in removed) == want
+            assert not _scan_hits(b, p, target)
+            for cav in b.caravans + p.caravans: cav._verify_cache()
+
+
+def test_indexes_follow_make_and_unmake(sides):
+    for me, opp in sides:
+        for mtype, payload in _bot_candidates(me, opp, prune=False):
+            undo = make_move(me, opp, mtype, payload)
+            if undo is None: continue
+            for ne in _entries(opp, me):
+                assert joker_hits(me, opp, ne) == len(_scan_hits(me, opp, ne))
+            unmake_move(me, opp, undo)
+
+
+def test_zero_hit_joker_is_still_a_candidate():
+    cav = lambda *cards: Caravan([NumEntry(Card(r, s)) for r, s in cards])
+    bot = PlayerState("Bot", [cav(("5", "H")), Caravan(), Caravan()], [], [], [Card("JKR")])
+    player = PlayerState("Player", [cav(("9", "S")), Caravan(), Caravan()], [], [], [])
+    jokers = [p for m, p in _bot_candidates(bot, player) if m == "play_pic"]
+    assert len(jokers) == 2
+    assert all(joker_hits(bot, player, (bot if p["owner"] == "bot" else player).caravans[p["cav"]].nums[0]) == 0
+               for p in jokers)
@@ -0,0 +1,67 @@
+from src.models import _clone_full, make_move, unmake_move
+from src.bot import _bot_candidates, _card_class
+
+
+def _caches(p):
+    for cav in p.caravans: cav._verify_cache()
+    return [(cav._score, cav._dir, cav._suit, cav._hash) for cav in p.caravans]
+
+
+def test_unmake_restores_every_candidate(sides):
+    for me, opp in sides:
+        before = _clone_full(me), _clone_full(opp)
+        caches = _caches(me), _caches(opp)
+        for mtype, payload in _bot_candidates(me, opp, prune=False):
+            undo = make_move(me, opp, mtype, payload)
+            if undo is None: continue
+            unmake_move(me, opp, undo)
+            assert (me, opp) == before, f"{mtype} {payload}"
+            assert (_caches(me), _caches(opp)) == caches, f"{mtype} {payload}"
+
+
+def test_unmake_restores_a_line_of_moves(sides):
+    for me, opp in sides[:10]:
+        before = _clone_full(me), _clone_full(opp)
+        undos, mover, other = [], me, opp
+        for _ in range(6):
+            cands = [m for m in _bot_candidates(mover, other, prune=False) if m[0] != "discard"]
+            if not cands: break
+            mtype, payload = cands[len(undos) % len(cands)]
+            undos.append((mover, other, make_move(mover, other, mtype, payload)))
+            mover, other = other, mover
+        for mover, other, undo in reversed(undos):
+            if undo is not None: unmake_move(mover, other, undo)
+        assert (me, opp) == before
+        _caches(me)
+        _caches(opp)
+
+
+def test_illegal_move_leaves_state_untouched(positions):
+    player, bot = positions[0]
+    before = _clone_full(bot), _clone_full(player)
+    assert make_move(bot, player, "play_number", {"card_idx": 99, "cav": 0}) is None
+    assert make_move(bot, player, "play_pic", {"card_idx": 0, "owner": "player", "cav": 0, "entry": 99}) is None
+    assert make_move(bot, player, "disband", {"cav": 5}) is None
+    assert (bot, player) == before
+
+
+def _move_class(me, opp, mtype, payload):
+    """A move up to the symmetries _bot_candidates collapses."""
+    ci = payload.get("cav")
+    pair = None if ci is None else (me.caravans[ci]._hash, opp.caravans[ci]._hash)
+    i = payload.get("card_idx")
+    card = None if i is None else _card_class(me.hand[i])
+    return mtype, card, pair, payload.get("owner"), payload.get("entry")
+
+
+def test_pruning_only_collapses_symmetric_moves(sides):
+    for me, opp in sides:
+        legal = set()
+        for mtype, payload in _bot_candidates(me, opp, prune=False):
+            undo = make_move(me, opp, mtype, payload)
+            if undo is None: continue
+            unmake_move(me, opp, undo)
+            legal.add(_move_class(me, opp, mtype, payload))
+        pruned = [_move_class(me, opp, *m) for m in _bot_candidates(me, opp)]
+        assert len(pruned) == len(set(pruned))
+        assert set(pruned) == legal
@@ -0,0 +1,69 @@
+import json
+
+from src.config import HAND_TARGET_SIZE
+from src.models import Card, Caravan, PlayerState, _clone_full, make_move, draw_to_hand
+from src.bot import _bot_candidates
+from src.network import net_encode, net_decode, net_state_hash, apply_net_action
+
+
+def _action(mtype, payload):
+    """A candidate move as the network protocol's action list."""
+    if mtype == "play_number": return ["n", payload["card_idx"], payload["cav"]]
+    if mtype == "play_pic":
+        return ["p", payload["card_idx"], int(payload["owner"] == "bot"), payload["cav"], payload["entry"]]
+    if mtype == "discard": return ["d", payload["card_idx"]]
+    return ["b", payload["cav"]]
+
+
+def _receiver(p1, p2):
+    """The opponent's copy of the match, built from a snapshot sent over the wire."""
+    np1, np2, phase, pm, oht = net_decode(json.loads(json.dumps(net_encode(p1, p2, "MAIN", True, 6))))
+    assert (phase, pm, oht) == ("MAIN", True, 6)
+    return np1, np2
+
+
+def test_replay_matches_the_senders_hash(positions):
+    for player, bot in positions[:20]:
+        p1, p2 = _clone_full(player), _clone_full(bot)
+        r1, r2 = _receiver(p1, p2)
+        assert net_state_hash(r1, r2, "MAIN", True, 6) == net_state_hash(p1, p2, "MAIN", True, 6)
+        p1_to_move = True
+        for ply in range(12):
+            mover, other = (p1, p2) if p1_to_move else (p2, p1)
+            cands = _bot_candidates(mover, other, prune=False)
+            mtype, payload = cands[(ply * 7) % len(cands)]
+            if make_move(mover, other, mtype, payload) is None: continue
+            draw_to_hand(mover, HAND_TARGET_SIZE)
+            p1_to_move = not p1_to_move
+            rm, ro = (r2, r1) if p1_to_move else (r1, r2)
+            assert apply_net_action(rm, ro, _action(mtype, payload)), (mtype, payload)
+            draw_to_hand(rm, HAND_TARGET_SIZE)
+            assert net_state_hash(r1, r2, "MAIN", p1_to_move, 6) == net_state_hash(p1, p2, "MAIN", p1_to_move, 6)
+        assert (r1, r2) == (p1, p2)
+
+
+def test_hash_sees_a_diverged_copy(positions):
+    player, bot = positions[0]
+    r1, r2 = _receiver(player, bot)
+    r2.hand.append(r2.deck.pop())
+    assert net_state_hash(r1, r2, "MAIN", True, 6) != net_state_hash(player, bot, "MAIN", True, 6)
+    assert net_state_hash(player, bot, "MAIN", False, 6) != net_state_hash(player, bot, "MAIN", True, 6)
+
+
+def test_bad_action_is_rejected(positions):
+    player, bot = positions[0]
+    before = _clone_full(bot), _clone_full(player)
+    for action in (["n", 99, 0], ["p", 0, 0, 0, 99], ["b", 7], ["d", -99], ["?"], []):
+        assert not apply_net_action(bot, player, action)
+    assert (bot, player) == before
+
+
+def test_malformed_opening_card_is_rejected():
+    mover = PlayerState("P1", [Caravan(), Caravan(), Caravan()], [], [], [Card("7", "H"), Card("K", "S")])
+    other = PlayerState("P2", [Caravan(), Caravan(), Caravan()], [], [], [])
+    before = _clone_full(mover), _clone_full(other)
+    for action in (["o", 1, 0], ["o", 0, -1], ["o", 0, 3], ["o", 0, "0"], ["o", 2, 0], ["o", 0]):
+        assert not apply_net_action(mover, other, action), action
+    assert (mover, other) == before
+    assert apply_net_action(mover, other, ["o", 0, 2])
+    assert mover.caravans[2].score() == 7 and mover.hand == [Card("K", "S")]
@@ -0,0 +1,87 @@
+import random
+
+import src.bot as bot_mod
+from src.models import _clone_full
+
+
+def _swap_hidden(player, k):
+    """The same player with a different split of their unseen cards between hand and deck."""
+    p = _clone_full(player)
+    unseen = p.hand + p.deck
+    unseen = unseen[k:] + unseen[:k]
+    p.hand, p.deck = unseen[:len(p.hand)], unseen[len(p.hand):]
+    return p
+
+
+def _choose(bot, player):
+    random.seed(11)
+    move = bot_mod.search_choose_move(_clone_full(bot), player, "hard", "house", node_budget=6_000)
+    return move, dict(bot_mod.last_search_stats, ms=0, nps=0)
+
+
+def test_search_does_not_read_the_players_hand(positions):
+    depths = []
+    for player, bot in positions[:4]:
+        want = _choose(bot, player)
+        assert want[1]["deals"] > 1
+        depths.append(want[1]["depth"])
+        for k in (1, 4):
+            assert _choose(bot, _swap_hidden(player, k)) == want
+    assert max(depths) > 1
+
+
+def test_known_hand_is_a_single_deal(positions):
+    player, bot = positions[0]
+    player.deck.clear()
+    _choose(bot, player)
+    assert bot_mod.last_search_stats["deals"] == 1
+
+
+def test_deal_keeps_the_unseen_cards(positions):
+    rng = random.Random(5)
+    for player, bot in positions:
+        d = bot_mod.deal_unseen(player, rng)
+        assert sorted(map(str, d.hand + d.deck)) == sorted(map(str, player.hand + player.deck))
+        assert (len(d.hand), len(d.deck)) == (len(player.hand), len(player.deck))
+        assert d.caravans == player.caravans and d.discard == player.discard
+
+
+def _solve(bot, player):
+    random.seed(11)
+    move = bot_mod.endgame_choose_move(_clone_full(bot), player, node_cap=60_000)
+    return move, dict(bot_mod.last_endgame_stats, ms=0)
+
+
+def test_endgame_does_not_read_the_players_hand(positions):
+    solved = 0
+    for player, bot in positions[:6]:
+        player.deck[2:], bot.deck[1:] = [], []
+        want = _solve(bot, player)
+        if want[0] is None: continue
+        solved += 1
+        assert want[1]["deals"] > 1
+        for k in (1, 3):
+            assert _solve(bot, _swap_hidden(player, k)) == want
+    assert solved
+
+
+def test_endgame_with_known_hand_is_a_single_deal(positions):
+    player, bot = positions[0]
+    player.deck.clear()
+    bot.deck[1:] = []
+    _solve(bot, player)
+    assert bot_mod.last_endgame_stats["deals"] == 1
+
+
+def test_rollouts_beat_the_one_ply_bot(monkeypatch):
+    """The rollout bot wins more than half its matches against the one-ply
+    bot with the same noise: the Wilson 95% interval lies above 50%."""
+    from src import headless
+    monkeypatch.setattr(bot_mod, "ROLLOUT_DEALS", 2)
+    n, wins = 100, 0
+    for i in range(n):
+        win, _, _ = headless.play_match(("hard", "house", "rollout", 6), ("hard", "house", "greedy"), 500 + i,
+                                        None, i % 2 == 0)
+        wins += win == "a"
+    lo, _ = headless.wilson_interval(wins, n)
+    assert lo > 0.5, f"{wins}/{n}"
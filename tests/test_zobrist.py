@@ -0,0 +1,39 @@
+from src.models import (
+    _clone_full, make_move, unmake_move, board_hash, position_hash, hand_hash, compact_to_players,
+    compact_from_players,
+)
+from src.bot import _bot_candidates
+
+
+def test_hash_after_undo_matches_before(sides):
+    for me, opp in sides:
+        board, pos = board_hash(me, opp), position_hash(me, opp)
+        for mtype, payload in _bot_candidates(me, opp, prune=False):
+            undo = make_move(me, opp, mtype, payload)
+            if undo is None: continue
+            for cav in me.caravans + opp.caravans:
+                assert cav._hash == cav._compute_hash(), f"{mtype} {payload}"
+            unmake_move(me, opp, undo)
+            assert (board_hash(me, opp), position_hash(me, opp)) == (board, pos), f"{mtype} {payload}"
+
+
+def test_hash_depends_only_on_the_position(positions):
+    for player, bot in positions:
+        p, b = compact_to_players(compact_from_players(player, bot))
+        assert position_hash(b, p) == position_hash(bot, player)
+        assert board_hash(b, p) == board_hash(bot, player)
+
+
+def test_hash_separates_sides_and_hands(positions):
+    player, bot = positions[0]
+    assert board_hash(bot, player) != board_hash(player, bot)
+    assert hand_hash(bot.hand) == hand_hash(list(reversed(bot.hand)))
+    other = _clone_full(bot)
+    other.hand.append(other.deck.pop())
+    assert position_hash(other, player) != position_hash(bot, player)
+    assert board_hash(other, player) == board_hash(bot, player)
+
+
+def test_tables_are_fixed():
+    from src import models
+    assert models._zobrist_tables() == (models.Z_LINK, models.Z_PIC, models.Z_HAND, models.Z_SLOT, models.Z_SIDE)
@@ -0,0 +1,72 @@
+"""Per-turn cost of bot_choose_move: clone-per-candidate vs make/unmake.
+
+    python tools/bench_bot_turn.py [positions] [repeats]
+"""
+import sys
+import time
+
+from bench_positions import position_suite
+from src.models import _clone, _clone_full, make_move, unmake_move
+from src.bot import _bot_candidates, heuristic, bot_choose_move, HEURISTIC_TT
+
+
+def clone_turn(bot, player):
+    """The old evaluation loop: fresh copies of both players per candidate."""
+    best = None
+    for mtype, payload in _bot_candidates(bot, player):
+        sp, sb = _clone(player), _clone(bot)
+        if make_move(sb, sp, mtype, payload) is None: continue
+        h = heuristic(sp, sb)
+        if best is None or h > best: best = h
+    return best
+
+
+def inplace_turn(bot, player):
+    best = None
+    for mtype, payload in _bot_candidates(bot, player):
+        undo = make_move(bot, player, mtype, payload)
+        if undo is None: continue
+        h = heuristic(player, bot)
+        unmake_move(bot, player, undo)
+        if best is None or h > best: best = h
+    return best
+
+
+def check_roundtrip(positions):
+    for player, bot in positions:
+        before = _clone_full(player), _clone_full(bot)
+        for mtype, payload in _bot_candidates(bot, player):
+            undo = make_move(bot, player, mtype, payload)
+            if undo is None: continue
+            unmake_move(bot, player, undo)
+            assert (player, bot) == before, f"unmake mismatch after {mtype} {payload}"
+
+
+def bench(fn, positions, repeats):
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for player, bot in positions: fn(bot, player)
+    return (time.perf_counter() - t0) / (repeats * len(positions)) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    positions = position_suite(n)
+    check_roundtrip(positions)
+    cands = sum(len(_bot_candidates(b, p)) for p, b in positions) / len(positions)
+    old = bench(clone_turn, positions, repeats)
+    new = bench(inplace_turn, positions, repeats)
+    HEURISTIC_TT.clear()
+    full = bench(lambda b, p: bot_choose_move(b, p, "medium"), positions, repeats)
+    tt = HEURISTIC_TT.stats()
+    print(f"{len(positions)} positions, {cands:.1f} candidates/turn on average")
+    print(f"clone per candidate : {old:7.3f} ms/turn")
+    print(f"make/unmake         : {new:7.3f} ms/turn  ({old / new:.2f}x)")
+    print(f"bot_choose_move     : {full:7.3f} ms/turn")
+    print(f"heuristic TT        : {tt['hit_rate']:.1%} hits ({tt['hits']}/{tt['hits'] + tt['misses']}), "
+          f"{tt['size']} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Candidates evaluated per turn with and without pruning in _bot_candidates,
+on the saved position suite (both sides to move), plus a check that the
+best one-ply heuristic value is unchanged, and that the endgame solver's
+value is the same with its pruning as with none (decks cut to a few cards).
+
+    python tools/bench_candidates.py [positions] [repeats]
+"""
+import sys
+import time
+import random
+
+from bench_positions import saved_suite
+from src.models import make_move, unmake_move, _clone_full
+from src.bot import _bot_candidates, heuristic, endgame_choose_move
+import src.bot as bot_mod
+
+ENDGAME_DECKS = (1,)        # cards left in each deck
+ENDGAME_CAP = 60_000
+
+
+def one_ply(me, opp, prune):
+    """(candidates, legal moves, best heuristic for `me`)."""
+    cands = _bot_candidates(me, opp, prune)
+    legal, best = 0, None
+    for mtype, payload in cands:
+        undo = make_move(me, opp, mtype, payload)
+        if undo is None: continue
+        h = heuristic(opp, me)
+        unmake_move(me, opp, undo)
+        legal += 1
+        if best is None or h > best: best = h
+    return len(cands), legal, best
+
+
+def endgame_check(positions):
+    """(solved, agreeing, ms pruned, ms unpruned) over the positions with decks cut short."""
+    solved = same = 0
+    ms = {True: 0.0, False: 0.0}
+    for player, bot in positions:
+        for cards in ENDGAME_DECKS:
+            p, b = _clone_full(player), _clone_full(bot)
+            p.deck, b.deck = p.deck[:cards], b.deck[:cards]
+            values = {}
+            for prune in (True, False):
+                random.seed(7)          # the same deals of the player's cards both times
+                move = endgame_choose_move(b, p, node_cap=ENDGAME_CAP, prune=prune)
+                values[prune] = bot_mod.last_endgame_stats["value"] if move else None
+                ms[prune] += bot_mod.last_endgame_stats["ms"]
+            if None in values.values(): continue
+            solved += 1
+            same += abs(values[True] - values[False]) < 1e-9
+    return solved, same, ms[True], ms[False]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    positions = saved_suite(n)
+    sides = [(b, p) for p, b in positions] + [(p, b) for p, b in positions]
+    raw = [one_ply(me, opp, False) for me, opp in sides]
+    new = [one_ply(me, opp, True) for me, opp in sides]
+    same = sum(1 for r, c in zip(raw, new) if r[2] == c[2])
+    timing = {}
+    for prune in (False, True):
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            for me, opp in sides: one_ply(me, opp, prune)
+        timing[prune] = (time.perf_counter() - t0) / (repeats * len(sides)) * 1000
+    cr, cn = sum(r[0] for r in raw), sum(c[0] for c in new)
+    print(f"{len(positions)} positions, {len(sides)} sides to move")
+    print(f"candidates : {cr / len(sides):6.1f} -> {cn / len(sides):6.1f} per turn  ({1 - cn / cr:.1%} fewer)")
+    print(f"one-ply    : {timing[False]:6.3f} -> {timing[True]:6.3f} ms/turn  ({timing[False] / timing[True]:.2f}x)")
+    print(f"best value unchanged in {same}/{len(sides)} positions")
+    solved, agree, ms_p, ms_u = endgame_check(positions)
+    print(f"endgame    : solver value unchanged in {agree}/{solved} solved positions "
+          f"({ms_u:.0f} -> {ms_p:.0f} ms in total)")
+    assert agree == solved, "endgame pruning changed the solver's value"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Random playouts on the object graph vs CompactState.
+
+CompactState keeps each caravan, hand and deck in its own variable-length
+array, not in one fixed-size buffer: copy() still allocates a dozen arrays,
+and apply() may allocate too (a Joker rebuilds the caravans it hits). The
+speedup measured here comes from dropping the object graph (Card,
+NumEntry and Caravan objects, dict payloads), not from a fixed layout.
+
+    python tools/bench_compact.py [positions] [plies]
+"""
+import sys
+import time
+import random
+
+from bench_positions import position_suite
+from src.config import HAND_TARGET_SIZE
+from src.models import (
+    _clone_full, make_move, draw_to_hand, check_game_end, compact_from_players,
+)
+from src.bot import _bot_candidates
+
+
+def object_playout(player, bot, plies, rng):
+    p, b = _clone_full(player), _clone_full(bot)
+    mover, other = b, p
+    for _ in range(plies):
+        mtype, payload = rng.choice(_bot_candidates(mover, other))
+        make_move(mover, other, mtype, payload)
+        if not draw_to_hand(mover, HAND_TARGET_SIZE): break
+        if check_game_end(p, b)[0]: break
+        mover, other = other, mover
+
+
+def compact_playout(cs, plies, rng):
+    cs = cs.copy()
+    side = 1
+    for _ in range(plies):
+        cs.apply(side, rng.choice(cs.moves(side)))
+        if not cs.draw(side, HAND_TARGET_SIZE): break
+        if cs.winner() >= 0: break
+        side ^= 1
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    plies = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    positions = position_suite(n, plies=12)
+    rounds = 10
+
+    rng = random.Random(7)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for player, bot in positions: object_playout(player, bot, plies, rng)
+    obj = (time.perf_counter() - t0) / (rounds * n)
+
+    compact = [compact_from_players(p, b) for p, b in positions]
+    rng = random.Random(7)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for cs in compact: compact_playout(cs, plies, rng)
+    cmp_ = (time.perf_counter() - t0) / (rounds * n)
+
+    print(f"object graph  : {obj * 1000:7.3f} ms/playout")
+    print(f"CompactState  : {cmp_ * 1000:7.3f} ms/playout  ({obj / cmp_:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
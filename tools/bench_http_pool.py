@@ -0,0 +1,67 @@
+"""Firebase request cost with a fresh urllib connection per request (the old
+_fb_get / FirebaseFriends._req) vs the shared keep-alive pool
+(src/http_pool.py), against tools/fake_firebase.py: small GETs one at a
+time and from 8 threads at once. The local server has no TLS, so the
+handshake the pool saves against the real database is larger than here.
+
+    python tools/bench_http_pool.py [requests] [--latency-ms 20]
+"""
+import os
+import sys
+import json
+import time
+import threading
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from fake_firebase import start_server
+from src.http_pool import HttpPool
+
+PATH = "/lobbies/L/state.json"
+
+
+def _urllib_get(url):
+    with urllib.request.urlopen(urllib.request.Request(url + PATH), timeout=3) as res:
+        return json.loads(res.read())
+
+
+def run(get, n, threads):
+    times, lock = [], threading.Lock()
+    def worker(count):
+        for _ in range(count):
+            t0 = time.perf_counter()
+            assert get() == "playing"
+            with lock: times.append((time.perf_counter() - t0) * 1000)
+    t0 = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(n // threads,)) for _ in range(threads)]
+    for t in pool: t.start()
+    for t in pool: t.join()
+    secs = time.perf_counter() - t0
+    times.sort()
+    pick = lambda q: times[min(len(times) - 1, int(q * len(times)))]
+    return len(times) / secs, pick(0.5), pick(0.99)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 400
+    latency = int(sys.argv[sys.argv.index("--latency-ms") + 1]) if "--latency-ms" in sys.argv else 0
+    server, url = start_server(latency_ms=latency)
+    server.fb.root = {"lobbies": {"L": {"state": "playing"}}}
+    print(f"{n} GETs per row, {latency} ms added server latency")
+    print(f"{'client':<22} {'threads':>7} | {'req/s':>7} {'p50 ms':>7} {'p99 ms':>7} | connects")
+    for threads in (1, 8):
+        c0 = server.fb.requests
+        rps, p50, p99 = run(lambda: _urllib_get(url), n, threads)
+        print(f"{'urllib per request':<22} {threads:7d} | {rps:7.0f} {p50:7.2f} {p99:7.2f} | {server.fb.requests - c0:8d}")
+        pool = HttpPool(url)
+        rps, p50, p99 = run(lambda: pool.json("GET", PATH), n, threads)
+        m = pool.metrics()
+        print(f"{'keep-alive pool':<22} {threads:7d} | {rps:7.0f} {p50:7.2f} {p99:7.2f} | {m['connects']:8d}")
+        pool.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Joker sweep on crowded late-game boards: scanning every caravan vs
+skipping caravans through the per-rank/per-suit index.
+
+    python tools/bench_joker_sweep.py [positions] [plies]
+"""
+import sys
+import time
+
+from bench_positions import position_suite
+from src.models import move_entry_to_discard, _joker_sweep, joker_hits
+
+
+def scan_sweep(actor, p1, p2, target_entry):
+    """Sweep without the index: walks every entry of all six caravans."""
+    tgt_rank, tgt_suit = target_entry.card.rank, target_entry.card.suit
+    def should_remove(ne):
+        if ne is target_entry: return False
+        return ne.card.suit == tgt_suit if tgt_rank == "A" else ne.card.rank == tgt_rank
+    removed = []
+    for owner in (p1, p2):
+        for cav in owner.caravans:
+            hits = [k for k, ne in enumerate(cav.nums) if should_remove(ne)]
+            for k in hits:
+                removed.append((cav, k, cav.nums[k]))
+                move_entry_to_discard(actor, cav.nums[k])
+            for k in reversed(hits): cav.remove_at(k)
+    return removed
+
+
+def revert(actor, removed, disc_len):
+    del actor.discard[disc_len:]
+    for cav, k, ne in removed: cav.insert(k, ne)
+
+
+def targets(player, bot):
+    return [ne for own in (bot, player) for cav in own.caravans for ne in cav.nums]
+
+
+def run(sweep, positions, rounds):
+    t0, sweeps, hits = time.perf_counter(), 0, 0
+    for _ in range(rounds):
+        for player, bot in positions:
+            for ne in targets(player, bot):
+                disc = len(bot.discard)
+                removed = sweep(bot, bot, player, ne)
+                revert(bot, removed, disc)
+                sweeps += 1
+                hits += len(removed)
+    return (time.perf_counter() - t0) / sweeps * 1e6, hits / sweeps
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    plies = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    positions = position_suite(n, plies=plies)
+    entries = sum(len(c.nums) for p, b in positions for c in p.caravans + b.caravans) / n
+    rounds = 20
+
+    old, avg_hits = run(scan_sweep, positions, rounds)
+    new, _ = run(_joker_sweep, positions, rounds)
+
+    t0, queries = time.perf_counter(), 0
+    for _ in range(rounds):
+        for player, bot in positions:
+            for ne in targets(player, bot):
+                joker_hits(bot, player, ne)
+                queries += 1
+    q = (time.perf_counter() - t0) / queries * 1e6
+
+    print(f"{n} boards, {entries:.1f} entries per board, {avg_hits:.2f} removals per Joker")
+    print(f"full scan sweep + revert : {old:6.2f} us")
+    print(f"indexed sweep + revert   : {new:6.2f} us  ({old / new:.2f}x)")
+    print(f"joker_hits() query       : {q:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Learned linear evaluation vs the hand-written heuristic: candidate
+positions scored per second on the saved suite, one batch per saved position
+as the "linear" bot scores them, and head-to-head win rate.
+
+    python tools/bench_linear_eval.py [matches] [-j workers]
+"""
+import sys
+import time
+
+from bench_positions import saved_suite
+from src.models import make_move, unmake_move
+from src.bot import _bot_candidates, heuristic
+from src.linear_eval import get_eval, features
+from src import headless
+
+
+def candidate_positions(positions):
+    for player, bot in positions:
+        for mtype, payload in _bot_candidates(bot, player):
+            undo = make_move(bot, player, mtype, payload)
+            if undo is None: continue
+            yield player, bot
+            unmake_move(bot, player, undo)
+
+
+def main():
+    matches = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    workers = int(sys.argv[sys.argv.index("-j") + 1]) if "-j" in sys.argv else None
+    model = get_eval()
+    if model is None: sys.exit("no linear evaluation (NumPy missing or no weights file)")
+    positions = saved_suite()
+    n = sum(1 for _ in candidate_positions(positions))
+
+    def rate(score_position):
+        best = 0.0
+        for _ in range(5):
+            t0 = time.perf_counter()
+            for pos in positions: score_position([pos])
+            best = max(best, n / (time.perf_counter() - t0))
+        return best
+    moves_only = rate(lambda pos: [None for _ in candidate_positions(pos)])
+    heur = rate(lambda pos: [heuristic(p, b) for p, b in candidate_positions(pos)])
+    rows = rate(lambda pos: model.score_rows([features(p, b) for p, b in candidate_positions(pos)]))
+    rows_only = rate(lambda pos: [features(p, b) for p, b in candidate_positions(pos)])
+    print(f"{n} candidate positions from {len(positions)} saved positions "
+          f"(best of 5, make/unmake included)")
+    print(f"make/unmake only   : {moves_only:10.0f} positions/sec")
+    print(f"heuristic          : {heur:10.0f} positions/sec")
+    print(f"linear             : {rows:10.0f} positions/sec  "
+          f"(features() alone {rows_only:.0f}/sec)")
+
+    spec = ("hard", "house")
+    res = headless.run_batch(spec + ("linear",), spec + ("greedy",), matches, workers)
+    k, p, (lo, hi) = res["a"]
+    print(f"linear vs heuristic, {matches} one-ply matches as {spec[0]}:{spec[1]}: "
+          f"{k} wins {p:.1%} [{lo:.1%}, {hi:.1%}], {res['draw'][0]} draws")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Frame times of a host waiting in the lobby while the server stalls, against
+tools/fake_firebase.py: the old poll_accept (a blocking GET of the whole
+lobby every frame) vs the background, rate-limited check. A 60 FPS loop
+runs for a few seconds; an opponent joins halfway. No window is opened,
+the frame does no drawing, so the times are the network cost alone.
+
+    python tools/bench_lobby_frames.py [seconds] [--latency-ms 800]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from fake_firebase import start_server
+from src.network import NetworkManager
+
+FRAME_S = 1 / 60
+
+
+def _old_poll_accept(nm):
+    if nm._polling_thread and nm._polling_thread.is_alive(): return True
+    lobby = nm._fb_get(f"/lobbies/{nm.lobby_id}.json")
+    if lobby != "NETWORK_ERROR" and lobby and lobby.get("state") == "playing":
+        nm._start_polling()
+        return True
+    return False
+
+
+def run(url, server, seconds, background):
+    host = NetworkManager()
+    host._fb_url = url
+    host.use_stream = False
+    assert host.create_private_match()
+    guest = NetworkManager()
+    guest._fb_url = url
+    frames, joined, seen = [], None, None
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        start = time.perf_counter()
+        if joined is None and start - t0 >= seconds / 2:
+            joined = start
+            guest.run_task("join_private_match", host.lobby_id)
+        accepted = host.poll_accept() if background else _old_poll_accept(host)
+        if accepted and seen is None: seen = time.perf_counter()
+        frames.append((time.perf_counter() - start) * 1000)
+        time.sleep(max(0.0, FRAME_S - (time.perf_counter() - start)))
+    host.close()
+    guest.close()
+    frames.sort()
+    pick = lambda q: frames[min(len(frames) - 1, int(q * len(frames)))]
+    fps = len(frames) / (time.perf_counter() - t0)
+    noticed = (seen - joined) * 1000 if seen and joined else float("nan")
+    slow = sum(ms > 2000 * FRAME_S for ms in frames)
+    return fps, slow, pick(0.99), frames[-1], noticed
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1][0].isdigit() else 6.0
+    latency = int(sys.argv[sys.argv.index("--latency-ms") + 1]) if "--latency-ms" in sys.argv else 800
+    server, url = start_server(latency_ms=latency)
+    print(f"{seconds:.0f} s waiting as host at 60 FPS, {latency} ms round trip, opponent joins at {seconds / 2:.0f} s")
+    print(f"{'poll_accept':<24} | {'FPS':>5} {'>33 ms':>6} {'p99 ms':>7} {'max ms':>7} | join noticed after")
+    for label, background in (("blocking, every frame", False), ("background, rate-limited", True)):
+        fps, slow, p99, worst, noticed = run(url, server, seconds, background)
+        print(f"{label:<24} | {fps:5.1f} {slow:6d} {p99:7.2f} {worst:7.1f} | {noticed:6.0f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
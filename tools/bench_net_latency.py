@@ -0,0 +1,58 @@
+"""Opponent-move latency over each receive transport, against
+tools/fake_firebase.py with a simulated round trip: time from send() to
+the move coming out of NetworkManager.poll(), plus the GETs per second
+the receiver makes. The last row refuses streams to show the fallback.
+
+    python tools/bench_net_latency.py [moves] [--latency-ms 40]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from fake_firebase import start_server
+from bench_net_poll import _manager
+from src.network import net_action_msg
+
+
+def run(moves, latency, use_stream, server_stream=True):
+    server, url = start_server(latency_ms=latency, stream=server_stream)
+    host, client = _manager(url, "L", "host"), _manager(url, "L", "client")
+    host._fb_put("/lobbies/L.json", {"state": "playing", "private": True})
+    client.use_stream = use_stream
+    client._start_polling()
+    time.sleep(1.0)                         # let the stream connect (or fail over)
+    rng = random.Random(1)
+    lat, g0, t0 = [], server.fb.by_method.get("GET", 0), time.perf_counter()
+    for n in range(1, moves + 1):
+        time.sleep(rng.uniform(0.2, 0.6))   # think time between moves
+        sent = time.perf_counter()
+        host.send(net_action_msg(n, ["d", 0], 0))
+        while client.poll() is None:
+            time.sleep(0.001)
+        lat.append((time.perf_counter() - sent) * 1000)
+    secs = time.perf_counter() - t0
+    transport = client.transport
+    client.connected = host.connected = False
+    server.shutdown()
+    lat.sort()
+    pick = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))]
+    return transport, pick(0.5), pick(0.95), lat[-1], (server.fb.by_method.get("GET", 0) - g0) / secs
+
+
+def main():
+    moves = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 30
+    latency = int(sys.argv[sys.argv.index("--latency-ms") + 1]) if "--latency-ms" in sys.argv else 40
+    print(f"{moves} moves, {latency} ms simulated round trip")
+    print(f"{'receiver':<29} | {'p50 ms':>7} {'p95 ms':>7} {'max ms':>7} | GETs/s")
+    for label, use_stream, server_stream in (("polling", False, True), ("stream", True, True),
+                                             ("stream, server refuses", True, False)):
+        transport, p50, p95, worst, rps = run(moves, latency, use_stream, server_stream)
+        print(f"{label + ' (' + transport + ')':<29} | {p50:7.0f} {p95:7.0f} {worst:7.0f} | {rps:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
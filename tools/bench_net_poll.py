@@ -0,0 +1,70 @@
+"""Cost of one lobby poll as a match goes on, against tools/fake_firebase.py:
+the old full fetch (GET every message ever sent + GET state.json, diffed
+against a set of seen keys) vs NetworkManager._poll_msgs (keys after the
+last delivered one, delivered messages deleted). One move is sent between
+polls; bytes are response bodies, ms includes the delete PATCH.
+
+    python tools/bench_net_poll.py [moves] [--latency-ms 20]
+"""
+import os
+import sys
+import time
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from fake_firebase import start_server
+from src.network import NetworkManager, net_action_msg, _msg_key
+
+MOVE = net_action_msg(0, ["p", 2, 0, 1, 3], 3735928559)
+
+
+def _manager(url, lobby, role):
+    nm = NetworkManager()
+    nm._fb_url, nm.lobby_id, nm.role = url, lobby, role
+    nm.player_id = "p1" if role == "host" else "p2"
+    nm.connected = True
+    return nm
+
+
+def _legacy_poll(nm, seen):
+    msgs = nm._fb_get(f"/lobbies/{nm.lobby_id}/p1_msgs.json")
+    for k, msg in (msgs or {}).items():
+        if k not in seen:
+            nm._q.put(msg)
+            seen.add(k)
+    nm._fb_get(f"/lobbies/{nm.lobby_id}/state.json")
+
+
+def run(server, url, moves, incremental):
+    lobby = "inc" if incremental else "old"
+    host, client = _manager(url, lobby, "host"), _manager(url, lobby, "client")
+    host._fb_put(f"/lobbies/{lobby}.json", {"state": "playing", "private": True})
+    fb, seen, rows = server.fb, set(), {}
+    marks = {m for m in (10, 50, 100, 200, 400, 800) if m <= moves} | {moves}
+    for n in range(1, moves + 1):
+        host._fb_patch(f"/lobbies/{lobby}/p1_msgs.json", {_msg_key(n): dict(MOVE, q=n)})
+        b0, t0 = fb.bytes_out, time.perf_counter()
+        if incremental: client._poll_msgs()
+        else: _legacy_poll(client, seen)
+        ms, nbytes = (time.perf_counter() - t0) * 1000, fb.bytes_out - b0
+        assert client.poll() is not None and client.poll() is None
+        if n in marks: rows[n] = (nbytes, ms)
+    return rows
+
+
+def main():
+    moves = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 400
+    latency = int(sys.argv[sys.argv.index("--latency-ms") + 1]) if "--latency-ms" in sys.argv else 0
+    server, url = start_server(latency_ms=latency)
+    old, new = run(server, url, moves, False), run(server, url, moves, True)
+    print(f"one {len(json.dumps(MOVE))}-byte move per poll, {latency} ms added server latency")
+    print(f"{'moves so far':>12} | {'old bytes':>9} {'old ms':>7} | {'new bytes':>9} {'new ms':>7}")
+    for n in sorted(old):
+        print(f"{n:12d} | {old[n][0]:9d} {old[n][1]:7.2f} | {new[n][0]:9d} {new[n][1]:7.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Outgoing moves under jitter and refused writes, against
+tools/fake_firebase.py: the old send (one fire-and-forget PATCH per
+message) vs NetworkManager's sender queue. Messages go out in bursts of
+1-3 (a move, sometimes with a resync snapshot or request), the way
+run_network_match sends them. Counts how many landed server-side after a
+later one, how many never landed, and the PATCHes it took.
+
+    python tools/bench_net_send.py [messages] [--latency-ms 60] [--jitter-ms 60] [--fail-rate 0.1]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from fake_firebase import start_server
+from bench_net_poll import _manager
+from src.network import net_action_msg, _msg_key, _msg_num
+from src.http_pool import get_pool
+
+
+def _old_send(nm, msg):
+    with nm._send_lock:
+        nm._send_n += 1
+        key = _msg_key(nm._send_n)
+    get_pool(nm._fb_url).submit("PATCH", f"/lobbies/{nm.lobby_id}/{nm.player_id}_msgs.json", {key: msg})
+
+
+def run(server, url, n, queued):
+    fb, lobby = server.fb, "q" if queued else "old"
+    arrived = []
+    notify = fb.notify
+    def record(event, parts, data):
+        if parts[-1:] == ["p1_msgs"] and isinstance(data, dict): arrived.extend(_msg_num(k) for k in data)
+        notify(event, parts, data)
+    fb.notify = record
+    nm = _manager(url, lobby, "host")
+    while not nm._fb_put(f"/lobbies/{lobby}.json", {"state": "playing"}): pass
+    p0, rng, sent = fb.by_method.get("PATCH", 0), random.Random(2), 0
+    t0 = time.perf_counter()
+    while sent < n:
+        for _ in range(min(rng.choice((1, 1, 1, 2, 3)), n - sent)):
+            sent += 1
+            msg = net_action_msg(sent, ["d", 0], 0)
+            if queued: nm.send(msg)
+            else: _old_send(nm, msg)
+        time.sleep(rng.uniform(0.0, 0.05))
+    deadline = time.monotonic() + 30
+    while len(set(arrived)) < n and time.monotonic() < deadline: time.sleep(0.01)
+    secs = time.perf_counter() - t0
+    time.sleep(1.0)                             # let the old sender's stragglers finish
+    fb.notify = notify
+    late, top = 0, 0
+    for k in arrived:
+        if k < top: late += 1
+        top = max(top, k)
+    metrics = nm.send_metrics() if queued else None
+    nm.close()
+    return late, n - len(set(arrived)), fb.by_method.get("PATCH", 0) - p0, secs, metrics
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 200
+    arg = lambda name, d: type(d)(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else d
+    latency, jitter, fail = arg("--latency-ms", 60), arg("--jitter-ms", 60), arg("--fail-rate", 0.1)
+    server, url = start_server(latency_ms=latency, jitter_ms=jitter, fail_rate=fail)
+    print(f"{n} messages, {latency}+0..{jitter} ms round trip, {fail:.0%} of writes refused")
+    print(f"{'sender':<16} | {'out of order':>12} {'lost':>5} {'PATCHes':>8} {'secs':>6}")
+    for label, queued in (("old, per message", False), ("queue", True)):
+        late, lost, patches, secs, m = run(server, url, n, queued)
+        print(f"{label:<16} | {late:12d} {lost:5d} {patches:8d} {secs:6.1f}")
+    print(f"queue metrics: {m['batches']} batches, {m['retries']} retries, "
+          f"send latency p50 {m['p50_ms']:.0f} ms, p99 {m['p99_ms']:.0f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Bytes on the wire per turn of a network match: the old full-state sync
+(net_encode every move) vs the move protocol (net_action_msg), measured
+on bot-vs-bot matches played through the network rules. The receiving
+side replays every action from its own copy and must agree on the hash.
+
+    python tools/bench_net_wire.py [matches]
+"""
+import os
+import sys
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from src.config import HAND_OPENING_SIZE, HAND_TARGET_SIZE, STALEMATE_THRESHOLD
+from src.models import PlayerState, Caravan, build_deck_from_selection, draw_to_hand, check_game_end
+from src.bot import bot_choose_move
+from src.network import net_encode, net_decode, net_action_msg, net_state_hash, apply_net_action
+
+MSG_ID = "1700000000000abcd"   # same length as NetworkManager.send() keys
+
+
+def _action(mtype, payload):
+    if mtype == "play_number": return ["n", payload["card_idx"], payload["cav"]]
+    if mtype == "play_pic":
+        return ["p", payload["card_idx"], int(payload["owner"] == "bot"), payload["cav"], payload["entry"]]
+    if mtype == "disband": return ["b", payload["cav"]]
+    return ["d", payload["card_idx"]]
+
+
+class _Side:
+    """One peer's view: both players, phase, turn and opening count, as in run_network_match."""
+    def __init__(self, p1, p2, phase="OPENING", pm=True, oht=0):
+        self.p, self.phase, self.pm, self.oht, self.discards = [p1, p2], phase, pm, oht, 0
+
+    def hash(self):
+        return net_state_hash(self.p[0], self.p[1], self.phase, self.pm, self.oht)
+
+    def apply(self, mover, action):
+        """apply_net_action plus the refill / turn bookkeeping of the match loop."""
+        me, opp = self.p[mover], self.p[1 - mover]
+        assert apply_net_action(me, opp, action), action
+        self.pm = not self.pm
+        if action[0] == "o":
+            self.oht += 1
+            if self.oht >= 6:
+                for q in self.p: q.hand = q.hand[:HAND_TARGET_SIZE]
+                draw_to_hand(me, HAND_TARGET_SIZE)
+                self.phase, self.pm = "MAIN", True
+            return
+        draw_to_hand(me, HAND_TARGET_SIZE)
+        self.discards = 0 if action[0] in ("n", "p") else self.discards + 1
+
+
+def play(seed):
+    """Returns (old bytes, new bytes) per turn and the size of the join snapshot."""
+    random.seed(seed)
+    p1 = PlayerState("Host", [Caravan() for _ in range(3)], build_deck_from_selection(None), [], [])
+    p2 = PlayerState("Opponent", [Caravan() for _ in range(3)], build_deck_from_selection(None), [], [])
+    draw_to_hand(p1, HAND_OPENING_SIZE)
+    draw_to_hand(p2, HAND_OPENING_SIZE)
+    host = _Side(p1, p2)
+    snap = net_encode(p1, p2, "OPENING", True, 0)
+    client = _Side(*net_decode(json.loads(json.dumps(snap)))[:2])
+    old, new, seq = [], [], 0
+    while True:
+        mover = 0 if host.pm else 1
+        me, opp = host.p[mover], host.p[1 - mover]
+        if host.phase == "OPENING":
+            i = next(k for k, c in enumerate(me.hand) if c.is_number())
+            action = ["o", i, next(k for k in range(3) if me.caravans[k].empty())]
+        else:
+            action = _action(*bot_choose_move(me, opp, "hard", "house", "greedy"))
+        host.apply(mover, action)
+        seq += 1
+        msg = net_action_msg(seq, action, host.hash())
+        old.append(len(json.dumps({MSG_ID: net_encode(host.p[0], host.p[1], host.phase, host.pm, host.oht)})))
+        new.append(len(json.dumps({MSG_ID: msg})))
+        wire = json.loads(json.dumps(msg))
+        client.apply(mover, wire["a"])
+        assert client.hash() == wire["h"], f"desync at seq {seq}"
+        if host.phase == "MAIN":
+            if len(me.hand) < HAND_TARGET_SIZE: break                       # decked out
+            if check_game_end(host.p[1], host.p[0])[0] or host.discards >= STALEMATE_THRESHOLD: break
+    return old, new, len(json.dumps({MSG_ID: snap}))
+
+
+def main():
+    matches = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    old, new, snaps = [], [], []
+    for seed in range(1, matches + 1):
+        o, n, s = play(seed)
+        old += o
+        new += n
+        snaps.append(s)
+    turns = len(old)
+    print(f"{matches} matches, {turns} turns, receiver replayed every action with matching hashes")
+    print(f"full-state sync : {sum(old) / turns:8.0f} bytes/turn  ({sum(old) / matches / 1024:7.1f} KiB/match)")
+    print(f"move protocol   : {sum(new) / turns:8.0f} bytes/turn  ({sum(new) / matches / 1024:7.1f} KiB/match, "
+          f"+ {sum(snaps) / matches:.0f} byte join snapshot)")
+    print(f"reduction       : {sum(old) / sum(new):8.1f}x per turn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Seeded mid-game positions shared by the benchmark scripts in tools/.
+
+    python tools/bench_positions.py [positions]   # (re)writes tools/positions.json
+"""
+import os
+import sys
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import HAND_OPENING_SIZE, HAND_TARGET_SIZE
+from src.models import (
+    PlayerState, Caravan, NumEntry, build_deck_from_selection, draw_to_hand,
+    bot_opening_play, make_move, standard_card_list,
+)
+from src.bot import _bot_candidates
+
+
+def random_position(seed, plies=24):
+    """Plays both sides with random legal moves for `plies` half-turns.
+    Returns (player, bot) with the bot to move, or None if a deck ran out."""
+    rng = random.Random(seed)
+    random.seed(seed)
+    player = PlayerState("Player", [Caravan() for _ in range(3)], build_deck_from_selection(None), [], [])
+    bot = PlayerState("Bot", [Caravan() for _ in range(3)], build_deck_from_selection(None), [], [])
+    draw_to_hand(player, HAND_OPENING_SIZE)
+    draw_to_hand(bot, HAND_OPENING_SIZE)
+    for _ in range(3):
+        bot_opening_play(player)
+        bot_opening_play(bot)
+    player.hand = player.hand[:HAND_TARGET_SIZE]
+    bot.hand = bot.hand[:HAND_TARGET_SIZE]
+    draw_to_hand(player, HAND_TARGET_SIZE)
+    draw_to_hand(bot, HAND_TARGET_SIZE)
+    mover, other = player, bot
+    for _ in range(plies):
+        cands = _bot_candidates(mover, other, prune=False)
+        rng.shuffle(cands)
+        # Prefer real plays so positions get crowded, like a late game does.
+        cands.sort(key=lambda m: m[0] in ("discard", "disband"))
+        for mtype, payload in cands:
+            if make_move(mover, other, mtype, payload) is not None: break
+        if not draw_to_hand(mover, HAND_TARGET_SIZE): return None
+        mover, other = other, mover
+    return (player, bot) if mover is bot else (other, mover)
+
+
+def position_suite(n, plies=24, seed=1):
+    out, s = [], seed
+    while len(out) < n:
+        pos = random_position(s, plies)
+        s += 1
+        if pos is not None: out.append(pos)
+    return out
+
+
+# ---- saved suite ----
+SUITE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "positions.json")
+_BY_KEY = {c.key(): c for c in standard_card_list(True)}
+
+
+def _dump_player(p):
+    return {"name": p.name,
+            "caravans": [[[ne.card.key(), [pc.key() for pc in ne.pics]] for ne in cav.nums] for cav in p.caravans],
+            "hand": [c.key() for c in p.hand], "deck": [c.key() for c in p.deck],
+            "discard": [c.key() for c in p.discard]}
+
+
+def _load_player(d):
+    cards = lambda keys: [_BY_KEY[k] for k in keys]
+    cavs = [Caravan([NumEntry(_BY_KEY[k], cards(pics)) for k, pics in cav]) for cav in d["caravans"]]
+    return PlayerState(d["name"], cavs, cards(d["deck"]), cards(d["discard"]), cards(d["hand"]))
+
+
+def save_suite(positions, path=SUITE_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([[_dump_player(p), _dump_player(b)] for p, b in positions], f, separators=(",", ":"))
+
+
+def saved_suite(n=None, path=SUITE_FILE):
+    """The positions in tools/positions.json (first n), so results stay comparable
+    across changes to move generation."""
+    with open(path, "r", encoding="utf-8") as f: data = json.load(f)
+    return [(_load_player(p), _load_player(b)) for p, b in data[:n]]
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    save_suite(position_suite(n))
+    print(f"wrote {n} positions to {SUITE_FILE}")
@@ -0,0 +1,33 @@
+"""Nodes/sec and depth reached by the expectiminimax bot with no node cap
+and a given time budget, for checking that SEARCH_BUDGET_MS stays well
+above what SEARCH_NODE_BUDGET costs on a given machine.
+
+    python tools/bench_search.py [positions] [budget_ms ...]
+"""
+import sys
+
+from bench_positions import position_suite
+import src.bot as bot_mod
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    budgets = [int(a) for a in sys.argv[2:]] or [60, 120, 350, 1000]
+    positions = position_suite(n)
+    print(f"{len(positions)} positions")
+    for budget in budgets:
+        depths, nodes, ms = [], 0, 0.0
+        for player, bot in positions:
+            bot_mod.search_choose_move(bot, player, "impossible", budget_ms=budget, node_budget=0)
+            st = bot_mod.last_search_stats
+            if not st: continue
+            depths.append(st["depth"])
+            nodes += st["nodes"]
+            ms += st["ms"]
+        if not depths: continue
+        print(f"budget {budget:5d} ms : depth avg {sum(depths) / len(depths):.2f} max {max(depths)}, "
+              f"{nodes / ms * 1000:8.0f} nodes/sec, {ms / len(depths):6.1f} ms/turn")
+
+
+if __name__ == "__main__":
+    main()
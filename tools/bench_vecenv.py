@@ -0,0 +1,81 @@
+"""Game steps per second: VecEnv batches vs stepping one game at a time
+(CompactState and PlayerState), all with a uniformly random legal policy.
+
+    python tools/bench_vecenv.py [steps] [batch sizes ...]
+"""
+import os
+import sys
+import time
+import random
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from src.config import HAND_TARGET_SIZE
+from src.models import compact_from_players, make_move, draw_to_hand, check_game_end
+from src.bot import _bot_candidates
+from src.vecenv import VecEnv, deal_match
+
+
+def vec_rate(k, steps):
+    """(steps/s, steps/s not counting the time spent dealing new games, games/s)."""
+    env = VecEnv(k, seed=1)
+    obs = env.reset()
+    deal, dealt = env._deal, [0.0]
+    def timed_deal(g):
+        t = time.perf_counter()
+        deal(g)
+        dealt[0] += time.perf_counter() - t
+    env._deal = timed_deal
+    rng = np.random.default_rng(1)
+    done = 0
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        mask = obs["mask"]
+        actions = np.argmax(rng.random(mask.shape) * mask, axis=1)
+        obs, _, dones, _ = env.step(actions)
+        done += int(dones.sum())
+    secs = time.perf_counter() - t0
+    return k * steps / secs, k * steps / (secs - dealt[0]), done / secs
+
+
+def serial_rates(steps):
+    """(CompactState steps/s, PlayerState steps/s), dealing like VecEnv does."""
+    rng = random.Random(2)
+    random.seed(2)
+    out = []
+    for compact in (True, False):
+        n, t, side = 0, 0.0, 0
+        while n < steps:
+            p0, p1 = deal_match(None, side)
+            cs = compact_from_players(p0, p1)
+            t0 = time.perf_counter()
+            for _ in range(200):
+                n += 1
+                if compact:
+                    cs.apply(side, rng.choice(cs.moves(side)))
+                    if not cs.draw(side, HAND_TARGET_SIZE) or cs.winner() >= 0: break
+                else:
+                    me, opp = (p0, p1) if side == 0 else (p1, p0)
+                    while make_move(me, opp, *rng.choice(_bot_candidates(me, opp, prune=False))) is None: pass
+                    if not draw_to_hand(me, HAND_TARGET_SIZE) or check_game_end(p0, p1)[0]: break
+                side = 1 - side
+            t += time.perf_counter() - t0
+        out.append(n / t)
+    return out
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sizes = [int(a) for a in sys.argv[2:]] or [64, 256, 1024, 4096]
+    cs_rate, ps_rate = serial_rates(20_000)
+    print(f"one game at a time : CompactState {cs_rate:9.0f} steps/s, PlayerState {ps_rate:9.0f} steps/s")
+    for k in sizes:
+        rate, no_deal, games = vec_rate(k, steps)
+        print(f"VecEnv K={k:<5d}      : {rate:9.0f} steps/s ({rate / cs_rate:4.1f}x CompactState), "
+              f"{no_deal:9.0f} without dealing ({no_deal / cs_rate:4.1f}x), {games:6.1f} games/s")
+
+if __name__ == "__main__":
+    main()
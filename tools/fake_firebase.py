@@ -0,0 +1,249 @@
+"""Local stand-in for the Firebase Realtime Database REST API, enough for
+src/network.py: GET / PUT / PATCH / DELETE on "<path>.json", the
+orderBy="$key" + startAt / endAt / limitToFirst / limitToLast queries,
+shallow=true, and streaming GETs (Accept: text/event-stream) that send
+"put"/"patch" events like the real server. Keeps the tree in memory and
+counts requests and bytes. Latency can be jittered and a share of writes
+refused with 503, to exercise retries. With --redirect-to it keeps no
+tree and answers every request with a 307 to the same path on another
+server, as Firebase does for a database that moved.
+
+    python tools/fake_firebase.py --port 8765 [--latency-ms 40] [--jitter-ms 30]
+                                  [--fail-rate 0.1] [--no-stream] [--redirect-to URL]
+
+Point the game at it with FIREBASE_URL = "http://127.0.0.1:8765", or
+start_server() in-process from a benchmark.
+"""
+import json
+import time
+import random
+import queue
+import argparse
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class FakeFirebase:
+    def __init__(self, latency_ms=0, stream=True, keepalive_s=30.0, jitter_ms=0, fail_rate=0.0, redirect_to=None):
+        self.root = {}
+        self.lock = threading.Lock()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms      # up to this much more, per request half
+        self.fail_rate = fail_rate      # share of PUT / PATCH answered 503 without applying
+        self.stream = stream            # False answers streaming GETs with 400, to exercise fallbacks
+        self.keepalive_s = keepalive_s
+        self.redirect_to = redirect_to  # base URL every request is sent on to with a 307
+        self.listeners = []             # (path parts, queue of (event, rel path, JSON data))
+        self.requests = 0
+        self.by_method = {}
+        self.bytes_out = 0
+
+    # ── tree ─────────────────────────────────────────────────
+    @staticmethod
+    def _parts(path):
+        return [p for p in path.strip("/").split("/") if p]
+
+    def get(self, parts):
+        node = self.root
+        for p in parts:
+            if not isinstance(node, dict) or p not in node: return None
+            node = node[p]
+        return node
+
+    def set(self, parts, value):
+        if not parts:
+            self.root = value if isinstance(value, dict) else {}
+            return
+        node = self.root
+        for p in parts[:-1]:
+            if not isinstance(node.get(p), dict): node[p] = {}
+            node = node[p]
+        if value is None: node.pop(parts[-1], None)
+        else: node[parts[-1]] = value
+        self._prune(parts[:-1])
+
+    def _prune(self, parts):
+        """Firebase has no empty objects: drop them up the path."""
+        while parts and self.get(parts) == {}:
+            parent = self.get(parts[:-1]) if len(parts) > 1 else self.root
+            parent.pop(parts[-1])
+            parts = parts[:-1]
+
+    def notify(self, event, parts, data):
+        """Queues an event for every stream at or above / below the changed path (lock held)."""
+        for lp, q in self.listeners:
+            if parts[:len(lp)] == lp:
+                q.put((event, "/" + "/".join(parts[len(lp):]), json.dumps(data)))
+            elif lp[:len(parts)] == parts:
+                q.put(("put", "/", json.dumps(self.get(lp))))
+
+    @staticmethod
+    def query(value, params):
+        if not isinstance(value, dict): return value
+        if params.get("shallow") == "true": return {k: True for k in value}
+        if params.get("orderBy") != "$key": return value
+        keys = sorted(value)
+        if "startAt" in params: keys = [k for k in keys if k >= params["startAt"]]
+        if "endAt" in params: keys = [k for k in keys if k <= params["endAt"]]
+        if "limitToFirst" in params: keys = keys[:int(params["limitToFirst"])]
+        if "limitToLast" in params: keys = keys[-int(params["limitToLast"]):]
+        return {k: value[k] for k in keys}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"     # keep-alive, like the real server
+    disable_nagle_algorithm = True    # headers and body go out in separate writes
+
+    def log_message(self, *args):
+        pass
+
+    def _delay(self):
+        fb = self.server.fb
+        ms = fb.latency_ms / 2 + random.uniform(0, fb.jitter_ms / 2)
+        if ms: time.sleep(ms / 1000)
+
+    def _redirect(self):
+        fb = self.server.fb
+        if not fb.redirect_to: return False
+        self._body()
+        with fb.lock: fb.requests += 1
+        self.send_response(307)
+        self.send_header("Location", fb.redirect_to + self.path)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def _target(self):
+        fb = self.server.fb
+        self._delay()                                           # request half of the round trip
+        with fb.lock: fb.by_method[self.command] = fb.by_method.get(self.command, 0) + 1
+        url = urllib.parse.urlsplit(self.path)
+        path = url.path[:-5] if url.path.endswith(".json") else url.path
+        params = {k: json.loads(v) if v.startswith('"') else v
+                  for k, v in urllib.parse.parse_qsl(url.query)}
+        return FakeFirebase._parts(path), params
+
+    def _body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(n) or b"null")
+
+    def _refused(self):
+        if random.random() >= self.server.fb.fail_rate: return False
+        self._body()
+        self._reply({"error": "unavailable"}, 503)
+        return True
+
+    def _reply(self, value, code=200):
+        fb = self.server.fb
+        self._delay()
+        data = json.dumps(value, separators=(",", ":")).encode()
+        with fb.lock:
+            fb.requests += 1
+            fb.bytes_out += len(data)
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self._redirect(): return
+        parts, params = self._target()
+        fb = self.server.fb
+        if "text/event-stream" in (self.headers.get("Accept") or ""):
+            if fb.stream: return self._stream(parts)
+            return self._reply({"error": "streaming disabled"}, 400)
+        with fb.lock: value = fb.query(fb.get(parts), params)
+        self._reply(value)
+
+    def _stream(self, parts):
+        fb = self.server.fb
+        q = queue.Queue()
+        with fb.lock:
+            fb.requests += 1
+            fb.listeners.append((parts, q))
+            q.put(("put", "/", json.dumps(fb.get(parts))))
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            while True:
+                try:
+                    event, path, data = q.get(timeout=fb.keepalive_s)
+                    out = f'event: {event}\ndata: {{"path":{json.dumps(path)},"data":{data}}}\n\n'.encode()
+                except queue.Empty:
+                    out = b"event: keep-alive\ndata: null\n\n"
+                if fb.latency_ms: time.sleep(fb.latency_ms / 2000)     # one way
+                self.wfile.write(out)
+                self.wfile.flush()
+                with fb.lock: fb.bytes_out += len(out)
+        except OSError:
+            pass
+        finally:
+            with fb.lock: fb.listeners.remove((parts, q))
+
+    def do_PUT(self):
+        if self._redirect(): return
+        parts, _ = self._target()
+        if self._refused(): return
+        value = self._body()
+        fb = self.server.fb
+        with fb.lock:
+            fb.set(parts, value)
+            fb.notify("put", parts, value)
+        self._reply(value)
+
+    def do_PATCH(self):
+        if self._redirect(): return
+        parts, _ = self._target()
+        if self._refused(): return
+        value = self._body()
+        fb = self.server.fb
+        with fb.lock:
+            for k, v in (value or {}).items(): fb.set(parts + FakeFirebase._parts(k), v)
+            fb.notify("patch", parts, value)
+        self._reply(value)
+
+    def do_DELETE(self):
+        if self._redirect(): return
+        parts, _ = self._target()
+        fb = self.server.fb
+        with fb.lock:
+            fb.set(parts, None)
+            fb.notify("put", parts, None)
+        self._reply(None)
+
+
+def start_server(port=0, latency_ms=0, stream=True, jitter_ms=0, fail_rate=0.0, redirect_to=None):
+    """Serves on 127.0.0.1 in a daemon thread; returns (server, base url). server.fb is the FakeFirebase."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.fb = FakeFirebase(latency_ms, stream, jitter_ms=jitter_ms, fail_rate=fail_rate, redirect_to=redirect_to)
+    threading.Thread(target=server.serve_forever, name="fake-firebase", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=int, default=0, help="added to every response")
+    ap.add_argument("--jitter-ms", type=int, default=0, help="random extra latency, up to this")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="share of writes answered 503")
+    ap.add_argument("--no-stream", action="store_true", help="refuse streaming GETs")
+    ap.add_argument("--redirect-to", help="answer everything with a 307 to this base URL")
+    args = ap.parse_args()
+    server, url = start_server(args.port, args.latency_ms, not args.no_stream, args.jitter_ms, args.fail_rate,
+                               args.redirect_to)
+    print(f"fake Firebase on {url}  (Ctrl+C to stop)")
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
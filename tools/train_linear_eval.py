@@ -0,0 +1,89 @@
+"""Trains the learned linear evaluation (src/linear_eval.py) from self-play.
+
+Plays --matches seeded one-ply matches between a mix of bots, records the
+feature vector of every position after every turn from both sides, labels
+each with that side's final result (1 win, 1/2 draw, 0 loss) and fits a
+logistic regression. The last --holdout share of matches is kept out of
+the fit and only used to report accuracy.
+
+    python tools/train_linear_eval.py --matches 3000 -j 8
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from src.config import LINEAR_EVAL_FILE
+from src.models import PERSONALITIES
+from src import headless
+from src.linear_eval import LinearEval, features, fit_logistic, save_eval
+
+DIFFICULTIES = ("medium", "hard", "impossible")
+
+
+def _match(job):
+    """Plays one match; returns (rows, labels)."""
+    seed, a, b = job
+    seen = []
+    win, _, _ = headless.play_match(
+        a, b, seed, None, seed % 2 == 0,
+        on_turn=lambda bot_a, bot_b: seen.append((features(bot_b, bot_a), features(bot_a, bot_b))))
+    ra = 0.5 if win is None else 1.0 if win == "a" else 0.0
+    rows, labels = [], []
+    for fa, fb in seen:
+        rows += [fa, fb]
+        labels += [ra, 1.0 - ra]
+    return rows, labels
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--matches", type=int, default=3000)
+    ap.add_argument("--holdout", type=float, default=0.2)
+    ap.add_argument("--l2", type=float, default=1e-3)
+    ap.add_argument("-j", "--workers", type=int, default=0, help="processes (0 = one per core)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default=LINEAR_EVAL_FILE)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    spec = lambda: (rng.choice(DIFFICULTIES), rng.choice(sorted(PERSONALITIES)), "greedy")
+    jobs = [(args.seed * 1_000_003 + k, spec(), spec()) for k in range(args.matches)]
+    workers = args.workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=headless._worker_init) as pool:
+            results = list(pool.map(_match, jobs, chunksize=max(1, len(jobs) // (workers * 16))))
+    else:
+        results = [_match(j) for j in jobs]
+    split = int(len(results) * (1 - args.holdout))
+    stack = lambda part: (np.array([r for rows, _ in part for r in rows]),
+                          np.array([y for _, ys in part for y in ys]))
+    X, y = stack(results[:split])
+    Xh, yh = stack(results[split:])
+    print(f"{args.matches} matches, {len(y)} training / {len(yh)} held-out positions "
+          f"({time.perf_counter() - t0:.0f} s)")
+
+    w = fit_logistic(X, y, args.l2)
+    report = {"matches": args.matches, "rows": int(len(y)), "l2": args.l2}
+    for name, A, b in (("train", X, y), ("holdout", Xh, yh)):
+        if not len(b): continue
+        p = np.clip(1.0 / (1.0 + np.exp(-(A @ w))), 1e-9, 1 - 1e-9)
+        decided = b != 0.5
+        acc = float(((p > 0.5) == (b > 0.5))[decided].mean())
+        loss = float(-(b * np.log(p) + (1 - b) * np.log(1 - p)).mean())
+        report[f"{name}_accuracy"], report[f"{name}_logloss"] = round(acc, 4), round(loss, 4)
+        print(f"  {name:8s} accuracy {acc:.3f}  log-loss {loss:.4f}")
+    save_eval(LinearEval(w, report), args.out)
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Self-play tuner for heuristic weights and one personality's biases.
+
+A (mu/mu_w, lambda) evolution strategy with mirrored sampling: every
+generation, lambda perturbations of the current weights each play a batch
+of seeded one-ply matches against the current weights, across a process
+pool, and the mean moves towards the best half. Progress is checkpointed
+after every generation, so the run can be stopped and resumed, and the
+current weights are written to --out. Only --install, once the run ends,
+writes the bot weights file that src/bot.py loads.
+
+    python tools/tune_weights.py --generations 200 --matches 64 -j 16
+    python tools/tune_weights.py --resume            # continue from the checkpoint
+    python tools/tune_weights.py --resume --install  # finish, then ship the weights
+
+Heuristic weights are clamped at 0 (they are penalties and rewards with a
+fixed sign); the personality biases may go negative.
+
+Noise is left alone: it is the per-difficulty handicap, and a strength
+search would simply drive it to zero.
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from src.config import BOT_WEIGHTS_FILE
+from src.models import PERSONALITIES, HeuristicWeights, HEURISTIC_WEIGHT_FIELDS, DEFAULT_WEIGHTS
+from src import headless
+
+BIAS_FIELDS = ("attack_bias", "defense_bias")
+PARAMS = HEURISTIC_WEIGHT_FIELDS + BIAS_FIELDS
+
+
+def defaults(personality):
+    pers = PERSONALITIES[personality]
+    return [float(getattr(DEFAULT_WEIGHTS, f)) for f in HEURISTIC_WEIGHT_FIELDS] + \
+           [float(getattr(pers, f)) for f in BIAS_FIELDS]
+
+
+def _clamp(vec):
+    n = len(HEURISTIC_WEIGHT_FIELDS)
+    return [max(0.0, v) for v in vec[:n]] + vec[n:]
+
+
+def _personality(template, vec, key):
+    vals = [int(round(v)) for v in vec]
+    n = len(HEURISTIC_WEIGHT_FIELDS)
+    return dataclasses.replace(
+        PERSONALITIES[template], key=key,
+        weights=HeuristicWeights(**dict(zip(HEURISTIC_WEIGHT_FIELDS, vals[:n]))),
+        **dict(zip(BIAS_FIELDS, vals[n:])),
+    )
+
+
+def _match(job):
+    """One candidate-vs-incumbent match in a worker; returns the candidate's score."""
+    template, cand, base, difficulty, seed, cand_first = job
+    PERSONALITIES["tune_cand"] = _personality(template, cand, "tune_cand")
+    PERSONALITIES["tune_base"] = _personality(template, base, "tune_base")
+    win, _, _ = headless.play_match((difficulty, "tune_cand", "greedy"), (difficulty, "tune_base", "greedy"),
+                                    seed, None, cand_first)
+    return 0.5 if win is None else 1.0 if win == "a" else 0.0
+
+
+def to_weights_file(template, vec):
+    pers = _personality(template, vec, template)
+    return {"heuristic": pers.weights.to_dict(),
+            "personalities": {template: {f: getattr(pers, f) for f in BIAS_FIELDS}}}
+
+
+def save_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--generations", type=int, default=200)
+    ap.add_argument("--population", type=int, default=12, help="lambda (rounded up to even)")
+    ap.add_argument("--matches", type=int, default=48, help="matches per candidate per generation")
+    ap.add_argument("--sigma", type=float, default=0.15, help="initial step, relative to each default")
+    ap.add_argument("--difficulty", default="hard")
+    ap.add_argument("--personality", default="house", choices=sorted(PERSONALITIES))
+    ap.add_argument("-j", "--workers", type=int, default=0, help="processes (0 = one per core)")
+    ap.add_argument("--checkpoint", default="tune_checkpoint.json")
+    ap.add_argument("--out", default="tune_weights.json", help="current weights, every generation")
+    ap.add_argument("--install", action="store_true", help=f"write the final weights to {BOT_WEIGHTS_FILE}")
+    ap.add_argument("--resume", action="store_true")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    base = defaults(args.personality)
+    scale = [max(4.0, abs(v)) for v in base]
+    if args.resume and os.path.exists(args.checkpoint):
+        with open(args.checkpoint, "r", encoding="utf-8") as f: ck = json.load(f)
+        if ck.get("personality") != args.personality:
+            sys.exit(f"{args.checkpoint} tunes {ck.get('personality')!r}, not {args.personality!r}")
+        mean, sigma, gen, history = ck["mean"], ck["sigma"], ck["generation"], ck["history"]
+        print(f"Resuming at generation {gen}")
+    else:
+        mean, sigma, gen, history = list(base), args.sigma, 0, []
+
+    lam = args.population + args.population % 2
+    mu = lam // 2
+    rw = [math.log(mu + 0.5) - math.log(i + 1) for i in range(mu)]
+    rw = [w / sum(rw) for w in rw]
+    rng = random.Random(args.seed * 7919 + gen)
+    workers = args.workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=headless._worker_init) as pool:
+        while gen < args.generations:
+            t0 = time.perf_counter()
+            noise = []
+            for _ in range(lam // 2):
+                z = [rng.gauss(0, 1) for _ in PARAMS]
+                noise += [z, [-x for x in z]]
+            cands = [_clamp([m + sigma * s * x for m, s, x in zip(mean, scale, z)]) for z in noise]
+            seeds = [rng.getrandbits(31) for _ in range(args.matches)]
+            jobs = [(args.personality, c, mean, args.difficulty, sd, k % 2 == 0)
+                    for c in cands for k, sd in enumerate(seeds)]
+            scores = list(pool.map(_match, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+            fitness = [sum(scores[i * args.matches:(i + 1) * args.matches]) / args.matches
+                       for i in range(lam)]
+            order = sorted(range(lam), key=lambda i: fitness[i], reverse=True)
+            mean = [sum(rw[r] * cands[i][d] for r, i in enumerate(order[:mu])) for d in range(len(PARAMS))]
+            # Shrink the step while the best half no longer clearly beats the incumbent.
+            top = sum(fitness[i] for i in order[:mu]) / mu
+            sigma = max(0.02, sigma * (1.05 if top > 0.55 else 0.95))
+            gen += 1
+            history.append({"generation": gen, "best": fitness[order[0]], "top_half": top, "sigma": sigma})
+            save_json(args.checkpoint, {"generation": gen, "mean": mean, "sigma": sigma, "history": history,
+                                        "personality": args.personality})
+            save_json(args.out, to_weights_file(args.personality, mean))
+            print(f"gen {gen:4d}  best {fitness[order[0]]:.3f}  top half {top:.3f}  sigma {sigma:.3f}  "
+                  f"({time.perf_counter() - t0:.1f} s, {len(jobs)} matches)")
+
+    print(json.dumps(to_weights_file(args.personality, mean), indent=2))
+    if args.install:
+        save_json(BOT_WEIGHTS_FILE, to_weights_file(args.personality, mean))
+        print(f"wrote {BOT_WEIGHTS_FILE}")
+
+
+if __name__ == "__main__":
+    main()